@@ -0,0 +1,201 @@
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+# Distinct raw addresses whose normalized form is memoized
+ADDRESS_CACHE_SIZE = 1 << 16
+
+# Street suffix words -> USPS abbreviation; the abbreviations map to themselves
+STREET_SUFFIXES = {
+    'STREET': 'ST', 'AVENUE': 'AVE', 'AV': 'AVE', 'ROAD': 'RD', 'DRIVE': 'DR', 'LANE': 'LN',
+    'CIRCLE': 'CIR', 'BOULEVARD': 'BLVD', 'WAY': 'WAY', 'PLACE': 'PL', 'COURT': 'CT',
+    'HIGHWAY': 'HWY', 'PARKWAY': 'PKWY', 'LOOP': 'LOOP', 'TERRACE': 'TER', 'TRAIL': 'TRL',
+    'SQUARE': 'SQ', 'MALL': 'MALL', 'ALLEY': 'ALY', 'WALK': 'WALK',
+}
+STREET_SUFFIXES.update({abbreviation: abbreviation for abbreviation in set(STREET_SUFFIXES.values())})
+
+# Suffixes the notice extractors look for in free text; short forms like "Ter" or "Sq" are left
+# out there, since the text scans match them inside ordinary words
+NOTICE_STREET_SUFFIXES = (
+    'Street', 'St', 'Avenue', 'Ave', 'Road', 'Rd', 'Lane', 'Ln', 'Drive', 'Dr', 'Circle', 'Cir',
+    'Boulevard', 'Blvd', 'Way', 'Place', 'Pl', 'Court', 'Ct', 'Highway', 'Hwy', 'Parkway', 'Pkwy',
+    'Loop', 'Terrace', 'Trail',
+)
+
+DIRECTIONS = {'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W', 'N': 'N', 'S': 'S', 'E': 'E', 'W': 'W'}
+UNIT_WORDS = frozenset(('APT', 'APARTMENT', 'UNIT', 'STE', 'SUITE', 'RM', 'ROOM', 'PH', 'PENTHOUSE'))
+STATE_WORDS = frozenset(('HI', 'HAWAII'))
+
+# Hawaii towns (and common abbreviations) -> canonical city name
+CITIES = {
+    'HONOLULU': 'HONOLULU', 'HNL': 'HONOLULU', 'HON': 'HONOLULU', 'AIEA': 'AIEA',
+    'EWA BEACH': 'EWA BEACH', 'EWA BCH': 'EWA BEACH', 'KAPOLEI': 'KAPOLEI', 'WAIPAHU': 'WAIPAHU',
+    'PEARL CITY': 'PEARL CITY', 'MILILANI': 'MILILANI', 'WAHIAWA': 'WAHIAWA', 'WAIANAE': 'WAIANAE',
+    'HALEIWA': 'HALEIWA', 'WAIALUA': 'WAIALUA', 'KAHUKU': 'KAHUKU', 'LAIE': 'LAIE', 'HAUULA': 'HAUULA',
+    'KAAAWA': 'KAAAWA', 'KANEOHE': 'KANEOHE', 'KAILUA': 'KAILUA', 'WAIMANALO': 'WAIMANALO',
+    'HILO': 'HILO', 'KAILUA KONA': 'KAILUA KONA', 'KAILUA-KONA': 'KAILUA KONA', 'KONA': 'KAILUA KONA',
+    'KEAAU': 'KEAAU', 'PAHOA': 'PAHOA', 'WAIMEA': 'WAIMEA', 'KAMUELA': 'KAMUELA', 'CAPTAIN COOK': 'CAPTAIN COOK',
+    'HOLUALOA': 'HOLUALOA', 'VOLCANO': 'VOLCANO', 'NAALEHU': 'NAALEHU', 'OCEAN VIEW': 'OCEAN VIEW',
+    'KIHEI': 'KIHEI', 'LAHAINA': 'LAHAINA', 'WAILUKU': 'WAILUKU', 'KAHULUI': 'KAHULUI', 'MAKAWAO': 'MAKAWAO',
+    'PUKALANI': 'PUKALANI', 'KULA': 'KULA', 'PAIA': 'PAIA', 'HAIKU': 'HAIKU', 'HANA': 'HANA',
+    'KAUNAKAKAI': 'KAUNAKAKAI', 'LANAI CITY': 'LANAI CITY', 'LIHUE': 'LIHUE', 'KAPAA': 'KAPAA',
+    'KOLOA': 'KOLOA', 'PRINCEVILLE': 'PRINCEVILLE', 'HANALEI': 'HANALEI', 'KEKAHA': 'KEKAHA',
+    'HANAPEPE': 'HANAPEPE', 'KALAHEO': 'KALAHEO',
+}
+_CITY_WORDS = {tuple(name.split()): city for name, city in CITIES.items()}
+_MAX_CITY_WORDS = max(len(words) for words in _CITY_WORDS)
+
+# Kahako vowels, the okina and the quotes typed in its place, folded before anything else
+_FOLD = str.maketrans({
+    'ā': 'a', 'ē': 'e', 'ī': 'i', 'ō': 'o', 'ū': 'u', 'Ā': 'A', 'Ē': 'E', 'Ī': 'I', 'Ō': 'O', 'Ū': 'U',
+    'ʻ': None, '‘': None, '’': None, "'": None, '`': None, ' ': ' ',
+})
+
+_ZIP = re.compile(r'\b(9[67]\d{3})(?:-\d{4})?\b')
+_TOKEN = re.compile(r'#?[A-Z0-9]+(?:[-/][A-Z0-9]+)*|,')
+
+NormalizedAddress = namedtuple('NormalizedAddress', 'street unit city state zip')
+NormalizedAddress.__doc__ = "Canonical address parts; `street` starts with the house number, `unit` has no '#'"
+
+def _line(address):
+    street = f"{address.street} #{address.unit}" if address.unit else address.street
+    place = ' '.join(part for part in (address.state, address.zip) if part)
+    return ', '.join(part for part in (street, address.city, place) if part)
+
+NormalizedAddress.line = property(_line, doc="The address as one canonical string")
+NormalizedAddress.key = property(
+    lambda address: f"{address.street} #{address.unit}" if address.unit else address.street,
+    doc="Street line with unit: the part that identifies a property within Hawaii"
+)
+
+def _fold(text):
+    # Most scraped addresses are plain ASCII, and translate() is the slowest step of a parse
+    if not text.isascii():
+        text = text.translate(_FOLD)
+        if not text.isascii():
+            text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    if "'" in text or '`' in text:
+        text = text.replace("'", '').replace('`', '')
+    return text.upper()
+
+def _take_city(tokens, end):
+    """Longest known city ending at tokens[end - 1]; returns (city, start) or (None, end)"""
+    for size in range(min(_MAX_CITY_WORDS, end), 0, -1):
+        city = _CITY_WORDS.get(tuple(tokens[end - size:end]))
+        if city:
+            return city, end - size
+    return None, end
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def normalize_address(value):
+    """Parse a free-text Hawaii address into a NormalizedAddress, or None without a house number
+
+    "1234 Kalākaua Avenue Apt. 1501, Honolulu, HI 96815" and
+    "1234 KALAKAUA AVE #1501 HONOLULU 96815" both give
+    NormalizedAddress('1234 KALAKAUA AVE', '1501', 'HONOLULU', 'HI', '96815').
+    """
+    if not value:
+        return None
+    text = _fold(value)
+
+    zip_code = ''
+    for match in _ZIP.finditer(text):
+        zip_code = match.group(1)
+    if zip_code:
+        text = text[:text.rfind(zip_code)]
+    tokens = _TOKEN.findall(text)
+
+    # Peel state and city off the end; without a known city, the last comma-separated part is it
+    end = len(tokens)
+    while end and tokens[end - 1] == ',':
+        end -= 1
+    state = 'HI' if zip_code else ''
+    if end and tokens[end - 1] in STATE_WORDS:
+        state = 'HI'
+        end -= 1
+        while end and tokens[end - 1] == ',':
+            end -= 1
+    city, city_start = _take_city(tokens, end)
+    if city is not None and city_start < 2:
+        city, city_start = None, end
+    if city is None and ',' in tokens[:end]:
+        comma = end - 1 - tokens[end - 1::-1].index(',')
+        place = tokens[comma + 1:end]
+        if place and place[0] not in UNIT_WORDS and all(token.isalpha() for token in place):
+            city, city_start = ' '.join(place), comma
+    end = city_start
+
+    words = []
+    unit = ''
+    i = 0
+    while i < end:
+        token = tokens[i]
+        i += 1
+        if token == ',':
+            continue
+        if token[0] == '#':
+            if len(token) > 1:
+                unit = token[1:]
+            elif i < end and tokens[i] != ',':
+                unit = tokens[i]
+                i += 1
+        elif token in UNIT_WORDS and words and i < end and tokens[i] != ',':
+            unit = tokens[i].lstrip('#')
+            i += 1
+        elif len(words) == 1 and token in DIRECTIONS:
+            words.append(DIRECTIONS[token])
+        elif len(words) > 1:
+            words.append(STREET_SUFFIXES.get(token, token))
+        else:
+            words.append(token)
+
+    if len(words) < 2 or not words[0][0].isdigit():
+        return None
+    return NormalizedAddress(' '.join(words), unit, city or '', state, zip_code)
+
+def street_key(value):
+    """Normalized street line with unit ("1234 KALAKAUA AVE #1501"), or None"""
+    address = normalize_address(value)
+    return address.key if address else None
+
+def has_street_suffix(line):
+    """Whether a line contains a street suffix word (Street, Ave, Hwy, ...)"""
+    return any(token in STREET_SUFFIXES for token in _TOKEN.findall(_fold(line)))
+
+def normalize_addresses(values):
+    """normalize_address over a batch; repeated values within the batch are parsed once"""
+    seen = {}
+    normalized = []
+    for value in values:
+        if value not in seen:
+            seen[value] = normalize_address(value)
+        normalized.append(seen[value])
+    return normalized
+
+def street_keys(values):
+    """street_key over a batch, in input order"""
+    return [address.key if address else None for address in normalize_addresses(values)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize Hawaii addresses, one per input line, to JSON lines")
+    parser.add_argument('path', nargs='?', default='-', help="File of addresses (default: stdin)")
+    args = parser.parse_args()
+
+    with (sys.stdin if args.path == '-' else open(args.path)) as f:
+        lines = [line.rstrip('\n') for line in f]
+
+    started = time.perf_counter()
+    results = normalize_addresses(lines)
+    elapsed = time.perf_counter() - started
+
+    for line, address in zip(lines, results):
+        print(json.dumps({'input': line, **(address._asdict() if address else {}),
+                          'line': address.line if address else None}))
+    rate = len(lines) / elapsed if elapsed else 0.0
+    print(f"Normalized {len(lines)} addresses in {elapsed:.3f}s ({rate:.0f}/s; "
+          f"{normalize_address.cache_info().hits} cache hits)", file=sys.stderr)
@@ -0,0 +1,112 @@
+import heapq
+import sys
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from; they never change the page
+TRACKING_PARAMS = ('utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+                   'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonical_url(href, base=None):
+    """Absolute form of `href` that is the same for every way a page is linked, or None
+
+    Relative links are resolved against `base`. The scheme and host are
+    lowercased, default ports, fragments and tracking parameters dropped,
+    dot segments resolved and the remaining query parameters sorted. Path
+    case is kept: servers may treat it as significant. Links that are not
+    http(s) (mailto:, javascript:, tel:) give None.
+    """
+    href = (href or '').strip()
+    if not href:
+        return None
+    url = urljoin(base, href) if base else href
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    # urljoin against the bare root resolves "." and ".." in paths that arrived already absolute
+    path = urlsplit(urljoin(f"{scheme}://{host}/", parts.path or '/')).path
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if key.lower() not in TRACKING_PARAMS)
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+class CrawlFrontier:
+    """URLs waiting to be fetched, best first, each fetched at most once
+
+    Links are canonicalized before anything else, so the same page linked
+    from the navigation, the body and the footer (or with and without a
+    fragment or tracking parameters) is queued once; later sightings only
+    count as duplicates. Links off the allowed hosts, deeper than
+    `max_depth` links from a seed, or past the `max_pages` budget are
+    dropped and counted. Among queued URLs the highest priority is popped
+    first, ties in discovery order.
+    """
+
+    def __init__(self, allowed_hosts=(), max_depth=2, max_pages=100):
+        self.allowed_hosts = {host.lower() for host in allowed_hosts}
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.seen = set()
+        self._queue = []
+        self._order = 0
+        self.stats = {'queued': 0, 'fetched': 0, 'duplicates': 0, 'too_deep': 0, 'off_site': 0, 'over_budget': 0}
+
+    def add(self, href, base=None, depth=0, priority=0.0):
+        """Queue a link found at `depth` (0 for seeds); return its canonical URL if newly queued, else None"""
+        url = canonical_url(href, base)
+        if url is None:
+            return None
+        if url in self.seen:
+            self.stats['duplicates'] += 1
+            return None
+        if self.allowed_hosts and urlsplit(url).hostname not in self.allowed_hosts:
+            self.stats['off_site'] += 1
+            return None
+        if depth > self.max_depth:
+            self.stats['too_deep'] += 1
+            return None
+        self.seen.add(url)
+        heapq.heappush(self._queue, (-priority, self._order, url, depth))
+        self._order += 1
+        self.stats['queued'] += 1
+        return url
+
+    def pop(self):
+        """Next (url, depth) to fetch, or None once the queue or the page budget is used up"""
+        if not self._queue:
+            return None
+        if self.stats['fetched'] >= self.max_pages:
+            self.stats['over_budget'] += len(self._queue)
+            self._queue = []
+            return None
+        _, _, url, depth = heapq.heappop(self._queue)
+        self.stats['fetched'] += 1
+        return url, depth
+
+    def __bool__(self):
+        return bool(self._queue)
+
+    def __iter__(self):
+        while True:
+            item = self.pop()
+            if item is None:
+                return
+            yield item
+
+    def report(self, name):
+        """Write fetch, duplicate and dropped-link counts to stderr"""
+        stats = self.stats
+        print(
+            f"Crawl [{name}]: {stats['fetched']} pages fetched, {stats['duplicates']} duplicate links skipped, "
+            f"{stats['too_deep']} too deep, {stats['off_site']} off-site, {stats['over_budget']} over the page budget",
+            file=sys.stderr
+        )
@@ -0,0 +1,136 @@
+from address_normalizer import street_key
+from records import compact_record
+from tmk import ISLAND_PLACE, parse_tmk
+
+# Which source's value wins when merged records disagree: court records first, the
+# tax-delinquency list last; within a source, detailed MFDR notices beat their table rows
+SOURCE_PRIORITY = ('hawaii_judiciary', 'ehawaii_mfdr', 'star_advertiser', 'honolulu_tax')
+
+def record_tmk(record):
+    """The record's parsed TMK: the canonical one a scraper tagged, else its tmk or parcel number"""
+    for field in ('canonical_tmk', 'tmk', 'parcel_number'):
+        tmk = parse_tmk(record.get(field))
+        if tmk:
+            return tmk
+    return None
+
+def record_keys(record, tmk=None):
+    """Index keys a record can be matched on: its parcel (TMK or parcel number) and its address"""
+    keys = []
+    tmk = tmk or record_tmk(record)
+    if tmk:
+        # Keyed without the island, which not every source writes; matches() keeps islands apart
+        keys.append(('parcel', tmk.key % ISLAND_PLACE))
+    address = street_key(record.get('address'))
+    if address:
+        keys.append(('address', address))
+    return keys
+
+def _rank(source):
+    return SOURCE_PRIORITY.index(source) if source in SOURCE_PRIORITY else len(SOURCE_PRIORITY)
+
+def _is_empty(value):
+    return value is None or value == '' or value == [] or value == {}
+
+class RecordMerger:
+    """Collapses records describing the same property, within and across sources
+
+    Records sharing a parcel (parsed TMK or parcel number) or a normalized
+    street address are joined with union-find over an in-memory key index, so
+    adding N records costs about N dictionary lookups. Two groups whose TMKs
+    differ are never joined, even at the same address (condo units, re-plats).
+    Each group becomes one record: fields come from the highest-priority
+    record that has them, and `sources` lists every source it was seen in.
+    """
+
+    def __init__(self):
+        self._records = []
+        self._parent = []
+        self._parcel = []
+        self._index = {}
+        self.conflicts = 0
+
+    def add(self, record):
+        record = compact_record(record)
+        i = len(self._records)
+        self._records.append(record)
+        self._parent.append(i)
+        tmk = record_tmk(record)
+        self._parcel.append(tmk)
+        for key in record_keys(record, tmk):
+            first = self._index.setdefault(key, i)
+            if first != i:
+                self._union(first, i)
+
+    def add_all(self, records):
+        for record in records:
+            self.add(record)
+
+    def _find(self, i):
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _union(self, a, b):
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        parcel_a, parcel_b = self._parcel[a], self._parcel[b]
+        if parcel_a and parcel_b and not parcel_a.matches(parcel_b):
+            self.conflicts += 1
+            return
+        # The earlier record stays the root, so merged records come out in first-seen order
+        if b < a:
+            a, b = b, a
+        # Keep the TMK that names an island, so later records from another island do not join
+        if not parcel_a or (parcel_b and not parcel_a.island):
+            parcel_a = parcel_b
+        self._parent[b] = a
+        self._parcel[a] = parcel_a
+
+    def records(self):
+        """Merged records, in the order each property was first seen"""
+        groups = {}
+        for i in range(len(self._records)):
+            groups.setdefault(self._find(i), []).append(i)
+        for members in groups.values():
+            yield self._merge(members)
+
+    def _merge(self, members):
+        records = self._records
+        ordered = sorted(members, key=lambda i: (
+            _rank(records[i].get('source')), not records[i].get('has_details'), i
+        ))
+        merged = {}
+        sources = []
+        for i in ordered:
+            record = records[i]
+            for field, value in record.items():
+                if _is_empty(merged.get(field)) and not _is_empty(value):
+                    merged[field] = value
+                elif field not in merged:
+                    merged[field] = value
+            source = record.get('source')
+            if source and source not in sources:
+                sources.append(source)
+        merged['sources'] = sources
+        return merged
+
+    def stats(self):
+        groups = len({self._find(i) for i in range(len(self._records))})
+        return {
+            'input': len(self._records),
+            'output': groups,
+            'merged': len(self._records) - groups,
+            'tmk_conflicts': self.conflicts,
+        }
+
+def dedupe_records(records, stats=None):
+    """Merge a stream of records; yields only once the stream is exhausted"""
+    merger = RecordMerger()
+    merger.add_all(records)
+    yield from merger.records()
+    if stats is not None:
+        stats.update(merger.stats())
@@ -0,0 +1,138 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_ROOT = os.environ.get(
+    'SCRAPER_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '.cache', 'scrapers')
+)
+
+class DiskLRUCache:
+    """Size-bounded on-disk key/value store with least-recently-used eviction"""
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size in bytes, oldest access first
+        self._total_bytes = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_entries()
+
+    def _load_entries(self):
+        """Rebuild the LRU order from file access times left by previous runs"""
+        found = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.bin'):
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _paths(self, key):
+        shard = os.path.join(self.directory, key[:2])
+        return os.path.join(shard, f"{key}.bin"), os.path.join(shard, f"{key}.json")
+
+    def get(self, key):
+        """Return (data, meta) for a key, or None if it is not cached"""
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            try:
+                with open(data_path, 'rb') as f:
+                    data = f.read()
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            now = time.time()
+            try:
+                os.utime(data_path, (now, now))
+            except OSError:
+                pass
+
+        return data, meta
+
+    def put(self, key, data, meta=None):
+        """Store bytes and a JSON-serializable metadata dict under a key"""
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+            self._write_atomic(meta_path, json.dumps(meta or {}).encode('utf-8'))
+            self._write_atomic(data_path, data)
+
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def update_meta(self, key, meta):
+        """Replace the metadata of an existing entry and mark it recently used"""
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            if key not in self._entries:
+                return
+            self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+            self._entries.move_to_end(key)
+            now = time.time()
+            try:
+                os.utime(data_path, (now, now))
+            except OSError:
+                pass
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _remove(self, key):
+        self._total_bytes -= self._entries.pop(key, 0)
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+def open_cache(namespace, max_bytes=None):
+    """Open a cache under the shared scraper cache root, or None if caching is disabled"""
+    if os.environ.get('SCRAPER_CACHE', '').lower() in ('0', 'off', 'false', 'no'):
+        return None
+
+    if max_bytes is None:
+        max_bytes = int(float(os.environ.get('SCRAPER_CACHE_MAX_MB', '256')) * 1024 * 1024)
+
+    try:
+        return DiskLRUCache(os.path.join(DEFAULT_CACHE_ROOT, namespace), max_bytes=max_bytes)
+    except OSError as e:
+        print(f"Cache disabled, could not open {namespace} cache: {e}", file=sys.stderr)
+        return None
@@ -1,76 +1,143 @@
 
-import requests
-from bs4 import BeautifulSoup
-import re
+from requests.adapters import HTTPAdapter
 import json
 import sys
+import argparse
+import threading
+from collections import defaultdict
 from datetime import datetime
-import time
+from urllib.parse import urlparse
+
+from html_parsing import TABLES_AND_LINKS, make_soup
+from http_cache import CachedSession
+from instrumentation import ScraperRun, Timer, add_instrumentation_arguments, stage
+from notice_extract import extract_detailed_notice_fields, extract_notice_fields
+from notice_state import NoticeStateStore, content_hash, notice_identity
+from page_archive import add_archive_arguments, iter_reparsed
+from pipeline import FetchParsePipeline, add_pipeline_arguments, parse_worker_count
+from record_output import RecordWriter, add_output_arguments, install_sigterm_handler
+from records import MfdrNotice
+from tmk import tag_canonical_tmk
 
 class EHawaiiMFDRScraper:
-    def __init__(self):
+    # Cache TTLs in seconds: the index gains new notices, posted notices rarely change
+    INDEX_CACHE_TTL = 3600
+    DETAIL_CACHE_TTL = 30 * 24 * 3600
+
+    def __init__(self, concurrency=1, rate=None, state=None, parse_workers=1):
         self.base_url = "https://mfdr.ehawaii.gov"
         self.notices_url = f"{self.base_url}/notices/index.html"
-        self.session = requests.Session()
+
+        # Concurrency is per host; concurrency=1 fetches one page at a time at 1 request/sec
+        self.concurrency = max(1, int(concurrency))
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.concurrency))
+        self._host_slots_lock = threading.Lock()
+
+        self.session = CachedSession('ehawaii_mfdr', ttl=self.INDEX_CACHE_TTL)
+        self.session.rate_limiter.configure(
+            self.base_url, rate if rate is not None else float(self.concurrency), burst=self.concurrency
+        )
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
 
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Optional NoticeStateStore; when set, only new or changed notices are processed
+        self.state = state
+
+        # Processes parsing detail pages; 1 parses them in this process
+        self.parse_workers = parse_workers
+
     def scrape_mfdr_notices(self):
         """Scrape MFDR foreclosure notices"""
-        notices = []
+        return list(self.iter_mfdr_notices())
 
+    def iter_mfdr_notices(self):
+        """Yield MFDR foreclosure notices as soon as each one is parsed"""
         try:
             print("Fetching MFDR notices page...", file=sys.stderr)
-            response = self.session.get(self.notices_url, timeout=30)
+            response = self.session.get(self.notices_url)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Only the tables and links are read from the index page
+            soup = make_soup(response.text, TABLES_AND_LINKS)
             
             # Look for notice tables or containers
-            notices.extend(self._parse_notice_table(soup))
+            yield from self._parse_notice_table(soup)
             
             # Also check for individual notice links
-            notices.extend(self._parse_individual_notices(soup))
+            yield from self._parse_individual_notices(soup)
 
         except Exception as e:
             print(f"Error scraping MFDR notices: {e}", file=sys.stderr)
 
-        return notices
-
     def _parse_notice_table(self, soup):
         """Parse notices from table format"""
-        notices = []
-
         try:
             # Find the main notices table
             tables = soup.find_all('table')
             
             for table in tables:
-                rows = table.find_all('tr')
-                
-                # Skip header row and process data rows
-                for row in rows[1:]:
-                    cells = row.find_all('td')
-                    
-                    if len(cells) >= 4:  # Expect owner, address, posting_date, view_link
-                        notice = self._parse_mfdr_table_row(cells, row)
-                        if notice:
-                            notices.append(notice)
-                            
-                            # Follow view link to get additional details
-                            detailed_notice = self._fetch_detailed_notice(notice)
-                            if detailed_notice:
-                                notices.append(detailed_notice)
-                            
-                            # Rate limiting
-                            time.sleep(1)
+                row_notices = self._table_notices(table)
+
+                # Known unchanged rows are dropped before any detail fetch
+                row_notices = self._skip_unchanged(row_notices, self._row_fingerprint)
+
+                # Follow view links to get additional details, keeping table order
+                detailed_notices = self._fetch_in_order(_parse_detailed_notice, row_notices)
+                for notice, detailed_notice in zip(row_notices, detailed_notices):
+                    yield notice
+                    if detailed_notice:
+                        yield detailed_notice
+                    # A row whose details could not be read stays new, so the next run fetches them again
+                    if detailed_notice or not notice['view_link']:
+                        self._remember(notice, self._row_fingerprint)
 
         except Exception as e:
             print(f"Error parsing notice table: {e}", file=sys.stderr)
 
+    def _table_notices(self, table):
+        """Notices of a notice table's data rows"""
+        rows = table.find_all('tr')
+
+        # Skip header row and process data rows
+        notices = []
+        for row in rows[1:]:
+            cells = row.find_all('td')
+
+            if len(cells) >= 4:  # Expect owner, address, posting_date, view_link
+                notice = self._parse_mfdr_table_row(cells, row)
+                if notice:
+                    notices.append(notice)
         return notices
 
+    def iter_archived_notices(self, parse_workers=1, since=None):
+        """Yield the notices of every archived index and notice page, without fetching
+
+        Index pages give their table rows. As in a live run, a notice page
+        is merged with the latest archived row linking to it and read as an
+        individual notice if the index links to it as one; a page no
+        archived index links to is read as an individual notice. Incremental
+        state is neither consulted nor updated.
+        """
+        rows = {}
+        linked = set()
+
+        # Archived pages are loaded in fetch order, so an index page comes before the notices it links to
+        def page(url, html):
+            if url == self.notices_url:
+                soup = make_soup(html, TABLES_AND_LINKS)
+                notices = [notice for table in soup.find_all('table') for notice in self._table_notices(table)]
+                rows.update((notice['view_link'], notice) for notice in notices if notice['view_link'])
+                linked.update(self._notice_link_urls(soup))
+                return 'index', notices
+            return 'notice', (rows.get(url), url in linked or url not in rows, url, html)
+
+        return iter_reparsed(self.session.archive, page, _reparse_page, parse_workers, since)
+
     def _parse_mfdr_table_row(self, cells, row):
         """Parse MFDR table row with specific column structure"""
         try:
@@ -92,172 +159,117 @@ class EHawaiiMFDRScraper:
 
             # Only create notice if we have essential data
             if owner_name and property_address:
-                return {
-                    'owner_name': owner_name,
-                    'borrower_name': owner_name,  # Same as owner for MFDR
-                    'address': property_address,
-                    'posting_date': posting_date,
-                    'notice_date': posting_date,
-                    'view_link': view_link,
-                    'status': 'mfdr_notice',
-                    'source': 'ehawaii_mfdr',
-                    'source_url': self.notices_url,
-                    'scraped_at': datetime.now().isoformat(),
-                    'raw_data': f"Owner: {owner_name} | Address: {property_address} | Posted: {posting_date}"
-                }
+                # borrower_name, notice_date and raw_data are derived from these fields on output
+                return MfdrNotice(
+                    owner_name=owner_name,
+                    address=property_address,
+                    posting_date=posting_date,
+                    view_link=view_link,
+                    source_url=self.notices_url,
+                    scraped_at=datetime.now().isoformat(),
+                )
 
         except Exception as e:
             print(f"Error parsing MFDR table row: {e}", file=sys.stderr)
 
         return None
 
-    def _fetch_detailed_notice(self, notice):
-        """Fetch detailed notice information from view link"""
-        if not notice.get('view_link'):
-            return None
-            
-        try:
-            print(f"Fetching details from: {notice['view_link']}", file=sys.stderr)
-            response = self.session.get(notice['view_link'], timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract detailed information from the notice page
-            text_content = soup.get_text()
-            
-            # Parse additional details
-            details = self._extract_detailed_notice_info(text_content)
-            
-            if details:
-                # Merge with original notice data
-                detailed_notice = notice.copy()
-                detailed_notice.update(details)
-                detailed_notice['source_url'] = notice['view_link']
-                detailed_notice['has_details'] = True
-                
-                return detailed_notice
-
-        except Exception as e:
-            print(f"Error fetching detailed notice {notice.get('view_link')}: {e}", file=sys.stderr)
-
-        return None
-
-    def _extract_detailed_notice_info(self, text):
-        """Extract detailed information from full notice text"""
-        info = {}
+    def _fetch_detail_page(self, item):
+        """A notice row's detail page or an individual notice page as (item, url, html), or None"""
+        if isinstance(item, str):
+            url = item
+        else:
+            url = item.get('view_link')
+            if not url:
+                return None
+            print(f"Fetching details from: {url}", file=sys.stderr)
 
         try:
-            # TMK (Tax Map Key) - Hawaiian property identifier
-            tmk_patterns = [
-                r'TMK[:\s]*([0-9-]+)',
-                r'Tax Map Key[:\s]*([0-9-]+)',
-                r'\(TMK\)\s*([0-9-]+)'
-            ]
-            
-            for pattern in tmk_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    info['tmk'] = match.group(1).strip()
-                    break
-
-            # Auction/Sale Date
-            auction_patterns = [
-                r'(?:auction|sale)\s+(?:date|on):\s*(\w+\s+\d+,?\s+\d{4})',
-                r'(?:date|on)\s+(\w+\s+\d+,?\s+\d{4}).*(?:auction|sale)',
-                r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}).*(?:auction|sale)',
-                r'(?:auction|sale).*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
-            ]
-
-            for pattern in auction_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    info['auction_date'] = match.group(1).strip()
-                    break
-
-            # Attorney/Trustee information
-            attorney_patterns = [
-                r'(?:attorney|counsel|trustee|law firm):\s*([^\n\r.;]+)',
-                r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*,?\s+(?:Esq|Attorney|LLLC|LLC|P\.A\.|ALC))',
-                r'(?:Trustee|Attorney):\s*([^\n\r.;]+)'
-            ]
-
-            for pattern in attorney_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    info['attorney_info'] = match.group(1).strip()
-                    break
-
-            # Case/File Number
-            case_patterns = [
-                r'(?:Case|File|Doc|Docket)\s*[#No.]*\s*([A-Z0-9-]+)',
-                r'FC[:\s-]*([0-9-]+)',
-                r'MFDR[:\s-]*([0-9-]+)'
-            ]
-
-            for pattern in case_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    info['case_number'] = match.group(1).strip()
-                    break
-
-            # Loan/Debt Amount
-            amount_patterns = [
-                r'\$[\d,]+\.?\d*',
-                r'(?:amount|debt|balance|owed).*?\$?([\d,]+\.?\d*)',
-                r'\$?([\d,]+\.?\d*).*(?:owed|debt|balance)'
-            ]
-
-            for pattern in amount_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    # Take the largest amount found
-                    amounts = []
-                    for match in matches:
-                        amount_str = str(match).replace('$', '').replace(',', '')
-                        try:
-                            amount = float(amount_str)
-                            if amount > 1000:  # Filter out small numbers that aren't loan amounts
-                                amounts.append(amount)
-                        except:
-                            continue
-                    
-                    if amounts:
-                        info['amount_owed'] = max(amounts)
-                        break
-
-            return info
-
+            response = self.session.get(url, ttl=self.DETAIL_CACHE_TTL)
+            response.raise_for_status()
         except Exception as e:
-            print(f"Error extracting detailed notice info: {e}", file=sys.stderr)
-            return {}
+            kind = 'individual' if isinstance(item, str) else 'detailed'
+            print(f"Error fetching {kind} notice {url}: {e}", file=sys.stderr)
+            return None
+        return item, url, response.text
 
     def _parse_individual_notices(self, soup):
         """Parse individual notice links and fetch details"""
-        notices = []
-
         try:
-            # Look for links to individual notices
-            notice_links = soup.find_all('a', href=True)
-            
-            for link in notice_links:
-                href = link.get('href')
-                
-                # Filter for notice-related links
-                if any(keyword in href.lower() for keyword in ['notice', 'mfdr', 'foreclosure']):
-                    full_url = self._resolve_url(href)
-                    notice = self._fetch_individual_notice(full_url)
-                    
-                    if notice:
-                        notices.append(notice)
-                    
-                    # Rate limiting
-                    time.sleep(1)
+            notice_urls = self._skip_unchanged(self._notice_link_urls(soup), self._url_fingerprint)
+
+            for url, notice in zip(notice_urls, self._fetch_in_order(_parse_individual_notice, notice_urls)):
+                if notice:
+                    yield notice
+                    self._remember(url, self._url_fingerprint)
 
         except Exception as e:
             print(f"Error parsing individual notices: {e}", file=sys.stderr)
 
-        return notices
+    def _notice_link_urls(self, soup):
+        """URLs of the index page's links to individual notices"""
+        # Look for links to individual notices
+        notice_links = soup.find_all('a', href=True)
+        notice_urls = []
+
+        for link in notice_links:
+            href = link.get('href')
+
+            # Filter for notice-related links
+            if any(keyword in href.lower() for keyword in ['notice', 'mfdr', 'foreclosure']):
+                notice_urls.append(self._resolve_url(href))
+        return notice_urls
+
+    def _row_fingerprint(self, notice):
+        identity = notice_identity(notice) or f"row:{notice['owner_name']}|{notice['address']}"
+        return identity, content_hash(notice['raw_data'])
+
+    def _url_fingerprint(self, url):
+        # Posted notice pages do not change, so the URL alone identifies the content
+        return f"url:{url}", ''
+
+    def _skip_unchanged(self, items, fingerprint):
+        """In incremental mode, drop items whose fingerprint is already in the state store"""
+        if self.state is None:
+            return items
+        return [item for item in items if self.state.check(*fingerprint(item)) != 'unchanged']
+
+    def _remember(self, item, fingerprint):
+        if self.state is not None:
+            self.state.mark(*fingerprint(item))
+
+    def _fetch_in_order(self, parse, items):
+        """Fetch each item's page and parse it, yielding results in input order"""
+        # Rate limiting happens in the session, and only for requests that miss the cache
+        if self.concurrency == 1 and self.parse_workers == 1:
+            for item in items:
+                page = self._fetch_detail_page(item)
+                if not page:
+                    yield None
+                    continue
+                with Timer('page', _item_url(item)):
+                    result = parse(page)
+                yield result
+            return
+
+        def throttled_fetch(item):
+            with self._host_slot(_item_url(item)):
+                return self._fetch_detail_page(item)
+
+        # Pages are fetched on `concurrency` threads and parsed on `parse_workers` processes; a bounded
+        # window of them stays in flight and results are released as the head completes
+        pipeline = FetchParsePipeline(throttled_fetch, parse, fetch_workers=self.concurrency,
+                                      parse_workers=self.parse_workers, label=_item_url)
+        try:
+            for _, result in pipeline.map(items):
+                yield result
+        finally:
+            pipeline.close()
+
+    def _host_slot(self, url):
+        """Semaphore bounding in-flight requests to the host of `url`"""
+        with self._host_slots_lock:
+            return self._host_slots[urlparse(url).netloc]
 
     def _resolve_url(self, href):
         """Resolve relative URLs to absolute URLs"""
@@ -268,132 +280,159 @@ class EHawaiiMFDRScraper:
         else:
             return f"{self.base_url}/notices/{href}"
 
-    def _fetch_individual_notice(self, url):
-        """Fetch and parse an individual notice page"""
-        try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract notice details
-            text_content = soup.get_text()
+def _item_url(item):
+    """URL of a detail page item: the link itself or a notice's view_link"""
+    return item if isinstance(item, str) else item.get('view_link', '')
+
+def _reparse_page(page):
+    """Records of an archived page tagged by iter_archived_notices; runs in a parse worker"""
+    kind, payload = page
+    if kind == 'index':
+        return payload
+    row, individual, url, html = payload
+    notices = []
+    if row is not None:
+        notices.append(_parse_detailed_notice((row, url, html)))
+    if individual:
+        notices.append(_parse_individual_notice((url, url, html)))
+    return [notice for notice in notices if notice]
+
+def _parse_detailed_notice(page):
+    """A table row's notice merged with the details of its notice page; runs in a parse worker"""
+    notice, url, html = page
+    try:
+        soup = make_soup(html)
+        
+        # Extract detailed information from the notice page
+        text_content = soup.get_text()
+        
+        # Parse additional details
+        details = _extract_detailed_notice_info(text_content)
+        
+        if details:
+            # Merge with original notice data
+            detailed_notice = notice.copy()
+            detailed_notice.update(details)
+            detailed_notice['source_url'] = url
+            detailed_notice['has_details'] = True
+            tag_canonical_tmk(detailed_notice)
             
-            # Parse property information from the notice text
-            property_info = self._extract_notice_details(text_content)
+            return detailed_notice
+
+    except Exception as e:
+        print(f"Error fetching detailed notice {url}: {e}", file=sys.stderr)
+
+    return None
+
+@stage('extract')
+def _extract_detailed_notice_info(text):
+    """Extract detailed information from full notice text"""
+    try:
+        return extract_detailed_notice_fields(text)
+
+    except Exception as e:
+        print(f"Error extracting detailed notice info: {e}", file=sys.stderr)
+        return {}
+
+def _parse_individual_notice(page):
+    """Parse an individual notice page; runs in a parse worker"""
+    _, url, html = page
+    try:
+        soup = make_soup(html)
+        
+        # Extract notice details
+        text_content = soup.get_text()
+        
+        # Parse property information from the notice text
+        property_info = _extract_notice_details(text_content)
+        
+        if property_info:
+            property_info.update({
+                'source': 'ehawaii_mfdr',
+                'source_url': url,
+                'scraped_at': datetime.now().isoformat()
+            })
             
-            if property_info:
-                property_info.update({
-                    'source': 'ehawaii_mfdr',
-                    'source_url': url,
-                    'scraped_at': datetime.now().isoformat()
-                })
-                
-                return property_info
+            return property_info
 
-        except Exception as e:
-            print(f"Error fetching individual notice {url}: {e}", file=sys.stderr)
+    except Exception as e:
+        print(f"Error fetching individual notice {url}: {e}", file=sys.stderr)
 
-        return None
+    return None
 
-    def _extract_notice_details(self, text):
-        """Extract property details from notice text"""
-        info = {}
+@stage('extract')
+def _extract_notice_details(text):
+    """Extract property details from notice text"""
+    try:
+        info = extract_notice_fields(text)
 
-        try:
-            # Case number
-            case_match = re.search(r'(Case|MFDR|FC|CV)\s*[#:]?\s*([A-Z0-9-]+)', text, re.IGNORECASE)
-            if case_match:
-                info['case_number'] = case_match.group(2)
-
-            # Property address
-            address_patterns = [
-                r'(?:Property|Subject Property|Real Property|Located at):\s*([^\n]+(?:Street|St|Avenue|Ave|Road|Rd|Lane|Ln|Drive|Dr|Circle|Cir|Boulevard|Blvd|Way|Place|Pl|Court|Ct)[^\n]*)',
-                r'(\d+[^\n]+(?:Street|St|Avenue|Ave|Road|Rd|Lane|Ln|Drive|Dr|Circle|Cir|Boulevard|Blvd|Way|Place|Pl|Court|Ct)[^\n]*Hawaii[^\n]*\d{5})'
-            ]
-
-            for pattern in address_patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-                if match:
-                    info['address'] = match.group(1).strip()
-                    break
-
-            # Borrower/Defendant name
-            borrower_patterns = [
-                r'(?:Borrower|Defendant|Mortgagor):\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-                r'vs\.?\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-            ]
-
-            for pattern in borrower_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    info['borrower_name'] = match.group(1).strip()
-                    break
-
-            # Notice date
-            date_patterns = [
-                r'(?:Notice Date|Filed|Date of Notice):\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-                r'(\w+\s+\d+,?\s+\d{4})'
-            ]
-
-            for pattern in date_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    info['notice_date'] = match.group(1).strip()
-                    break
-
-            # Loan amount
-            amount_match = re.search(r'\$[\d,]+\.?\d*', text)
-            if amount_match:
-                amount_str = amount_match.group().replace('$', '').replace(',', '')
-                try:
-                    info['amount_owed'] = float(amount_str)
-                except:
-                    pass
-
-            # Set status
-            info['status'] = 'mfdr_notice'
-
-            return info if info else None
+        # Set status
+        info['status'] = 'mfdr_notice'
 
-        except Exception as e:
-            print(f"Error extracting notice details: {e}", file=sys.stderr)
-            return None
+        return info if info else None
+
+    except Exception as e:
+        print(f"Error extracting notice details: {e}", file=sys.stderr)
+        return None
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Scrape eHawaii MFDR foreclosure notices")
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help="Concurrent detail-page fetches per host (1 = serial)")
+    parser.add_argument('--rate', type=float, default=None,
+                        help="Request rate to the MFDR host in requests/sec (default: one per worker)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only emit notices not seen (or changed) since the previous incremental run")
+    parser.add_argument('--state-file', default=None,
+                        help="Seen-notice state file used with --incremental")
+    add_pipeline_arguments(parser)
+    add_archive_arguments(parser)
+    add_instrumentation_arguments(parser)
+    add_output_arguments(parser)
+    return parser
+
+def create_scraper(args):
+    state = NoticeStateStore.for_source('ehawaii_mfdr', args.state_file) if args.incremental else None
+    return EHawaiiMFDRScraper(concurrency=args.concurrency, rate=args.rate, state=state,
+                              parse_workers=parse_worker_count(args.parse_workers))
+
+def iter_records(scraper, args):
+    if args.reparse_archive:
+        return scraper.iter_archived_notices(parse_worker_count(args.parse_workers, default=0), args.archive_since)
+    return scraper.iter_mfdr_notices()
 
 if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    run = ScraperRun.from_args('ehawaii_mfdr', args)
+
+    install_sigterm_handler()
+    writer = RecordWriter(ndjson=args.ndjson, dedupe=args.dedupe, score=args.score,
+                          raw_text=args.raw_text)
+    scraper = None
+    complete = False
+
     try:
-        scraper = EHawaiiMFDRScraper()
-        notices = scraper.scrape_mfdr_notices()
+        scraper = create_scraper(args)
+        writer.write_all(iter_records(scraper, args))
+        complete = True
 
-        print(f"Debug: Found {len(notices)} MFDR notices", file=sys.stderr)
+        print(f"Debug: Found {writer.count} MFDR notices", file=sys.stderr)
+        scraper.session.report_cache_stats()
 
-        # Only add mock data if absolutely no notices found and we want to test the pipeline
-        if not notices:
+        # Mock data is intentionally not emitted when the MFDR site returns nothing
+        if not writer.count:
             print("Debug: No real notices found from MFDR site", file=sys.stderr)
-            # Uncomment below for testing with mock data
-            # notices = [
-            #     {
-            #         'case_number': 'MFDR-2024-001',
-            #         'address': '456 MFDR Lane, Honolulu, HI 96815',
-            #         'borrower_name': 'David Kim',
-            #         'notice_date': '2024-01-15',
-            #         'amount_owed': 425000,
-            #         'status': 'mfdr_notice',
-            #         'source': 'ehawaii_mfdr',
-            #         'source_url': 'https://mfdr.ehawaii.gov/notices/index.html',
-            #         'scraped_at': datetime.now().isoformat()
-            #     }
-            # ]
-
-        # Ensure we always output valid JSON
-        if notices:
-            print(json.dumps(notices, default=str))
-        else:
-            print("[]")
 
     except Exception as e:
         print(f"Debug: Error in main execution: {e}", file=sys.stderr)
-        # Always output valid JSON, even on error
-        print("[]")
     finally:
-        sys.stdout.flush()
+        summary = {'source': 'ehawaii_mfdr'}
+        if scraper:
+            summary['transport'] = scraper.session.transport_summary()
+        if scraper and scraper.state:
+            scraper.state.save()
+            summary['incremental'] = scraper.state.summary()
+            print(json.dumps({'incremental': scraper.state.summary()}), file=sys.stderr)
+        # Always output valid JSON, even on error
+        writer.finish(complete=complete, **summary)
+        run.finish(records=writer.count)
@@ -0,0 +1,222 @@
+import glob
+import json
+import os
+import threading
+from datetime import date, timedelta
+
+import requests
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from disk_cache import DEFAULT_CACHE_ROOT
+
+# Notices per Honolulu delinquency page in the synthetic site
+TAX_PAGE_ROWS = 500
+
+# Notices per Star-Advertiser listing page in the synthetic site
+STAR_PAGE_NOTICES = 1000
+
+STREETS = ['Kalakaua Ave', 'Beretania St', 'Kapahulu Ave', 'Kamehameha Hwy', 'Kailua Rd', 'Ala Moana Blvd', 'Pali Hwy']
+TOWNS = [('Honolulu', '96813'), ('Kailua', '96734'), ('Pearl City', '96782'), ('Kaneohe', '96744'), ('Waipahu', '96797')]
+NAMES = ['Jane Kealoha', 'Robert Chen', 'Leilani Akana', 'David Nakamura', 'Maria Santos', 'Kevin Lee']
+FIRMS = ['Kealoha & Wong LLP', 'Pacific Law Group', 'Aloha Legal Associates']
+
+def _normalize(url):
+    return requests.Request('GET', url).prepare().url
+
+class FixtureAdapter(BaseAdapter):
+    """Transport adapter answering every request from a {url: html} map instead of the network
+
+    Unknown URLs get a 404. Mount it on a session for http:// and https://
+    and the scraper runs unchanged, with no sockets, DNS or TLS involved.
+    """
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = {
+            _normalize(url): body.encode('utf-8') if isinstance(body, str) else body
+            for url, body in pages.items()
+        }
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requests += 1
+
+        body = self.pages.get(request.url)
+        response = requests.Response()
+        response.status_code = 200 if body is not None else 404
+        response.reason = 'OK' if body is not None else 'Not Found'
+        response._content = body if body is not None else b''
+        response.encoding = 'utf-8'
+        response.headers = CaseInsensitiveDict({'Content-Type': 'text/html; charset=utf-8'})
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+def recorded_pages(namespace):
+    """Pages stored by a scraper's HTTP cache, as a {url: html} map"""
+    pages = {}
+    for meta_path in glob.glob(os.path.join(DEFAULT_CACHE_ROOT, 'http', namespace, '*', '*.json')):
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(meta_path[:-len('.json')] + '.bin', 'rb') as f:
+                pages[meta['url']] = f.read().decode(meta.get('encoding') or 'utf-8', 'replace')
+        except (OSError, ValueError, KeyError):
+            continue
+    return pages
+
+def _page(title, body):
+    chrome = ''.join(f'<li class="menu-item"><a href="/section/{i}">Section {i}</a></li>' for i in range(15))
+    return (
+        f'<html><head><title>{title}</title><script>var config = {{}};</script></head>'
+        f'<body><nav><ul>{chrome}</ul></nav><main>{body}</main><footer><ul>{chrome}</ul></footer></body></html>'
+    )
+
+def _property(i):
+    """Owner, street address and town of synthetic notice `i`"""
+    town, zip_code = TOWNS[i % len(TOWNS)]
+    address = f"{100 + i % 9000} {STREETS[i % len(STREETS)]}, {town}, HI {zip_code}"
+    return NAMES[i % len(NAMES)], address
+
+def notice_text(i):
+    """Body of a foreclosure notice carrying every field the extractors look for"""
+    owner, address = _property(i)
+    month = ['January', 'February', 'March', 'April', 'May', 'June'][i % 6]
+    return (
+        f"NOTICE OF MORTGAGEE'S INTENTION TO FORECLOSE UNDER POWER OF SALE. "
+        f"Case No. 1CC{24000000 + i}. Notice Date: {month} {i % 28 + 1}, 2024. "
+        f"Borrower: {owner}. Property Address: {address}. "
+        f"TMK: (1) {i % 10}-{i % 9 + 1}-{i % 100:03d}:{i % 1000:03d}. "
+        f"The unpaid principal balance of ${200000 + i * 7 % 500000:,}.00 is owed to the mortgagee. "
+        f"Public auction on {month} {i % 28 + 1}, 2025 at 12:00 p.m. at the front entrance of the "
+        f"Circuit Court. For information contact {FIRMS[i % len(FIRMS)]}, Attorney for Mortgagee."
+    )
+
+def mfdr_site(scraper, count):
+    """Notice index with `count` rows plus one detail page per notice"""
+    pages = {}
+    rows = []
+    for i in range(count):
+        owner, address = _property(i)
+        path = f"/notices/view/{i}"
+        rows.append(
+            f'<tr><td>{owner}</td><td>{address}</td><td>01/{i % 28 + 1:02d}/2024</td>'
+            f'<td><a href="{path}">View</a></td></tr>'
+        )
+        pages[f"{scraper.base_url}{path}"] = _page(f"Notice {i}", f'<div class="notice-body"><p>{notice_text(i)}</p></div>')
+
+    header = '<tr><th>Owner</th><th>Address</th><th>Posting Date</th><th>View</th></tr>'
+    pages[scraper.notices_url] = _page('MFDR Notices', f'<table>{header}{"".join(rows)}</table>')
+    return pages
+
+def honolulu_tax_site(scraper, count):
+    """Treasury page linking to delinquency lists of TAX_PAGE_ROWS properties each"""
+    pages = {}
+    links = []
+    header = '<tr><th>Address</th><th>Parcel</th><th>Owner</th><th>Amount Owed</th></tr>'
+    for page, start in enumerate(range(0, count, TAX_PAGE_ROWS)):
+        rows = []
+        for i in range(start, min(start + TAX_PAGE_ROWS, count)):
+            owner, address = _property(i)
+            rows.append(
+                f'<tr><td>{address}</td><td>1{i:08d}</td><td>{owner}</td><td>${1000 + i * 37 % 90000:,}.00</td></tr>'
+            )
+        path = f"/bfs/treasury-division/delinquent-properties-{page}"
+        links.append(f'<li><a href="{path}">Delinquent property list {page}</a></li>')
+        pages[f"{scraper.base_url}{path}"] = _page(f"Delinquent properties {page}", f'<table>{header}{"".join(rows)}</table>')
+
+    pages[scraper.treasury_url] = _page('Treasury Division', f'<ul class="links">{"".join(links)}</ul>')
+    return pages
+
+def star_advertiser_site(scraper, count, days=5):
+    """Paginated foreclosure and auction listings splitting `count` notices between them, newest
+    first and posted over the last `days` days"""
+    today = date.today()
+
+    def listing(search_type, title, start, stop):
+        pages = {}
+        total = max(1, stop - start)
+        for page, first in enumerate(range(start, stop, STAR_PAGE_NOTICES), 1):
+            notices = ''.join(
+                f'<div class="legal-notice"><h3>{title} {i}</h3>'
+                f'<time datetime="{today - timedelta(days=(i - start) * days // total)}"></time>'
+                f'<div class="content">{notice_text(i)}</div></div>'
+                for i in range(first, min(first + STAR_PAGE_NOTICES, stop))
+            )
+            pages[scraper._listing_url(search_type, page)] = _page(f"{search_type.title()} page {page}", notices)
+        return pages
+
+    half = count // 2
+    return {
+        **listing('foreclosures', 'NOTICE OF FORECLOSURE SALE', 0, count - half),
+        **listing('auctions', 'NOTICE OF PUBLIC SALE', count - half, count),
+    }
+
+def _case_pages(case):
+    """Text lines of each page of synthetic court case `case`, which runs one to three pages"""
+    owner, address = _property(case)
+    docket = f"1CC24-1-{case:06d}"
+    caption = [
+        'IN THE CIRCUIT COURT OF THE FIRST CIRCUIT', 'STATE OF HAWAII',
+        f"CIVIL NO. {docket} (Foreclosure)",
+    ]
+    filler = [
+        'Plaintiff is the holder of the promissory note and mortgage described herein and is',
+        'entitled to enforce them. Defendant failed to make the monthly payments when due and',
+        'the default has not been cured within the period provided by the mortgage.',
+    ] * 10
+    first = caption + [
+        'BANK OF HAWAII, Plaintiff,', f"vs. {owner}, Defendant.",
+        f"Defendant: {owner}", f"Property Address: {address}",
+        f"TMK: (1) {case % 10}-{case % 9 + 1}-{case % 100:03d}:{case % 1000:03d}",
+    ] + filler
+    last = [
+        f"The unpaid principal balance of ${150000 + case * 13 % 600000:,}.00 is owed to Plaintiff.",
+        f"Attorney: {FIRMS[case % len(FIRMS)]}, Attorney for Plaintiff",
+    ]
+    pages = [first] + [[f"CIVIL NO. {docket}"] + filler for _ in range(case % 3)]
+    pages[-1] = pages[-1] + last
+    return pages
+
+def write_judiciary_docket(path, pages):
+    """Write a text PDF of `pages` pages of foreclosure cases, like a court docket export"""
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+    }))
+    written = 0
+    case = 0
+    while written < pages:
+        for lines in _case_pages(case)[:pages - written]:
+            escaped = (line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in lines)
+            content = DecodedStreamObject()
+            content.set_data(('BT /F1 9 Tf 54 740 Td 12 TL\n' + ''.join(f"({line}) Tj T*\n" for line in escaped) + 'ET').encode('latin-1'))
+
+            page = PageObject.create_blank_page(width=612, height=792)
+            page[NameObject('/Contents')] = content
+            page[NameObject('/Resources')] = DictionaryObject({
+                NameObject('/Font'): DictionaryObject({NameObject('/F1'): font})
+            })
+            writer.add_page(page)
+            written += 1
+        case += 1
+
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+# Source name -> builder of a synthetic site with a given number of notices
+SYNTHETIC_SITES = {
+    'honolulu_tax': honolulu_tax_site,
+    'ehawaii_mfdr': mfdr_site,
+    'star_advertiser': star_advertiser_site,
+}
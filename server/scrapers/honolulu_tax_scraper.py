@@ -1,175 +1,284 @@
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 import json
 import time
-import random
 import sys
+import argparse
+
+from address_normalizer import has_street_suffix
+from crawl_frontier import CrawlFrontier
+from html_parsing import LINKS, TABLES, AnyOf, make_soup
+from http_cache import CachedSession
+from instrumentation import ScraperRun, add_instrumentation_arguments, stage
+from page_archive import add_archive_arguments, iter_reparsed
+from pipeline import FetchParsePipeline, add_pipeline_arguments, parse_worker_count
+from record_output import RecordWriter, add_output_arguments, install_sigterm_handler
+from records import TaxDelinquency
+from tmk import HONOLULU, tag_canonical_tmk
+
+# Words marking the links worth following, weighted by how often their pages list properties
+LINK_KEYWORDS = {'delinquent': 3, 'tax-sale': 3, 'auction': 2, 'foreclosure': 1}
+LISTING_PAGE_BONUS = 2
+
+def _link_priority(href, text):
+    """Summed weights of the keywords in a link's href and text; 0 for links not worth following"""
+    href = href.lower()
+    text = text.lower()
+    return sum(weight for keyword, weight in LINK_KEYWORDS.items() if keyword in href or keyword in text)
+
+def _is_property_class(css_class):
+    return css_class and any(keyword in css_class.lower() for keyword in ['property', 'delinquent', 'tax'])
+
+# Delinquency pages are read only for their tables and property containers, plus links when followed
+PROPERTY_CONTAINERS = SoupStrainer(['div', 'section'], class_=_is_property_class)
+LISTING_PARSE_ONLY = AnyOf(TABLES, PROPERTY_CONTAINERS)
+LISTING_AND_LINKS = AnyOf(TABLES, PROPERTY_CONTAINERS, LINKS)
 
 class HonoluluTaxScraper:
-    def __init__(self):
+    # Treasury pages and delinquency lists are republished at most daily
+    CACHE_TTL = 12 * 3600
+
+    # One request per 1.5s on average, with two allowed back to back
+    REQUEST_RATE = 2 / 3
+    REQUEST_BURST = 2
+
+    # Delinquency lists are published on the city site; links elsewhere are not followed
+    ALLOWED_HOSTS = ('www.honolulu.gov', 'honolulu.gov')
+
+    # Pages reached from the treasury page (1), and the pages those link to (2)
+    MAX_DEPTH = 2
+    MAX_PAGES = 200
+
+    def __init__(self, max_depth=MAX_DEPTH, max_pages=MAX_PAGES, parse_workers=1):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.parse_workers = parse_workers
         self.base_url = "https://www.honolulu.gov"
         self.treasury_url = f"{self.base_url}/bfs/treasury-division"
-        self.session = requests.Session()
+        self.session = CachedSession('honolulu_tax', ttl=self.CACHE_TTL)
+        self.session.rate_limiter.configure(self.base_url, self.REQUEST_RATE, burst=self.REQUEST_BURST)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
 
     def search_delinquent_properties(self, zip_codes=None):
         """Search for delinquent properties from Honolulu Treasury Division"""
+        return list(self.iter_delinquent_properties(zip_codes))
+
+    def iter_delinquent_properties(self, zip_codes=None):
+        """Yield delinquent properties page by page as they are scraped
+
+        Pages come from a crawl frontier seeded with the treasury page: each
+        linked page is fetched once however often it is linked, the most
+        promising links first, within the depth and page budgets. Pages are
+        fetched on a thread and parsed on `parse_workers` processes, and
+        their links go back to the frontier as each page is read.
+        """
+        frontier = CrawlFrontier(self.ALLOWED_HOSTS, self.max_depth, self.max_pages)
+        frontier.add(self.treasury_url)
+        pipeline = FetchParsePipeline(self._fetch_page, _scrape_delinquent_page, parse_workers=self.parse_workers,
+                                      label=lambda item: item[0])
         try:
-            # Get the main treasury page to find delinquent property links
-            response = self.session.get(self.treasury_url)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            properties = []
-
-            # Look for delinquent property information or links
-            delinquent_links = soup.find_all('a', href=True)
-            for link in delinquent_links:
-                href = link.get('href', '').lower()
-                text = link.get_text().lower()
-
-                # Look for tax sale, delinquent, or auction related links
-                if any(keyword in href or keyword in text for keyword in 
-                       ['delinquent', 'tax-sale', 'auction', 'foreclosure']):
-                    full_url = href if href.startswith('http') else f"{self.base_url}{href}"
-                    try:
-                        sub_properties = self._scrape_delinquent_page(full_url)
-                        properties.extend(sub_properties)
-                        time.sleep(random.uniform(1, 2))  # Rate limiting
-                    except Exception as e:
-                        print(f"Error scraping {full_url}: {e}")
+            # A round ends when the frontier runs dry; the links of the pages still in flight start the next
+            while frontier:
+                for (url, depth), page in pipeline.map(iter(frontier)):
+                    if page is None:
                         continue
-
-            return properties
-
-        except Exception as e:
-            print(f"Error accessing treasury division: {e}")
-            return []
-
-    def _scrape_delinquent_page(self, url):
-        """Scrape a specific delinquent property page"""
+                    properties, links = page
+                    for href, priority in links:
+                        # Links off a page that listed properties (its next page, its siblings) go first
+                        if properties:
+                            priority += LISTING_PAGE_BONUS
+                        frontier.add(href, base=url, depth=depth + 1, priority=priority)
+                    yield from properties
+        finally:
+            pipeline.close()
+            frontier.report('honolulu_tax')
+
+    def iter_archived_properties(self, parse_workers=1, since=None):
+        """Yield the properties of every archived page, parsed as a crawl would parse it, without fetching"""
+        def page(url, html):
+            return url, html, 0 if url == self.treasury_url else 1, False
+
+        return iter_reparsed(self.session.archive, page, _reparse_delinquent_page, parse_workers, since)
+
+    def _fetch_page(self, item):
+        """A page as (url, html, depth, whether its links are followed), or None when it cannot be fetched"""
+        url, depth = item
         try:
             response = self.session.get(url)
             response.raise_for_status()
+        except Exception as e:
+            if depth == 0:
+                print(f"Error accessing treasury division: {e}", file=sys.stderr)
+            else:
+                print(f"Error scraping page {url}: {e}", file=sys.stderr)
+            return None
+        return url, response.text, depth, depth < self.max_depth
+
+def _scrape_delinquent_page(page):
+    """Properties and worthwhile (href, priority) links of a fetched page; runs in a parse worker
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            properties = []
+    The treasury page is read for links only, the pages below it for their
+    property tables and containers, and for links while above the depth limit.
+    """
+    url, html, depth, follow_links = page
+    try:
+        if depth == 0:
+            parse_only = LINKS
+        else:
+            parse_only = LISTING_AND_LINKS if follow_links else LISTING_PARSE_ONLY
+        soup = make_soup(html, parse_only)
+        properties = []
+        links = []
 
+        if depth:
             # Look for tables or lists containing property information
             tables = soup.find_all('table')
             for table in tables:
                 rows = table.find_all('tr')
                 for row in rows[1:]:  # Skip header row
-                    property_data = self._parse_property_row(row)
+                    property_data = _parse_property_row(row)
                     if property_data:
                         property_data['source_url'] = url
                         properties.append(property_data)
 
             # Also look for structured data in divs or other containers
-            property_containers = soup.find_all(['div', 'section'], class_=lambda x: x and any(
-                keyword in x.lower() for keyword in ['property', 'delinquent', 'tax']
-            ))
+            property_containers = soup.find_all(['div', 'section'], class_=_is_property_class)
 
             for container in property_containers:
-                property_data = self._parse_property_container(container)
+                property_data = _parse_property_container(container)
                 if property_data:
                     property_data['source_url'] = url
                     properties.append(property_data)
 
-            return properties
+        if follow_links:
+            # Tax-sale, delinquency, auction and foreclosure links, by expected yield
+            for link in soup.find_all('a', href=True):
+                priority = _link_priority(link['href'], link.get_text())
+                if priority:
+                    links.append((link['href'], priority))
 
-        except Exception as e:
-            print(f"Error scraping page {url}: {e}")
-            return []
+        return properties, links
 
-    def _parse_property_container(self, container):
-        """Parse property data from a container element"""
-        try:
-            text = container.get_text()
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-
-            # Look for address patterns
-            address = None
-            for line in lines:
-                if any(indicator in line.lower() for indicator in ['street', 'ave', 'rd', 'blvd', 'way', 'dr']):
-                    address = line
-                    break
-
-            if not address:
-                return None
-
-            # Extract other information
-            property_data = {
-                'address': address,
-                'status': 'tax_delinquent',
-                'source': 'honolulu_tax',
-                'amount_owed': 0,
-                'owner_name': '',
-                'parcel_number': ''
-            }
-
-            # Look for monetary amounts
-            for line in lines:
-                if '$' in line:
-                    try:
-                        amount = self._parse_amount(line)
-                        if amount > 0:
-                            property_data['amount_owed'] = amount
-                            break
-                    except:
-                        continue
+    except Exception as e:
+        print(f"Error scraping page {url}: {e}", file=sys.stderr)
+        return [], []
 
-            return property_data
+def _reparse_delinquent_page(page):
+    return _scrape_delinquent_page(page)[0]
 
-        except Exception as e:
-            print(f"Error parsing property container: {e}")
+@stage('extract')
+def _parse_property_container(container):
+    """Parse property data from a container element"""
+    try:
+        text = container.get_text()
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+
+        # Look for address patterns
+        address = None
+        for line in lines:
+            if has_street_suffix(line):
+                address = line
+                break
+
+        if not address:
             return None
 
+        # Extract other information
+        property_data = TaxDelinquency(address=address)
 
+        # Look for monetary amounts
+        for line in lines:
+            if '$' in line:
+                try:
+                    amount = _parse_amount(line)
+                    if amount > 0:
+                        property_data['amount_owed'] = amount
+                        break
+                except:
+                    continue
 
-    def _parse_property_row(self, row):
-        """Parse a single property row from search results"""
-        try:
-            cells = row.find_all('td')
-            if len(cells) < 4:
-                return None
-
-            return {
-                'address': cells[0].text.strip() if cells[0] else '',
-                'parcel_number': cells[1].text.strip() if cells[1] else '',
-                'owner_name': cells[2].text.strip() if cells[2] else '',
-                'amount_owed': self._parse_amount(cells[3].text.strip()) if cells[3] else 0,
-                'status': 'tax_delinquent',
-                'source': 'honolulu_tax',
-                'source_url': self.search_url
-            }
-        except Exception as e:
-            print(f"Error parsing property row: {e}")
+        return property_data
+
+    except Exception as e:
+        print(f"Error parsing property container: {e}", file=sys.stderr)
+        return None
+
+@stage('extract')
+def _parse_property_row(row):
+    """Parse a single property row from search results"""
+    try:
+        cells = row.find_all('td')
+        if len(cells) < 4:
             return None
 
-    def _parse_amount(self, amount_str):
-        """Parse monetary amount from string"""
-        try:
-            return float(amount_str.replace('$', '').replace(',', ''))
-        except:
-            return 0
+        # Honolulu parcel numbers usually omit the island digit
+        return tag_canonical_tmk(TaxDelinquency(
+            address=cells[0].text.strip() if cells[0] else '',
+            parcel_number=cells[1].text.strip() if cells[1] else '',
+            owner_name=cells[2].text.strip() if cells[2] else '',
+            amount_owed=_parse_amount(cells[3].text.strip()) if cells[3] else 0,
+        ), default_island=HONOLULU)
+    except Exception as e:
+        print(f"Error parsing property row: {e}", file=sys.stderr)
+        return None
+
+def _parse_amount(amount_str):
+    """Parse monetary amount from string"""
+    try:
+        return float(amount_str.replace('$', '').replace(',', ''))
+    except:
+        return 0
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Scrape Honolulu tax-delinquent properties")
+    parser.add_argument('--max-depth', type=int, default=HonoluluTaxScraper.MAX_DEPTH,
+                        help="Links followed away from the treasury page (default: %(default)s)")
+    parser.add_argument('--max-pages', type=int, default=HonoluluTaxScraper.MAX_PAGES,
+                        help="Pages fetched per run, the treasury page included (default: %(default)s)")
+    add_pipeline_arguments(parser)
+    add_archive_arguments(parser)
+    add_instrumentation_arguments(parser)
+    add_output_arguments(parser)
+    return parser
+
+def create_scraper(args):
+    return HonoluluTaxScraper(max_depth=args.max_depth, max_pages=args.max_pages,
+                              parse_workers=parse_worker_count(args.parse_workers))
+
+def iter_records(scraper, args):
+    if args.reparse_archive:
+        return scraper.iter_archived_properties(parse_worker_count(args.parse_workers, default=0),
+                                                args.archive_since)
+    return scraper.iter_delinquent_properties()
 
 if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    run = ScraperRun.from_args('honolulu_tax', args)
+
+    install_sigterm_handler()
+    writer = RecordWriter(ndjson=args.ndjson, dedupe=args.dedupe, score=args.score,
+                          raw_text=args.raw_text)
+    scraper = None
+    complete = False
+
     try:
-        scraper = HonoluluTaxScraper()
+        scraper = create_scraper(args)
 
         # Search for delinquent properties from the real government site
-        properties = scraper.search_delinquent_properties()
+        writer.write_all(iter_records(scraper, args))
+        complete = True
 
-        print(f"Debug: Found {len(properties)} properties from real scraping", file=sys.stderr)
+        print(f"Debug: Found {writer.count} properties from real scraping", file=sys.stderr)
+        scraper.session.report_cache_stats()
 
-        # Add mock data if no properties found (for testing purposes)
-        if not properties:
+        # Add mock data if no properties found (for testing purposes); never when re-parsing the archive
+        if args.reparse_archive and not writer.count:
+            print("Debug: No properties re-parsed from the page archive", file=sys.stderr)
+        elif not writer.count:
             print("Debug: No real properties found, using mock data", file=sys.stderr)
-            properties = [
+            writer.write_all([
                 {
                     'address': '456 Tax Lien Ave, Pearl City, HI 96782',
                     'status': 'tax_delinquent',
@@ -194,17 +303,14 @@ if __name__ == "__main__":
                     'source_url': 'https://www.honolulu.gov/bfs/treasury-division',
                     'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
                 }
-            ]
-
-        # Ensure we always output valid JSON
-        if properties:
-            print(json.dumps(properties, default=str))
-        else:
-            print("[]")
+            ])
 
     except Exception as e:
         print(f"Debug: Error in main execution: {e}", file=sys.stderr)
-        # Always output valid JSON, even on error
-        print("[]")
     finally:
-        sys.stdout.flush()
\ No newline at end of file
+        summary = {'source': 'honolulu_tax'}
+        if scraper:
+            summary['transport'] = scraper.session.transport_summary()
+        # Always output valid JSON, even on error
+        writer.finish(complete=complete, **summary)
+        run.finish(records=writer.count)
@@ -0,0 +1,132 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from disk_cache import DEFAULT_CACHE_ROOT
+from honolulu_tax_scraper import LISTING_PARSE_ONLY, _is_property_class
+from html_parsing import HTML_PARSER, LINKS, TABLES_AND_LINKS, make_soup
+from staradvertiser_foreclosure_scraper import NOTICE_CONTAINERS, NOTICE_SELECTOR
+
+# Page kind -> (strainer the scraper parses with, what the scraper then reads from the soup)
+TARGETS = {
+    'mfdr_index': (TABLES_AND_LINKS, lambda soup: (
+        [[td.get_text(strip=True) for td in tr.find_all('td')] for tr in soup.find_all('tr')],
+        [a['href'] for a in soup.find_all('a', href=True)],
+    )),
+    'tax_index': (LINKS, lambda soup: [a['href'] for a in soup.find_all('a', href=True)]),
+    'tax_listing': (LISTING_PARSE_ONLY, lambda soup: (
+        [[td.text.strip() for td in tr.find_all('td')] for tr in soup.find_all('tr')],
+        [c.get_text() for c in soup.find_all(['div', 'section'], class_=_is_property_class)],
+    )),
+    'star_listing': (NOTICE_CONTAINERS, lambda soup: [
+        notice.get_text() for notice in soup.select(NOTICE_SELECTOR)
+    ]),
+}
+
+def synthetic_page(rows):
+    """A listing page with `rows` entries of every kind the scrapers look for, inside typical site chrome"""
+    chrome = ''.join(
+        f'<li class="menu-item"><a href="/section/{i}">Section {i}</a><span>Navigation text</span></li>'
+        for i in range(200)
+    )
+    table_rows = ''.join(
+        f'<tr><td>Owner {i}</td><td>{i} Kalakaua Ave, Honolulu, HI 96815</td><td>01/{i % 28 + 1:02d}/2024</td>'
+        f'<td><a href="/mfdr/notice/{i}">View</a></td></tr>'
+        for i in range(rows)
+    )
+    notices = ''.join(
+        f'<div class="legal-notice"><h3>NOTICE OF FORECLOSURE SALE {i}</h3><div class="content">'
+        f'Property located at {i} Beretania Street, Honolulu. Mortgagor: Jane Kealoha. Auction on '
+        f'March 5, 2024 at 12:00 p.m.</div></div><div class="property-card">{i} Kapahulu Ave<br>$1,{i:03d}.00</div>'
+        for i in range(rows)
+    )
+    script = '<script>' + 'var x = 1;' * 2000 + '</script>'
+    return (
+        f'<html><head><title>Listings</title>{script}</head><body><nav><ul>{chrome}</ul></nav>'
+        f'<table><tr><th>Owner</th><th>Address</th><th>Posted</th><th>View</th></tr>{table_rows}</table>'
+        f'{notices}<footer>{chrome}</footer></body></html>'
+    )
+
+def cached_pages():
+    """HTML bodies stored by the scrapers' HTTP cache"""
+    pages = []
+    for meta_path in glob.glob(os.path.join(DEFAULT_CACHE_ROOT, '*', '*', '*.json')):
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if 'html' not in meta.get('headers', {}).get('Content-Type', ''):
+                continue
+            with open(meta_path[:-len('.json')] + '.bin', 'rb') as f:
+                body = f.read().decode(meta.get('encoding') or 'utf-8', 'replace')
+            pages.append((meta.get('url', meta_path), body))
+        except (OSError, ValueError):
+            continue
+    return pages
+
+def measure(parse, repeat):
+    """Best wall time over `repeat` parses, then the peak traced memory of one parse"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    soup = parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del soup
+    return best, peak
+
+def benchmark_page(html, targets, repeat):
+    baseline_soup = BeautifulSoup(html, 'html.parser')
+    baseline_time, baseline_peak = measure(lambda: BeautifulSoup(html, 'html.parser'), repeat)
+    results = {}
+    for kind in targets:
+        parse_only, read = TARGETS[kind]
+        targeted_time, targeted_peak = measure(lambda: make_soup(html, parse_only), repeat)
+        results[kind] = {
+            'same_output': read(baseline_soup) == read(make_soup(html, parse_only)),
+            'html_parser_ms': round(baseline_time * 1000, 2),
+            'targeted_ms': round(targeted_time * 1000, 2),
+            'speedup': round(baseline_time / targeted_time, 1),
+            'html_parser_peak_kb': baseline_peak // 1024,
+            'targeted_peak_kb': targeted_peak // 1024,
+            'memory_ratio': round(baseline_peak / max(targeted_peak, 1), 1),
+        }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare full html.parser parsing with the scrapers' targeted parsing on saved pages")
+    parser.add_argument('pages', nargs='*',
+                        help="Saved HTML files (default: pages in the scrapers' HTTP cache)")
+    parser.add_argument('--synthetic', type=int, metavar='ROWS', default=None,
+                        help="Benchmark a generated listing page with ROWS entries instead")
+    parser.add_argument('--target', choices=sorted(TARGETS), action='append',
+                        help="Page kind to benchmark (repeatable; default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed parses per measurement")
+    args = parser.parse_args()
+
+    if args.synthetic is not None:
+        pages = [(f"synthetic:{args.synthetic}", synthetic_page(args.synthetic))]
+    elif args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, 'rb') as f:
+                pages.append((path, f.read().decode('utf-8', 'replace')))
+    else:
+        pages = cached_pages()
+
+    if not pages:
+        parser.error("No saved pages found; pass HTML files, or --synthetic ROWS")
+
+    print(f"Targeted parser: {HTML_PARSER}", file=sys.stderr)
+    report = {name: benchmark_page(html, args.target or list(TARGETS), args.repeat) for name, html in pages}
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,50 @@
+import os
+import sys
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+from instrumentation import stage
+
+def _available_parser():
+    # SCRAPER_HTML_PARSER=html.parser forces the pure-Python parser, e.g. to compare output
+    requested = os.environ.get('SCRAPER_HTML_PARSER', 'lxml')
+    try:
+        BeautifulSoup('', requested)
+        return requested
+    except FeatureNotFound:
+        print(f"HTML parser {requested} is not installed; falling back to html.parser", file=sys.stderr)
+        return 'html.parser'
+
+HTML_PARSER = _available_parser()
+
+class AnyOf(SoupStrainer):
+    """Strainer keeping every top-level element that at least one of `strainers` keeps"""
+
+    def __init__(self, *strainers):
+        super().__init__()
+        self.strainers = strainers
+
+    @property
+    def excludes_everything(self):
+        return all(strainer.excludes_everything for strainer in self.strainers)
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return any(strainer.allow_tag_creation(nsprefix, name, attrs) for strainer in self.strainers)
+
+    def allow_string_creation(self, string):
+        return any(strainer.allow_string_creation(string) for strainer in self.strainers)
+
+# Subtrees the listing pages are read for; everything outside them is never built
+TABLES = SoupStrainer('table')
+LINKS = SoupStrainer('a', href=True)
+TABLES_AND_LINKS = AnyOf(TABLES, LINKS)
+
+@stage('parse')
+def make_soup(markup, parse_only=None):
+    """Parse HTML with the fastest available parser, building only the `parse_only` subtrees if given
+
+    Elements matched by the strainer are kept with all of their descendants,
+    so find_all()/select() on the result behave as on the full document for
+    anything inside those subtrees.
+    """
+    return BeautifulSoup(markup, HTML_PARSER, parse_only=parse_only)
@@ -0,0 +1,235 @@
+import hashlib
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import instrumentation
+from disk_cache import open_cache
+from page_archive import open_archive
+from rate_limiter import RATE_LIMITER
+from retry_policy import (
+    CIRCUIT_BREAKERS, SERVER_ERROR_STATUSES, TRANSIENT_ERRORS, CircuitOpenError, RetryPolicy
+)
+
+# Response headers kept alongside cached bodies
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+class CachedSession(requests.Session):
+    """requests.Session that serves GETs from an on-disk cache and revalidates stale entries
+
+    Fresh entries (younger than their TTL) are returned without touching the
+    network. Stale entries are revalidated with If-None-Match/If-Modified-Since,
+    and a 304 reply reuses the stored body. Only network requests take a token
+    from the per-host `rate_limiter`, so cache hits never pay a rate-limit delay;
+    throttled (429/503) requests are retried after the limiter's backoff.
+
+    Network GETs get the `retry_policy` timeouts unless the caller passes
+    its own, and are retried with jittered backoff on connection errors,
+    timeouts and server errors. Each host's `breakers` entry counts
+    failures in a row; once it opens, requests to that host raise
+    CircuitOpenError at once instead of waiting out their timeouts.
+
+    Every body received from the network with a 200 is also appended to
+    the scraper's `archive` (page_archive), cache or not, so it can be
+    re-parsed later without fetching it again.
+    """
+
+    # Retries of a request answered with 429/503
+    THROTTLE_RETRIES = 2
+
+    def __init__(self, namespace, ttl=3600, rate_limiter=None, cache=None, retry_policy=None, breakers=None,
+                 archive=None):
+        super().__init__()
+        self.namespace = namespace
+        self.ttl = ttl
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RATE_LIMITER
+        self.cache = cache if cache is not None else open_cache(f"http/{namespace}")
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.breakers = breakers if breakers is not None else CIRCUIT_BREAKERS
+        self.archive = archive if archive is not None else open_archive(namespace)
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'throttled': 0, 'rate_wait_seconds': 0.0,
+                      'retries': 0, 'failures': 0, 'fast_failed': 0}
+        self._hosts = set()
+        self._stats_lock = threading.Lock()
+
+    def get(self, url, params=None, ttl=None, **kwargs):
+        if self.cache is None:
+            return self._archived(self._network_get(url, params=params, **kwargs))
+
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        key = hashlib.sha256(full_url.encode('utf-8')).hexdigest()
+        ttl = self.ttl if ttl is None else ttl
+
+        entry = self.cache.get(key)
+        if entry:
+            body, meta = entry
+            if time.time() - meta.get('stored_at', 0) < ttl:
+                self._count('hits')
+                instrumentation.count('cache_hits')
+                return self._cached_response(full_url, body, meta)
+
+            conditional = {}
+            if meta.get('headers', {}).get('ETag'):
+                conditional['If-None-Match'] = meta['headers']['ETag']
+            if meta.get('headers', {}).get('Last-Modified'):
+                conditional['If-Modified-Since'] = meta['headers']['Last-Modified']
+            kwargs['headers'] = {**conditional, **(kwargs.get('headers') or {})}
+
+        response = self._archived(self._network_get(full_url, **kwargs))
+
+        if response.status_code == 304 and entry:
+            body, meta = entry
+            meta['stored_at'] = time.time()
+            self.cache.update_meta(key, meta)
+            self._count('revalidated')
+            instrumentation.count('cache_revalidated')
+            return self._cached_response(full_url, body, meta)
+
+        self._count('misses')
+        if response.status_code == 200:
+            meta = {
+                'url': full_url,
+                'stored_at': time.time(),
+                'encoding': response.encoding,
+                'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+            }
+            self.cache.put(key, response.content, meta)
+
+        return response
+
+    def _network_get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.retry_policy.timeout)
+        breaker = self.breakers.breaker(url)
+        with self._stats_lock:
+            self._hosts.add(urlparse(url).netloc)
+
+        throttled = failed = 0
+        while True:
+            if not breaker.allow():
+                self._count('fast_failed')
+                instrumentation.count('fast_failed')
+                raise CircuitOpenError(f"Circuit open for {urlparse(url).netloc}; not requesting {url}")
+
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.acquire(url)
+                self._count('rate_wait_seconds', wait)
+                if wait:
+                    instrumentation.record('rate_wait', wait)
+
+            try:
+                response, error = self._timed_get(url, **kwargs), None
+            except TRANSIENT_ERRORS as e:
+                response, error = None, e
+            except requests.RequestException as e:
+                # Not worth a retry (redirect loop, undecodable body), but the host still failed the request
+                self._count('failures')
+                self.breakers.failed(url, e)
+                raise
+
+            # A throttled response is the rate limiter's to back off from; the host answered, so it is up
+            if response is not None and self.rate_limiter is not None \
+                    and self.rate_limiter.observe(url, response) is not None:
+                breaker.succeeded()
+                self._count('throttled')
+                if throttled < self.THROTTLE_RETRIES:
+                    throttled += 1
+                    self._retrying()
+                    continue
+                return response
+
+            if error is None and response.status_code not in SERVER_ERROR_STATUSES:
+                breaker.succeeded()
+                return response
+
+            self._count('failures')
+            self.breakers.failed(url, error or f"HTTP {response.status_code}")
+            if failed >= self.retry_policy.retries:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self.retry_policy.delay(failed)
+            failed += 1
+            print(f"Retrying {url} in {delay:.1f}s after {error or f'HTTP {response.status_code}'} "
+                  f"(retry {failed} of {self.retry_policy.retries})", file=sys.stderr)
+            self._retrying()
+            time.sleep(delay)
+
+    def _archived(self, response):
+        """Append a network response's body to the archive; archiving never fails the request"""
+        if self.archive is not None and response.status_code == 200:
+            try:
+                self.archive.append(response.url, response.content, response.status_code, response.headers)
+            except OSError as e:
+                print(f"Could not archive {response.url}: {e}", file=sys.stderr)
+        return response
+
+    def _retrying(self):
+        self._count('retries')
+        instrumentation.count('retries')
+
+    def _timed_get(self, url, **kwargs):
+        """A network GET, timed into the run's fetch, ttfb and download stages when metrics are collected"""
+        metrics = instrumentation.current()
+        if metrics is None:
+            return super().get(url, **kwargs)
+
+        started = time.perf_counter()
+        response = super().get(url, **kwargs)
+        seconds = time.perf_counter() - started
+        # requests' elapsed runs from sending the request to parsing the headers; the rest is the body
+        ttfb = response.elapsed.total_seconds()
+        size = len(response.content)
+        metrics.add('fetch', seconds, url, status=response.status_code, bytes=size, ttfb=round(ttfb, 4))
+        metrics.add('ttfb', ttfb)
+        metrics.add('download', max(0.0, seconds - ttfb))
+        metrics.count('requests')
+        metrics.count('bytes', size)
+        return response
+
+    def _cached_response(self, url, body, meta):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.url = url
+        response.encoding = meta.get('encoding')
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.from_cache = True
+        return response
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def transport_summary(self):
+        """Retry and failure counts, and the breaker of every host this session requested"""
+        with self._stats_lock:
+            hosts = sorted(self._hosts)
+            summary = {name: self.stats[name] for name in ('retries', 'failures', 'fast_failed', 'throttled')}
+        summary['breakers'] = {host: self.breakers.breaker(host).summary() for host in hosts}
+        return summary
+
+    def report_cache_stats(self):
+        """Write hit/miss counts and rate-limit waits to stderr"""
+        if self.cache is not None:
+            print(
+                f"Cache [{self.namespace}]: {self.stats['hits']} hits, "
+                f"{self.stats['revalidated']} revalidated, {self.stats['misses']} misses",
+                file=sys.stderr
+            )
+        if self.stats['rate_wait_seconds'] or self.stats['throttled']:
+            print(
+                f"Rate limit [{self.namespace}]: waited {self.stats['rate_wait_seconds']:.1f}s, "
+                f"{self.stats['throttled']} throttled responses",
+                file=sys.stderr
+            )
+        if self.stats['failures'] or self.stats['fast_failed']:
+            print(
+                f"Transport [{self.namespace}]: {self.stats['failures']} failed requests, "
+                f"{self.stats['retries']} retries, {self.stats['fast_failed']} failed fast on open circuits",
+                file=sys.stderr
+            )
@@ -0,0 +1,296 @@
+import cProfile
+import functools
+import heapq
+import itertools
+import json
+import socket
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, defaultdict
+
+# URLs kept per stage in the metrics line, slowest first
+SLOWEST_URLS = 10
+
+# Seconds between stack samples of a sampled (.folded) profile
+SAMPLE_INTERVAL = 0.005
+
+# Metrics of the run in progress; None when no run collects them, which makes every hook a no-op
+_current = None
+
+def current():
+    return _current
+
+def add_instrumentation_arguments(parser):
+    parser.add_argument('--no-metrics', dest='metrics', action='store_false',
+                        help="Do not write the per-stage metrics line to stderr at the end of the run")
+    parser.add_argument('--profile', metavar='FILE', default=None,
+                        help="Profile the run into FILE: cProfile stats (read with pstats), or sampled stacks "
+                             "of every thread for a flamegraph when FILE ends in .folded")
+
+class RunMetrics:
+    """Monotonic stage timers and counters of one scraper run
+
+    Stages (fetch, dns, connect, tls, ttfb, download, parse, extract,
+    serialize, ...) accumulate seconds and call counts; counters hold
+    bytes, cache hits, retries and the like. The slowest URLs of each stage
+    are kept with their timings. Safe to update from fetch threads.
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+        self.started = time.perf_counter()
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.slowest = defaultdict(list)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds, url=None, **detail):
+        with self._lock:
+            self.seconds[stage] += seconds
+            self.calls[stage] += 1
+            if url is not None:
+                self._keep_slowest(stage, seconds, url, detail)
+
+    def _keep_slowest(self, stage, seconds, url, detail):
+        slowest = self.slowest[stage]
+        # The sequence number breaks ties, so entries never compare by URL or detail
+        entry = (seconds, next(self._sequence), url, detail)
+        if len(slowest) < SLOWEST_URLS:
+            heapq.heappush(slowest, entry)
+        elif seconds > slowest[0][0]:
+            heapq.heapreplace(slowest, entry)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def state(self):
+        """Plain-data copy, to merge into the run's metrics from a worker process"""
+        with self._lock:
+            return dict(self.seconds), dict(self.calls), dict(self.counters), {
+                stage: list(entries) for stage, entries in self.slowest.items()
+            }
+
+    def merge(self, state):
+        seconds, calls, counters, slowest = state
+        with self._lock:
+            for stage, value in seconds.items():
+                self.seconds[stage] += value
+            for stage, value in calls.items():
+                self.calls[stage] += value
+            for name, value in counters.items():
+                self.counters[name] += value
+            for stage, entries in slowest.items():
+                for seconds, _, url, detail in entries:
+                    self._keep_slowest(stage, seconds, url, detail)
+
+    def as_dict(self, **extra):
+        with self._lock:
+            return {
+                '_type': 'metrics',
+                'source': self.source,
+                'elapsed_seconds': round(time.perf_counter() - self.started, 4),
+                'stages': {
+                    stage: {'seconds': round(seconds, 4), 'calls': self.calls[stage]}
+                    for stage, seconds in sorted(self.seconds.items())
+                },
+                'counters': dict(sorted(self.counters.items())),
+                'slowest': {
+                    stage: [{'url': url, 'seconds': round(seconds, 4), **detail}
+                            for seconds, _, url, detail in sorted(entries, reverse=True)]
+                    for stage, entries in sorted(self.slowest.items())
+                },
+                **extra,
+            }
+
+class Timer:
+    """with Timer('parse'): ... adds the block's wall time to a stage of the current run, if any"""
+
+    __slots__ = ('stage', 'url', 'started')
+
+    def __init__(self, stage, url=None):
+        self.stage = stage
+        self.url = url
+
+    def __enter__(self):
+        self.started = time.perf_counter() if _current is not None else None
+        return self
+
+    def __exit__(self, *exc):
+        if self.started is not None and _current is not None:
+            _current.add(self.stage, time.perf_counter() - self.started, self.url)
+
+def stage(name):
+    """Decorator timing every call of a function as stage `name` of the current run"""
+    def decorate(func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            metrics = _current
+            if metrics is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.add(name, time.perf_counter() - started)
+        return timed
+    return decorate
+
+def record(stage, seconds, url=None):
+    if _current is not None:
+        _current.add(stage, seconds, url)
+
+def count(name, amount=1):
+    if _current is not None:
+        _current.count(name, amount)
+
+def start_worker_metrics():
+    """Fresh metrics for one task in a worker process; its state() goes back to the parent to merge"""
+    global _current
+    _current = RunMetrics()
+    return _current
+
+_connection_timers_installed = False
+_connecting = threading.local()
+
+def _install_connection_timers():
+    """Time DNS lookups, TCP connects and TLS handshakes of requests' connections (urllib3)
+
+    connect covers the TCP connect after DNS, tls the handshake after the
+    connect, so the three stages do not overlap.
+    """
+    global _connection_timers_installed
+    if _connection_timers_installed:
+        return
+    _connection_timers_installed = True
+
+    import urllib3.connection
+    import urllib3.util.connection
+
+    class TimedSocketModule:
+        """Stands in for the socket module inside urllib3.util.connection, timing getaddrinfo"""
+
+        def __getattr__(self, name):
+            return getattr(socket, name)
+
+        def getaddrinfo(self, host, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return socket.getaddrinfo(host, *args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - started
+                _connecting.dns = getattr(_connecting, 'dns', 0.0) + seconds
+                if _current is not None:
+                    _current.add('dns', seconds, host)
+
+    urllib3.util.connection.socket = TimedSocketModule()
+
+    new_conn = urllib3.connection.HTTPConnection._new_conn
+    connect = urllib3.connection.HTTPSConnection.connect
+
+    def timed_new_conn(self):
+        _connecting.dns = 0.0
+        started = time.perf_counter()
+        try:
+            return new_conn(self)
+        finally:
+            seconds = time.perf_counter() - started
+            _connecting.tcp = seconds
+            if _current is not None:
+                _current.add('connect', seconds - _connecting.dns, self.host)
+
+    def timed_connect(self):
+        _connecting.tcp = 0.0
+        started = time.perf_counter()
+        try:
+            return connect(self)
+        finally:
+            if _current is not None:
+                _current.add('tls', time.perf_counter() - started - _connecting.tcp, self.host)
+
+    urllib3.connection.HTTPConnection._new_conn = timed_new_conn
+    urllib3.connection.HTTPSConnection.connect = timed_connect
+
+class StackSampler:
+    """Samples every thread's stack on a timer into folded stacks ("a;b;c count"), the flamegraph input"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                frames = [f"{entry.name} ({entry.filename.rsplit('/', 1)[-1]}:{entry.lineno})"
+                          for entry in traceback.extract_stack(frame)]
+                self.stacks[';'.join([names.get(ident, str(ident))] + frames)] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, samples in self.stacks.most_common():
+                f.write(f"{stack} {samples}\n")
+
+class ScraperRun:
+    """Metrics, and optionally a profile, of one command-line scraper run
+
+    Started before the scraper is created; finish() writes the profile and
+    the metrics as one JSON line tagged "_type": "metrics" on stderr.
+    """
+
+    def __init__(self, source, metrics=True, profile=None):
+        global _current
+        self.metrics = RunMetrics(source) if metrics else None
+        if self.metrics is not None:
+            _install_connection_timers()
+            _current = self.metrics
+
+        self.profile_path = profile
+        self.profiler = None
+        if profile and profile.endswith('.folded'):
+            self.profiler = StackSampler()
+            self.profiler.start()
+        elif profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    @classmethod
+    def from_args(cls, source, args):
+        return cls(source, metrics=getattr(args, 'metrics', True), profile=getattr(args, 'profile', None))
+
+    def finish(self, **extra):
+        global _current
+        if self.profiler is not None:
+            try:
+                if isinstance(self.profiler, StackSampler):
+                    self.profiler.stop()
+                    self.profiler.write(self.profile_path)
+                else:
+                    self.profiler.disable()
+                    self.profiler.dump_stats(self.profile_path)
+                print(f"Profile written to {self.profile_path}", file=sys.stderr)
+            except OSError as e:
+                print(f"Could not write profile {self.profile_path}: {e}", file=sys.stderr)
+            self.profiler = None
+
+        if self.metrics is not None:
+            print(json.dumps(self.metrics.as_dict(**extra), default=str), file=sys.stderr)
+            if _current is self.metrics:
+                _current = None
+            self.metrics = None
@@ -0,0 +1,318 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from disk_cache import DEFAULT_CACHE_ROOT
+
+DEFAULT_SNAPSHOT = os.path.join(DEFAULT_CACHE_ROOT, 'investors.npz')
+SNAPSHOT_VERSION = 1
+
+# Rows parsed per pandas chunk; memory is bounded by the chunk plus the compact output columns
+CHUNK_ROWS = 50_000
+
+CONTACTS = 3
+PHONES_PER_CONTACT = 3
+
+# Realeflow export columns kept per investor, with the dtypes they are read as
+INVESTOR_TEXT = {
+    'FullName': 'name', 'MailingAddress': 'address', 'MailingAddressCity': 'city',
+    'MailingAddressState': 'state', 'MailingAddressZip': 'zip', 'DetailsLink': 'details_link',
+}
+INVESTOR_FLAGS = {
+    'IsLandlord': 'is_landlord', 'IsLender': 'is_lender', 'IsNoteHolder': 'is_note_holder',
+    'IsFlipper': 'is_flipper', 'IsResidential': 'is_residential',
+}
+INVESTOR_NUMBERS = {
+    'PortfolioOwnedCount': 'portfolio_count', 'PortfolioPurchaseAverage': 'purchase_average',
+    'PortfolioValue': 'portfolio_value', 'DealsFundedCount': 'deals_funded_count',
+    'DealsFundedValue': 'deals_funded_value', 'NotesHeldCount': 'notes_held_count',
+    'FlippedPropertiesCount': 'flipped_count', 'FlippedPurchaseAverage': 'flipped_purchase_average',
+}
+
+# Hand-built lists (Name, Email, Phone, Budget, ...) map onto the first contact of an export row
+COLUMN_ALIASES = {
+    'Name': 'FullName', 'Email': 'Contact1Email_1', 'Phone': 'Contact1Phone_1',
+    'Strategy': 'Strategy', 'Budget': 'Budget',
+}
+EXTRA_TEXT = {'Strategy': 'strategy', 'Budget': 'budget'}
+
+# DNC and litigator cells are blank, or a marker such as "DNC"; these values also mean "not flagged"
+NOT_FLAGGED = ('', '0', 'N', 'n', 'NO', 'No', 'no', 'FALSE', 'False', 'false')
+
+def _contact_columns(contact, slot):
+    prefix = f"Contact{contact}"
+    phone = f"{prefix}Phone_{slot}"
+    return {
+        'name': f"{prefix}Name", 'phone': phone, 'phone_type': f"{phone}_Type",
+        'dnc': f"{phone}_DNC", 'litigator': f"{phone}_Litigator", 'email': f"{prefix}Email_{slot}",
+    }
+
+CONTACT_COLUMNS = [
+    (contact, slot, _contact_columns(contact, slot))
+    for contact in range(1, CONTACTS + 1) for slot in range(1, PHONES_PER_CONTACT + 1)
+]
+
+def column_dtypes():
+    """Explicit read dtypes: text stays text (ZIPs and phones keep leading zeros), numbers are floats
+
+    Text is read as plain object columns; without pyarrow, pandas' string
+    dtype only adds a per-cell missing-value check to every operation.
+    """
+    dtypes = {column: object for column in [*INVESTOR_TEXT, *EXTRA_TEXT]}
+    dtypes.update({column: 'float64' for column in [*INVESTOR_FLAGS, *INVESTOR_NUMBERS]})
+    for _, _, columns in CONTACT_COLUMNS:
+        dtypes.update({column: object for column in columns.values()})
+    return dtypes
+
+DTYPES = column_dtypes()
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """DataFrames of the columns this module uses, `chunk_rows` rows at a time, with aliases applied"""
+    header = pd.read_csv(path, nrows=0).columns
+    renames = {column: COLUMN_ALIASES[column] for column in header
+               if column in COLUMN_ALIASES and COLUMN_ALIASES[column] not in header}
+    wanted = [column for column in header if column in DTYPES or column in renames]
+    dtypes = {column: DTYPES[renames.get(column, column)] for column in wanted}
+    # Blank text cells stay '' rather than NaN; blank numbers are NaN
+    na_values = {column: [''] for column in dtypes if dtypes[column] is not object}
+    for chunk in pd.read_csv(path, usecols=wanted, dtype=dtypes, chunksize=chunk_rows,
+                             keep_default_na=False, na_values=na_values, skipinitialspace=True):
+        yield chunk.rename(columns=renames)
+
+def _text(chunk, column):
+    if column not in chunk:
+        return pd.Series('', index=chunk.index, dtype=object)
+    return chunk[column]
+
+def _flagged(values):
+    return ~values.isin(NOT_FLAGGED)
+
+def _map_filled(values, transform):
+    """Apply a vectorized string transform to the non-blank values only; most contact cells are blank"""
+    filled = values != ''
+    if not filled.any():
+        return values
+    values = values.copy()
+    values[filled] = transform(values[filled].str)
+    return values
+
+def normalize_phones(values):
+    """Ten-digit US numbers as int64 (a leading 1 is dropped); 0 where a value is not one"""
+    phones = np.zeros(len(values), dtype=np.int64)
+    filled = (values != '').to_numpy()
+    digits = values[filled].str.replace(r'\D+', '', regex=True)
+    with_country = (digits.str.len() == 11) & digits.str.startswith('1')
+    digits = digits.where(~with_country, digits.str[1:])
+    valid = (digits.str.len() == 10).to_numpy()
+    positions = np.flatnonzero(filled)[valid]
+    phones[positions] = digits[valid].astype(np.int64).to_numpy()
+    return phones
+
+def _budget_amounts(budget):
+    """Min and max dollars of budgets like "$400k–$1.2M" or "Up to $800k"; 0 when absent"""
+    filled = budget[budget != '']
+    amounts = filled.str.upper().str.extractall(r'(\$)?\s*(\d[\d,]*(?:\.\d+)?)\s*([KM]?)\b')
+    # Bare numbers ("2 duplexes") are not amounts; a $ or a K/M suffix makes one
+    amounts = amounts[amounts[0].notna() | (amounts[2] != '')]
+    if amounts.empty:
+        zeros = np.zeros(len(budget))
+        return zeros, zeros
+    scale = amounts[2].map({'K': 1e3, 'M': 1e6, '': 1.0}).astype('float64')
+    dollars = (amounts[1].str.replace(',', '', regex=False).astype('float64') * scale).groupby(level=0)
+    low = dollars.min().reindex(budget.index, fill_value=0.0)
+    high = dollars.max().reindex(budget.index, fill_value=0.0)
+    # "Up to $800k" names only a ceiling
+    only_ceiling = filled.str.contains('UP TO', case=False).reindex(budget.index, fill_value=False) & (low == high)
+    low = low.where(~only_ceiling, 0.0)
+    return low.to_numpy(), high.to_numpy()
+
+def flatten_chunk(chunk, first_row):
+    """Split one chunk into investor, phone and email columns; DNC and litigator phones are dropped"""
+    rows = np.arange(first_row, first_row + len(chunk), dtype=np.int64)
+    investors = {'row': rows}
+    for column, name in INVESTOR_TEXT.items():
+        investors[name] = _text(chunk, column)
+    investors['state'] = _map_filled(investors['state'], lambda text: text.upper())
+    for column, name in INVESTOR_FLAGS.items():
+        values = chunk[column] if column in chunk else pd.Series(0.0, index=chunk.index)
+        investors[name] = values.fillna(0).to_numpy() > 0
+    for column, name in INVESTOR_NUMBERS.items():
+        values = chunk[column] if column in chunk else pd.Series(np.nan, index=chunk.index)
+        investors[name] = values.to_numpy(dtype='float64')
+    for column, name in EXTRA_TEXT.items():
+        investors[name] = _text(chunk, column)
+    investors['min_budget'], investors['max_budget'] = _budget_amounts(investors['budget'])
+
+    # One frame per (contact, phone slot), stacked: rows stay in contact-then-slot order per investor
+    slots = []
+    for contact, slot, columns in CONTACT_COLUMNS:
+        slots.append(pd.DataFrame({
+            'investor': rows,
+            'contact': np.int8(contact),
+            'slot': np.int8(slot),
+            'contact_name': _text(chunk, columns['name']).to_numpy(),
+            'raw_phone': _text(chunk, columns['phone']).to_numpy(),
+            'phone_type': _map_filled(_text(chunk, columns['phone_type']), lambda text: text.lower()).to_numpy(),
+            'dnc': _flagged(_text(chunk, columns['dnc'])).to_numpy(),
+            'litigator': _flagged(_text(chunk, columns['litigator'])).to_numpy(),
+            'email': _map_filled(_text(chunk, columns['email']), lambda text: text.lower()).to_numpy(),
+        }))
+    stacked = pd.concat(slots, ignore_index=True)
+    stacked['phone'] = normalize_phones(stacked['raw_phone'])
+
+    listed = stacked['phone'] > 0
+    blocked = listed & (stacked['dnc'] | stacked['litigator'])
+    phones = stacked.loc[listed & ~blocked, ['investor', 'contact', 'slot', 'contact_name', 'phone', 'phone_type']]
+    has_email = stacked['email'] != ''
+    has_email[has_email] = stacked.loc[has_email, 'email'].str.contains('@', regex=False)
+    emails = stacked.loc[has_email, ['investor', 'contact', 'contact_name', 'email']]
+    emails = emails.drop_duplicates(['investor', 'email'])
+
+    # First dialable phone and first email, by contact and slot order
+    investors['primary_phone'] = (phones.groupby('investor', sort=False)['phone'].first()
+                                  .reindex(rows, fill_value=0).to_numpy())
+    investors['primary_email'] = (emails.groupby('investor', sort=False)['email'].first()
+                                  .reindex(rows, fill_value='').to_numpy())
+    counts = {'phones_listed': int(listed.sum()), 'phones_blocked': int(blocked.sum())}
+    return investors, phones, emails, counts
+
+class ColumnBuilder:
+    """Accumulates a table's columns chunk by chunk in compact form
+
+    Numeric columns are kept as numpy arrays. Text columns are encoded
+    straight away as UTF-8 bytes plus lengths, so no Python string
+    outlives its chunk.
+    """
+
+    def __init__(self):
+        self.numbers = {}
+        self.texts = {}
+
+    def add(self, columns):
+        for name, values in columns.items():
+            values = values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+            if values.dtype.kind in 'biuf':
+                self.numbers.setdefault(name, []).append(values)
+            else:
+                encoded = [value.encode('utf-8') for value in values.tolist()]
+                lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+                self.texts.setdefault(name, []).append((np.frombuffer(b''.join(encoded), dtype=np.uint8), lengths))
+
+    def arrays(self, table):
+        """Concatenated columns keyed "table.column"; chunk parts are released as each column is built"""
+        arrays = {}
+        while self.numbers:
+            name, parts = self.numbers.popitem()
+            arrays[f"{table}.{name}"] = np.concatenate(parts)
+        while self.texts:
+            name, parts = self.texts.popitem()
+            lengths = np.concatenate([part[1] for part in parts])
+            offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            arrays[f"{table}.{name}.data"] = np.concatenate([part[0] for part in parts])
+            arrays[f"{table}.{name}.offsets"] = offsets
+        return arrays
+
+class TextColumn:
+    """A snapshot text column: UTF-8 bytes and offsets, decoded only when read"""
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+    def tolist(self):
+        raw = self.data.tobytes()
+        offsets = self.offsets.tolist()
+        return [raw[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+def ingest(paths, output=DEFAULT_SNAPSHOT, state=None, chunk_rows=CHUNK_ROWS):
+    """Read investor CSV exports chunk by chunk and write one .npz snapshot; return run stats"""
+    tables = {'investors': ColumnBuilder(), 'phones': ColumnBuilder(), 'emails': ColumnBuilder()}
+    stats = {'files': len(paths), 'rows_read': 0, 'investors': 0, 'phones_listed': 0, 'phones_blocked': 0}
+    started = time.perf_counter()
+
+    for path in paths:
+        for chunk in read_chunks(path, chunk_rows):
+            stats['rows_read'] += len(chunk)
+            if state:
+                chunk = chunk[_map_filled(_text(chunk, 'MailingAddressState'), lambda text: text.upper()) == state.upper()]
+            investors, phones, emails, counts = flatten_chunk(chunk, stats['investors'])
+            tables['investors'].add(investors)
+            tables['phones'].add({column: phones[column] for column in phones.columns})
+            tables['emails'].add({column: emails[column] for column in emails.columns})
+            stats['investors'] += len(chunk)
+            for key, count in counts.items():
+                stats[key] += count
+
+    arrays = {}
+    for name, builder in tables.items():
+        arrays.update(builder.arrays(name))
+    stats['phones'] = len(arrays.get('phones.phone', ()))
+    stats['emails'] = len(arrays.get('emails.investor', ()))
+    meta = {'version': SNAPSHOT_VERSION, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'sources': [os.path.basename(path) for path in paths], 'state': state, **stats}
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+
+    # Written uncompressed, so loading is a plain read per array; renamed into place when complete
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp_path = f"{output}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, output)
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+def load_snapshot(path=DEFAULT_SNAPSHOT):
+    """Tables of a snapshot as {table: {column: ndarray or TextColumn}}, plus its metadata"""
+    with np.load(path) as npz:
+        arrays = {name: npz[name] for name in npz.files}
+    meta = json.loads(arrays.pop('meta').tobytes().decode('utf-8'))
+    if meta.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Investor snapshot {path} has version {meta.get('version')}, expected {SNAPSHOT_VERSION}")
+
+    tables = {}
+    for key, values in arrays.items():
+        table, column = key.split('.', 1)
+        if column.endswith('.offsets'):
+            continue
+        if column.endswith('.data'):
+            column = column[:-len('.data')]
+            values = TextColumn(values, arrays[f"{table}.{column}.offsets"])
+        tables.setdefault(table, {})[column] = values
+    return tables, meta
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest investor CSV exports into a columnar .npz snapshot")
+    parser.add_argument('csv', nargs='+', help="Investor CSV exports (Realeflow/Pace or Name/Email/Phone lists)")
+    parser.add_argument('--output', default=DEFAULT_SNAPSHOT, help="Snapshot path (default: %(default)s)")
+    parser.add_argument('--state', default=None, help="Keep only investors mailing from this state, e.g. HI")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="CSV rows parsed per chunk")
+    args = parser.parse_args()
+
+    try:
+        stats = ingest(args.csv, args.output, args.state, args.chunk_rows)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        print(f"Investor ingest failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    load_snapshot(args.output)
+    stats['load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    stats['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    print(f"Wrote {stats['investors']} investors, {stats['phones']} phones ({stats['phones_blocked']} "
+          f"DNC/litigator dropped) and {stats['emails']} emails to {args.output} in {stats['seconds']}s",
+          file=sys.stderr)
+    print(json.dumps(stats))
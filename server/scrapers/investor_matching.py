@@ -0,0 +1,242 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from investor_ingest import DEFAULT_SNAPSHOT, load_snapshot
+from lead_scoring import CITY_ISLAND, amounts, days_until_auction, lead_islands, zip_islands
+from record_output import read_records
+from tmk import HONOLULU, ISLANDS
+
+# Score weights, as in matchingService.calculateMatch
+ISLAND_MATCH = 30
+BUDGET_MATCH = 20
+STRATEGY_MATCH = 10
+URGENT_AUCTION = 15
+SOON_AUCTION = 10
+HIGH_PRIORITY = 5
+# findMatchesForLead's cutoff
+MATCH_THRESHOLD = 30
+
+# Investors are ranked within a score by track record; the bonus stays below the 5-point score step
+ACTIVITY_WEIGHT = 0.99
+
+# Without a stated budget, an investor's buy-box is their purchase average plus or minus this share
+BUY_BOX_SPREAD = 0.5
+
+# Lead strategies, as in matchingService.suggestStrategy
+FIX_AND_FLIP, BUY_AND_HOLD, BRRRR = range(3)
+STRATEGIES = ('Fix & Flip', 'Buy & Hold', 'BRRRR')
+FLIP_VALUE = 800_000
+BRRRR_EQUITY = 0.7
+
+# Strategy cells of investor lists ("Flips, rentals", "BRRRR") -> the strategies they name
+STRATEGY_PATTERNS = {
+    FIX_AND_FLIP: r'flip|rehab|fix',
+    BUY_AND_HOLD: r'hold|rental|landlord|long[- ]term',
+    BRRRR: r'brrrr',
+}
+
+# Leads scored per broadcast block; a block is LEAD_BLOCK x investors float32 scores
+LEAD_BLOCK = 64
+
+def _zip_numbers(values):
+    return pd.to_numeric(pd.Series(values, dtype=object).str[:5], errors='coerce').fillna(0).to_numpy(np.int64)
+
+class LeadBatch:
+    """Scraper records reduced to the columns the matcher scores on"""
+
+    def __init__(self, records, today=None):
+        self.count = len(records)
+        self.value = amounts(records, 'estimated_value', 'estimatedValue')
+        owed = amounts(records, 'amount_owed', 'amountOwed')
+
+        # Oahu when the island is unknown, as in matchingService.extractIsland
+        self.island = lead_islands(records)
+        self.island[self.island == 0] = HONOLULU
+
+        self.strategy = np.full(self.count, BUY_AND_HOLD, dtype=np.int8)
+        self.strategy[(owed > 0) & (self.value > 0) & (owed < self.value * BRRRR_EQUITY)] = BRRRR
+        self.strategy[self.value > FLIP_VALUE] = FIX_AND_FLIP
+
+        # Urgency and priority do not depend on the investor: one constant per lead
+        days = days_until_auction(records, today)
+        self.bonus = np.where((days > 0) & (days <= 7), URGENT_AUCTION,
+                              np.where((days > 7) & (days <= 30), SOON_AUCTION, 0)).astype(np.float32)
+        self.bonus[[record.get('priority') == 'high' for record in records]] += HIGH_PRIORITY
+
+class InvestorMatcher:
+    """Scores batches of leads against every investor of a snapshot at once
+
+    Investors become flat arrays: island (from the mailing ZIP or city),
+    buy-box bounds and, per lead island, one score row per (lead strategy,
+    lead has a value) that folds the island, strategy and activity terms
+    together. Leads are scored island by island in blocks: one row gather,
+    two broadcast budget comparisons and a masked add over a leads x
+    investors matrix, after which np.argpartition picks each lead's top k
+    without sorting the rest.
+
+    Scores follow matchingService.calculateMatch: an island match is
+    required (+30), budget +/-20, strategy +10, auction urgency +15/+10 and
+    high priority +5. Investors mailing from outside Hawaii have no island
+    and may match any lead, without the island points. Property types are
+    not scored; the snapshot has none.
+    """
+
+    def __init__(self, investors):
+        self.investors = investors
+        count = len(investors['row'])
+        self.count = count
+
+        zips = _zip_numbers(investors['zip'].tolist())
+        island = zip_islands(zips)
+        states = investors['state'].tolist()
+        cities = investors['city'].tolist()
+        for i in np.flatnonzero(island == 0):
+            if states[i] in ('HI', ''):
+                island[i] = CITY_ISLAND.get(cities[i].upper(), 0)
+        self.island = island
+
+        # Stated budget bounds; 0 means "no bound", as in calculateMatch
+        low = investors['min_budget'].astype(np.float64)
+        high = investors['max_budget'].astype(np.float64)
+        average = np.where(investors['is_flipper'] & (investors['flipped_purchase_average'] > 0),
+                           investors['flipped_purchase_average'], investors['purchase_average'])
+        average = np.nan_to_num(average)
+        derived = (low == 0) & (high == 0) & (average > 0)
+        low = np.where(derived, average * (1 - BUY_BOX_SPREAD), low)
+        high = np.where(derived, average * (1 + BUY_BOX_SPREAD), high)
+        self.low = low.astype(np.float32)
+        self.high = np.where(high > 0, high, np.inf).astype(np.float32)
+
+        strategies = self._strategies(investors)
+        activity = np.log1p(np.nan_to_num(investors['portfolio_count']) + np.nan_to_num(investors['flipped_count'])
+                            + np.nan_to_num(investors['deals_funded_count']))
+        activity = activity / activity.max() * ACTIVITY_WEIGHT if count and activity.max() > 0 else activity
+
+        # Per lead island, only the investors there or without an island can match. Their score rows,
+        # one per (lead strategy, lead has a value), hold the score without the in-budget points,
+        # negated so the best k are the k smallest: argpartition finds those fastest.
+        self.by_island = {}
+        for lead_island in ISLANDS:
+            columns = np.flatnonzero((island == lead_island) | (island == 0))
+            base = np.where(island[columns] == lead_island, ISLAND_MATCH, 0) + activity[columns]
+            costs = np.empty((len(STRATEGIES) * 2, len(columns)), dtype=np.float32)
+            for strategy in range(len(STRATEGIES)):
+                scored = base + strategies[strategy, columns] * STRATEGY_MATCH
+                costs[strategy * 2] = -scored
+                costs[strategy * 2 + 1] = BUDGET_MATCH - scored
+            self.by_island[lead_island] = (columns, self.low[columns], self.high[columns], costs)
+
+    @staticmethod
+    def _strategies(investors):
+        """Boolean (3, investors) array: which lead strategies each investor takes"""
+        text = pd.Series(investors['strategy'].tolist(), dtype=object).str.lower()
+        named = {strategy: text.str.contains(pattern, regex=True).to_numpy(bool)
+                 for strategy, pattern in STRATEGY_PATTERNS.items()}
+        flipper = investors['is_flipper'] | (np.nan_to_num(investors['flipped_count']) > 0)
+        landlord = investors['is_landlord']
+        return np.stack([
+            named[FIX_AND_FLIP] | flipper,
+            named[BUY_AND_HOLD] | landlord,
+            named[BRRRR] | (flipper & landlord),
+        ])
+
+    @classmethod
+    def from_snapshot(cls, path=DEFAULT_SNAPSHOT):
+        tables, _ = load_snapshot(path)
+        return cls(tables['investors'])
+
+    def _block_costs(self, leads, rows, lead_island):
+        """Negated (leads, candidates) scores of some leads on one island"""
+        _, low, high, costs = self.by_island[lead_island]
+        value = leads.value[rows]
+        has_value = value > 0
+        block = costs[leads.strategy[rows].astype(np.intp) * 2 + has_value]
+        block -= leads.bonus[rows, None]
+        lead_value = value.astype(np.float32)[:, None]
+        in_budget = (low <= lead_value) & (lead_value <= high)
+        in_budget &= has_value[:, None]
+        np.subtract(block, 2 * BUDGET_MATCH, out=block, where=in_budget)
+        return block
+
+    def top_matches(self, leads, k=10, min_score=MATCH_THRESHOLD):
+        """Investor indices and scores of each lead's best k, best first; -1 pads leads with fewer"""
+        indices = np.full((leads.count, k), -1, dtype=np.int64)
+        scores = np.full((leads.count, k), -np.inf, dtype=np.float32)
+        for lead_island, (columns, _, _, _) in self.by_island.items():
+            lead_rows = np.flatnonzero(leads.island == lead_island)
+            top_k = min(k, len(columns))
+            if not top_k:
+                continue
+            for start in range(0, len(lead_rows), LEAD_BLOCK):
+                rows = lead_rows[start:start + LEAD_BLOCK]
+                block = self._block_costs(leads, rows, lead_island)
+                if top_k < len(columns):
+                    top = np.argpartition(block, top_k - 1, axis=1)[:, :top_k]
+                else:
+                    top = np.broadcast_to(np.arange(top_k), block.shape)
+                top_costs = np.take_along_axis(block, top, axis=1)
+                order = np.argsort(top_costs, axis=1, kind='stable')
+                top = np.take_along_axis(top, order, axis=1)
+                top_scores = -np.take_along_axis(top_costs, order, axis=1)
+                keep = top_scores >= min_score
+                indices[rows, :top_k] = np.where(keep, columns[top], -1)
+                scores[rows, :top_k] = np.where(keep, top_scores, -np.inf)
+        return indices, scores
+
+    def match_records(self, records, k=10, min_score=MATCH_THRESHOLD, today=None):
+        """Yield each record's matches as {'address', 'source', 'matches': [...]}, in record order"""
+        leads = LeadBatch(records, today)
+        indices, scores = self.top_matches(leads, k, min_score)
+        investors = self.investors
+        names = investors['name']
+        emails = investors['primary_email']
+        for i, record in enumerate(records):
+            matches = []
+            for index, score in zip(indices[i].tolist(), scores[i].tolist()):
+                if index < 0:
+                    break
+                matches.append({
+                    'investor_row': int(investors['row'][index]),
+                    'name': names[index],
+                    'score': round(score, 2),
+                    'phone': int(investors['primary_phone'][index]) or None,
+                    'email': emails[index] or None,
+                })
+            yield {
+                'address': record.get('address'),
+                'source': record.get('source'),
+                'strategy': STRATEGIES[leads.strategy[i]],
+                'island': ISLANDS.get(int(leads.island[i])),
+                'matches': matches,
+            }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Match scraped leads against the investor snapshot")
+    parser.add_argument('records', nargs='?', default='-',
+                        help="Scraper output, a JSON array or NDJSON (default: stdin)")
+    parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT, help="Investor snapshot (default: %(default)s)")
+    parser.add_argument('--top', type=int, default=10, help="Investors kept per lead")
+    parser.add_argument('--min-score', type=float, default=MATCH_THRESHOLD, help="Lowest score kept")
+    args = parser.parse_args()
+
+    try:
+        started = time.perf_counter()
+        matcher = InvestorMatcher.from_snapshot(args.snapshot)
+        loaded = time.perf_counter()
+        with (sys.stdin if args.records == '-' else open(args.records)) as f:
+            records = read_records(f)
+        results = list(matcher.match_records(records, args.top, args.min_score))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Investor matching failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for result in results:
+        print(json.dumps(result))
+    elapsed = time.perf_counter() - loaded
+    print(f"Matched {len(records)} leads against {matcher.count} investors in {elapsed:.3f}s "
+          f"(snapshot loaded in {loaded - started:.3f}s)", file=sys.stderr)
@@ -0,0 +1,234 @@
+import argparse
+import re
+import sys
+import time
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+from dateutil import parser as date_parser
+
+from address_normalizer import CITIES, normalize_addresses
+from tmk import HONOLULU, parse_tmk
+
+# Records scored per vectorized pass when scoring a stream
+SCORE_BATCH = 200
+
+# Priority thresholds, as in ScraperService.calculatePriority
+HIGH_VALUE = 500_000
+HIGH_OWED = 300_000
+URGENT_DAYS = 30
+MEDIUM_VALUE = 200_000
+MEDIUM_OWED = 50_000
+PRIORITIES = np.array(['low', 'medium', 'high'], dtype=object)
+
+# ZIPs 967xx and 968xx outside Oahu; every other Hawaii ZIP is on Oahu
+ISLAND_ZIPS = {
+    2: (96708, 96713, 96729, 96732, 96733, 96742, 96748, 96753, 96757, 96761, 96763, 96767,
+        96768, 96770, 96779, 96784, 96788, 96790, 96793),
+    3: (96704, 96710, 96718, 96719, 96720, 96721, 96725, 96726, 96727, 96728, 96737, 96738,
+        96739, 96740, 96743, 96745, 96749, 96750, 96755, 96760, 96764, 96771, 96772, 96773,
+        96774, 96776, 96777, 96778, 96780, 96781, 96783, 96785),
+    4: (96703, 96705, 96714, 96715, 96716, 96722, 96741, 96746, 96747, 96751, 96752, 96754,
+        96756, 96765, 96766, 96769, 96796),
+}
+_FIRST_ZIP = 96700
+_ZIP_ISLANDS = np.full(200, HONOLULU, dtype=np.int8)
+for _island, _zips in ISLAND_ZIPS.items():
+    _ZIP_ISLANDS[np.asarray(_zips) - _FIRST_ZIP] = _island
+
+CITY_ISLANDS = {
+    2: ('KIHEI', 'LAHAINA', 'WAILUKU', 'KAHULUI', 'MAKAWAO', 'PUKALANI', 'KULA', 'PAIA', 'HAIKU',
+        'HANA', 'KAUNAKAKAI', 'LANAI CITY'),
+    3: ('HILO', 'KAILUA KONA', 'KEAAU', 'PAHOA', 'WAIMEA', 'KAMUELA', 'CAPTAIN COOK', 'HOLUALOA',
+        'VOLCANO', 'NAALEHU', 'OCEAN VIEW'),
+    4: ('LIHUE', 'KAPAA', 'KOLOA', 'PRINCEVILLE', 'HANALEI', 'KEKAHA', 'HANAPEPE', 'KALAHEO'),
+}
+CITY_ISLAND = {city: HONOLULU for city in CITIES.values()}
+CITY_ISLAND.update({city: island for island, cities in CITY_ISLANDS.items() for city in cities})
+
+# Rough typical sale prices, by island and for ZIPs far from their island's; a prior for equity
+# ratios when a record has no value of its own, never written as the record's estimated_value
+ISLAND_VALUE_PRIORS = {1: 850_000, 2: 950_000, 3: 500_000, 4: 900_000}
+ZIP_VALUE_PRIORS = {
+    96815: 450_000, 96814: 550_000, 96826: 450_000, 96821: 1_600_000, 96816: 1_400_000,
+    96734: 1_500_000, 96825: 1_300_000, 96792: 600_000, 96706: 800_000, 96707: 850_000,
+    96761: 1_200_000, 96753: 900_000, 96778: 350_000, 96749: 400_000, 96737: 300_000,
+    96722: 1_300_000,
+}
+_ZIP_PRIORS = np.array([ISLAND_VALUE_PRIORS[island] for island in _ZIP_ISLANDS], dtype=np.float64)
+for _zip, _prior in ZIP_VALUE_PRIORS.items():
+    _ZIP_PRIORS[_zip - _FIRST_ZIP] = _prior
+
+def zip_islands(zips):
+    """Island codes for 5-digit ZIPs (int array); 0 outside Hawaii"""
+    zips = np.asarray(zips, dtype=np.int64)
+    offsets = zips - _FIRST_ZIP
+    hawaii = (offsets >= 0) & (offsets < len(_ZIP_ISLANDS))
+    islands = np.zeros(len(zips), dtype=np.int8)
+    islands[hawaii] = _ZIP_ISLANDS[offsets[hawaii]]
+    return islands
+
+def zip_value_priors(zips):
+    """Typical property value for 5-digit ZIPs (int array); 0 outside Hawaii"""
+    zips = np.asarray(zips, dtype=np.int64)
+    offsets = zips - _FIRST_ZIP
+    hawaii = (offsets >= 0) & (offsets < len(_ZIP_PRIORS))
+    priors = np.zeros(len(zips))
+    priors[hawaii] = _ZIP_PRIORS[offsets[hawaii]]
+    return priors
+
+# Hawaii ZIPs and towns anywhere in an address normalize_addresses could not parse (PO boxes, lot numbers)
+HAWAII_ZIP = re.compile(r'\b(96[78]\d\d)(?:-\d{4})?\b')
+CITY_NAMES = re.compile(r'\b(' + '|'.join(sorted(map(re.escape, CITIES), key=len, reverse=True)) + r')\b')
+
+def lead_islands(records, addresses=None):
+    """Island of each record from its TMK's first digit, else its address ZIP or city; 0 when unknown"""
+    addresses = addresses or normalize_addresses([record.get('address') or '' for record in records])
+    zips, cities = address_places(records, addresses)
+    by_zip = zip_islands(zips)
+    islands = np.zeros(len(records), dtype=np.int8)
+    for i, record in enumerate(records):
+        tmk = parse_tmk(record.get('canonical_tmk') or record.get('tmk'))
+        if tmk and tmk.island:
+            islands[i] = tmk.island
+        elif by_zip[i]:
+            islands[i] = by_zip[i]
+        else:
+            islands[i] = CITY_ISLAND.get(cities[i], 0)
+    return islands
+
+def address_places(records, addresses):
+    """ZIP (int array, 0 when unknown) and city of each record's address
+
+    Addresses that did not normalize are searched as plain text for a
+    Hawaii ZIP and a known town, the last of each winning, as the street
+    part comes first.
+    """
+    zips = np.zeros(len(records), dtype=np.int64)
+    cities = []
+    for i, (record, address) in enumerate(zip(records, addresses)):
+        if address:
+            zips[i] = int(address.zip) if address.zip else 0
+            cities.append(address.city)
+            continue
+        text = (record.get('address') or '').upper()
+        found_zips = HAWAII_ZIP.findall(text)
+        found_cities = CITY_NAMES.findall(text)
+        zips[i] = int(found_zips[-1]) if found_zips else 0
+        cities.append(CITIES[found_cities[-1]] if found_cities else '')
+    return zips, cities
+
+def amounts(records, *fields):
+    """First non-empty of `fields` per record as dollars ("$1,234.50" allowed); 0 when absent"""
+    values = np.zeros(len(records))
+    for i, record in enumerate(records):
+        for field in fields:
+            value = record.get(field)
+            if value:
+                try:
+                    values[i] = float(str(value).replace('$', '').replace(',', ''))
+                except ValueError:
+                    pass
+                break
+    return values
+
+@lru_cache(maxsize=4096)
+def parse_auction_date(text):
+    """A notice's auction date ("November 3, 2026", "11/3/2026", "2026-11-03 at 10 a.m."), or None"""
+    text = re.sub(r'\s+', ' ', text).strip()
+    if not text:
+        return None
+    try:
+        return date_parser.parse(text, fuzzy=True, default=datetime(1900, 1, 1)).date()
+    except (ValueError, OverflowError):
+        return None
+
+def days_until_auction(records, today=None):
+    """Whole days until each record's auction (negative once it has passed), NaN without a date
+
+    Records without a parseable auction_date keep a days_until_auction
+    they already carry; one that has a date is counted from it, as an
+    emitted 0 cannot tell today's auction from a past one. Each distinct
+    date string is parsed once, however many records share it.
+    """
+    today = today or date.today()
+    days = np.full(len(records), np.nan)
+    for i, record in enumerate(records):
+        auction_date = record.get('auction_date')
+        when = parse_auction_date(str(auction_date)) if auction_date else None
+        if when and when.year > 1900:
+            days[i] = (when - today).days
+            continue
+        given = record.get('days_until_auction')
+        if given is not None:
+            days[i] = given
+    return days
+
+def score_batch(records, today=None):
+    """Score a batch of records in place: days_until_auction, priority, value_prior and equity_ratio
+
+    Priority follows ScraperService.calculatePriority, except that a record
+    without an auction date, or whose auction has passed, is not treated
+    as urgent; days_until_auction is written as 0 for the latter. Records
+    with their own estimated_value keep it; the ZIP prior only feeds
+    equity_ratio.
+    """
+    if not records:
+        return records
+    value = amounts(records, 'estimated_value', 'estimatedValue')
+    owed = amounts(records, 'amount_owed', 'amountOwed')
+    days = days_until_auction(records, today)
+
+    high = (value > HIGH_VALUE) | ((days >= 0) & (days <= URGENT_DAYS)) | (owed > HIGH_OWED)
+    medium = (value > MEDIUM_VALUE) | (owed > MEDIUM_OWED)
+    priority = PRIORITIES[np.where(high, 2, np.where(medium, 1, 0))]
+
+    addresses = normalize_addresses([record.get('address') or '' for record in records])
+    prior = zip_value_priors(address_places(records, addresses)[0])
+    islands = lead_islands(records, addresses)
+    no_zip = (prior == 0) & (islands > 0)
+    prior[no_zip] = [ISLAND_VALUE_PRIORS[island] for island in islands[no_zip].tolist()]
+    basis = np.where(value > 0, value, prior)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        equity = np.where((basis > 0) & (owed > 0), 1 - owed / basis, np.nan)
+
+    days_list = np.maximum(days, 0).tolist()
+    prior_list = prior.tolist()
+    equity_list = equity.round(3).tolist()
+    for i, record in enumerate(records):
+        record['days_until_auction'] = None if days_list[i] != days_list[i] else int(days_list[i])
+        record['priority'] = priority[i]
+        record['value_prior'] = prior_list[i] or None
+        record['equity_ratio'] = None if equity_list[i] != equity_list[i] else equity_list[i]
+        record['scored'] = True
+    return records
+
+def iter_scored(records, batch_size=SCORE_BATCH):
+    """Score a record stream `batch_size` records at a time, yielding them in order"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield from score_batch(batch)
+            batch = []
+    yield from score_batch(batch)
+
+if __name__ == "__main__":
+    from record_output import read_records
+    from records import RAW_TEXT_MODES, record_json
+
+    parser = argparse.ArgumentParser(description="Score scraper output: priority, auction days and equity")
+    parser.add_argument('records', nargs='?', default='-',
+                        help="Scraper output, a JSON array or NDJSON (default: stdin)")
+    parser.add_argument('--raw-text', choices=RAW_TEXT_MODES, default='full', help="Notice text output mode")
+    args = parser.parse_args()
+
+    with (sys.stdin if args.records == '-' else open(args.records)) as f:
+        records = read_records(f)
+    started = time.perf_counter()
+    score_batch(records)
+    elapsed = time.perf_counter() - started
+    for record in records:
+        print(record_json(record, args.raw_text))
+    print(f"Scored {len(records)} records in {elapsed:.3f}s", file=sys.stderr)
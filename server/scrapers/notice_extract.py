@@ -0,0 +1,456 @@
+import re
+
+from address_normalizer import NOTICE_STREET_SUFFIXES
+
+# Longer notice text is cut before extraction; real notices, even multi-page ones, are far shorter
+MAX_NOTICE_CHARS = 1_000_000
+
+# Literal words the patterns below depend on. One scan over the case-folded
+# notice finds which of them occur, and patterns whose words are all absent
+# are skipped. re.IGNORECASE also equates İ and ı with i, which casefold() does not.
+ANCHORS = (
+    '$', 'tmk', 'tax map key', 'auction', 'sale', 'attorney', 'counsel', 'trustee',
+    'law firm', 'esq', 'llc', 'p.a.', 'alc', 'case', 'file', 'filed', 'doc', 'fc', 'cv',
+    'mfdr', 'amount', 'debt', 'balance', 'owed', 'property', 'located at', 'hawaii',
+    'borrower', 'defendant', 'mortgagor', 'owner', 'debtor', 'vs', 'notice date',
+    'date of notice', 'property at', 'situated at', 'known as', 'sale date',
+    'auction date', 'date of sale',
+)
+
+def _literal_trie(words):
+    """Regex matching the longest of `words` at a position, factored on shared prefixes"""
+    branches = {}
+    for word in words:
+        if word:
+            branches.setdefault(word[0], []).append(word[1:])
+    alternatives = [re.escape(char) + _literal_trie(rest) for char, rest in sorted(branches.items())]
+    if not alternatives:
+        return ''
+    body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+    return f'(?:{body})?' if '' in words else body
+
+_ANCHOR_SCAN = re.compile(_literal_trie(ANCHORS))
+
+def _hidden_by(word):
+    """Anchors a non-overlapping scan can hide behind a reported `word`: any that start within it"""
+    return {
+        other for other in ANCHORS
+        if any(word[offset:].startswith(other) or other.startswith(word[offset:])
+               for offset in range(len(word)))
+    }
+
+_ANCHOR_IMPLIED = {word: _hidden_by(word) for word in ANCHORS}
+_FOLD_DOTTED_I = str.maketrans({'İ': 'i', 'ı': 'i'})
+
+_STREET = '(?:' + '|'.join(NOTICE_STREET_SUFFIXES) + ')'
+_SLASH_DATE = r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'
+
+# A TMK as written after its label: an optional "(1)" island prefix, then at least zone, section and
+# plat ("2-3-004", "23-004-005", "123004005"), split by - and : ; a time like "12:00" is not one
+_TMK_VALUE = r'((?:\(\d\)\s*)?(?:\d{8,13}\b|\d-\d-\d|\d{2,3}-\d{1,3}[-:]\d)(?:[\d-]|:(?=\d))*)'
+TMK_PATTERNS = (
+    ('tmk', re.compile(r'TMK[:\s]*' + _TMK_VALUE, re.I)),
+    ('tax map key', re.compile(r'Tax Map Key[:\s]*' + _TMK_VALUE, re.I)),
+    ('tmk', re.compile(r'\(TMK\)\s*' + _TMK_VALUE, re.I)),
+)
+CASE_PATTERNS = (
+    (('case', 'file', 'doc'), re.compile(r'(?:Case|File|Doc|Docket)\s*[#No.]*\s*([A-Z0-9-]+)', re.I)),
+    ('fc', re.compile(r'FC[:\s-]*([0-9-]+)', re.I)),
+    ('mfdr', re.compile(r'MFDR[:\s-]*([0-9-]+)', re.I)),
+)
+NOTICE_CASE_PATTERN = re.compile(r'(Case|MFDR|FC|CV)\s*[#:]?\s*([A-Z0-9-]+)', re.I)
+# Hawaii court docket numbers, e.g. 1CC24-1-000123, 1CCV-24-0001234 or FC-2024-001234
+COURT_CASE_NUMBER = re.compile(r'\b(?:[1-5](?:CCV|CC|FC|DC)-?\d{2}-?\d?-?\d{4,7}|FC-\d{4}-\d{4,7})\b', re.I)
+TRUSTEE_PATTERN = re.compile(r'(?:attorney|counsel|trustee|law firm):\s*([^\n\r.;]+)', re.I)
+TRUSTEE_LABEL_PATTERN = re.compile(r'(?:Trustee|Attorney):\s*([^\n\r.;]+)', re.I)
+ATTORNEY_PATTERN = re.compile(r'(?:attorney|counsel|law firm):\s*([^\n\r]+)', re.I)
+BORROWER_PATTERN = re.compile(r'(?:Borrower|Defendant|Mortgagor):\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', re.I)
+OWNER_PATTERN = re.compile(r'(?:borrower|mortgagor|owner|debtor):\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', re.I)
+VERSUS_PATTERN = re.compile(r'vs\.?\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', re.I)
+NOTICE_DATE_PATTERN = re.compile(rf'(?:Notice Date|Filed|Date of Notice):\s*({_SLASH_DATE})', re.I)
+LABELED_AUCTION_DATE_PATTERN = re.compile(r'(?:auction|sale)\s+(?:date|on):\s*(\w+\s+\d+,?\s+\d{4})', re.I)
+SALE_DATE_PATTERN = re.compile(r'(?:sale date|auction date|date of sale):\s*([A-Za-z]+\s+\d+,?\s+\d{4})', re.I)
+DOLLAR_AMOUNT = re.compile(r'\$[\d,]+\.?\d*')
+
+# Building blocks of the linear scans
+_NUMBER = re.compile(r'[\d,]+\.?\d*')
+_DIGIT = re.compile(r'\d')
+_ZIP_RUN = re.compile(r'\d{5,}')
+_WORD_CHAR = re.compile(r'\w')
+_SPACES = re.compile(r'\s*')
+_NEWLINE = re.compile(r'\n')
+_LINE_OR_COMMA = re.compile(r'[\n\r,]')
+_HAWAII = re.compile(r'hawaii', re.I)
+_STREET_SUFFIX = re.compile(_STREET, re.I)
+_STREET_SUFFIX_AHEAD = re.compile(rf'(?={_STREET})', re.I)
+_AUCTION_WORD = re.compile(r'auction|sale', re.I)
+_DEBT_WORD_AHEAD = re.compile(r'(?=(amount|debt|balance|owed))', re.I)
+_OWED_WORD = re.compile(r'owed|debt|balance', re.I)
+_SLASH_DATE_MATCH = re.compile(_SLASH_DATE)
+_SLASH_DATE_AHEAD = re.compile(rf'(?={_SLASH_DATE})')
+_DATE_ON = re.compile(r'(?:date|on)\s+(\w+\s+\d+,?\s+\d{4})', re.I)
+_DATE_AFTER_WORD = re.compile(r'(?<=\w)\s+\d+,?\s+\d{4}')
+_TIMED_DATE_AFTER_WORD = re.compile(r'(?<=\w)(\s+\d+,?\s+\d{4})\s+at\s+\d+:\d+', re.I)
+_PROPERTY_LABEL = re.compile(r'(?:Property|Subject Property|Real Property|Located at):', re.I)
+_LOCATION_PHRASE = re.compile(r'located at|property at|situated at|known as', re.I)
+# A run of capitalised-or-not words (IGNORECASE makes [A-Z][a-z]+ any 2+ letter word)
+_NAME_CHAIN = re.compile(r'[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*', re.I)
+_FIRM_SUFFIX = r'(?:Esq|Attorney|LLLC|LLC|P\.A\.|ALC)'
+_FIRM_SUFFIX_SHORT = r'(?:Esq|Attorney|LLLC|LLC)'
+_FIRM_AFTER_NAME = re.compile(rf',?\s+{_FIRM_SUFFIX}', re.I)
+_FIRM_INSIDE_NAME = re.compile(rf'\s+{_FIRM_SUFFIX}', re.I)
+_FIRM_AFTER_NAME_SHORT = re.compile(rf',?\s+{_FIRM_SUFFIX_SHORT}', re.I)
+_FIRM_INSIDE_NAME_SHORT = re.compile(rf'\s+{_FIRM_SUFFIX_SHORT}', re.I)
+
+def scan_anchors(text):
+    """Superset of the ANCHORS words present in text, case-insensitively, from a single pass"""
+    found = set()
+    for word in set(_ANCHOR_SCAN.findall(text.translate(_FOLD_DOTTED_I).casefold())):
+        found |= _ANCHOR_IMPLIED[word]
+    return found
+
+class _Segments:
+    """Finds where the separator-delimited segment holding an offset ends
+
+    The last segment found is remembered, so walking offsets forward through
+    a long segment costs one scan of it rather than one per offset.
+    """
+
+    def __init__(self, text, separator):
+        self.text = text
+        self.separator = separator
+        self._from = self._end = -1
+
+    def end(self, pos):
+        """Offset of the first separator at or after pos, or the length of the text"""
+        if not self._from <= pos <= self._end:
+            match = self.separator.search(self.text, pos)
+            self._from, self._end = pos, (match.start() if match else len(self.text))
+        return self._end
+
+def _last_start(pattern, text, start, end):
+    """Start of the last match of pattern inside text[start:end], or -1"""
+    last = -1
+    for match in pattern.finditer(text, start, end):
+        last = match.start()
+    return last
+
+def _amounts_after_debt_words(text):
+    r"""re.findall(r'(?:amount|debt|balance|owed).*?\$?([\d,]+\.?\d*)', text, re.I) in linear time
+
+    Each keyword takes the first number after it on its line; the search then
+    resumes after that number, as findall does.
+    """
+    amounts = []
+    pos = 0
+    while True:
+        word = _DEBT_WORD_AHEAD.search(text, pos)
+        if not word:
+            return amounts
+        line_end = text.find('\n', word.end(1))
+        if line_end == -1:
+            line_end = len(text)
+        number = _NUMBER.search(text, word.end(1), line_end)
+        if number:
+            amounts.append(number.group())
+            pos = number.end()
+        else:
+            # Any later keyword on this line has no number after it either
+            pos = line_end + 1
+
+def _amounts_before_owed_words(text):
+    r"""re.findall(r'\$?([\d,]+\.?\d*).*(?:owed|debt|balance)', text, re.I) in linear time
+
+    The greedy .* consumes up to the line's last keyword, so a line yields at
+    most one amount: its first number, when a keyword follows it.
+    """
+    amounts = []
+    pos = 0
+    while True:
+        number = _NUMBER.search(text, pos)
+        if not number:
+            return amounts
+        line_end = text.find('\n', number.end())
+        if line_end == -1:
+            line_end = len(text)
+        if _OWED_WORD.search(text, number.end(), line_end):
+            amounts.append(number.group())
+        pos = line_end + 1
+
+def _name_before_firm_suffix(text, after_name, inside_name):
+    r"""re.search(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*,?\s+SUFFIX)', text, re.I) in linear time
+
+    The match starts at the first name chain that is followed by a suffix and,
+    the repetition being greedy, ends after the last suffix that chain reaches.
+    """
+    for chain in _NAME_CHAIN.finditer(text):
+        tail = after_name.match(text, chain.end())
+        if tail:
+            return text[chain.start():tail.end()]
+        last = None
+        for last in inside_name.finditer(text, chain.start(), chain.end()):
+            pass
+        if last:
+            return text[chain.start():last.end()]
+    return None
+
+def _word_start(text, end):
+    start = end
+    while start > 0 and _WORD_CHAR.match(text, start - 1):
+        start -= 1
+    return start
+
+def _written_date(text):
+    r"""re.search(r'(\w+\s+\d+,?\s+\d{4})', text).group(1) without rescanning long words"""
+    tail = _DATE_AFTER_WORD.search(text)
+    if tail:
+        return text[_word_start(text, tail.start()):tail.end()]
+    return None
+
+def _written_date_with_time(text):
+    r"""re.search(r'(\w+\s+\d+,?\s+\d{4})\s+at\s+\d+:\d+', text, re.I).group(1), likewise"""
+    tail = _TIMED_DATE_AFTER_WORD.search(text)
+    if tail:
+        return text[_word_start(text, tail.start()):tail.end(1)]
+    return None
+
+def _first_with_word_after(pattern, text, lines, group=0):
+    """First match of pattern followed later on its line by auction/sale (a trailing `.*(?:auction|sale)`)"""
+    last_word = {}  # line end -> (offset searched from, last keyword start)
+    pos = 0
+    while True:
+        match = pattern.search(text, pos)
+        if not match:
+            return None
+        end = match.end(group)
+        line_end = lines.end(end)
+        searched_from, last = last_word.get(line_end, (None, -1))
+        if searched_from is None or end < searched_from:
+            last = _last_start(_AUCTION_WORD, text, end, line_end)
+            last_word[line_end] = (end, last)
+        if last >= end:
+            return match.group(group)
+        pos = match.start() + 1
+
+def _slash_date_after_auction_word(text, lines):
+    """re.search(r'(?:auction|sale).*(DATE)', text, re.I).group(1): the line's last date after the first keyword"""
+    pos = 0
+    while True:
+        word = _AUCTION_WORD.search(text, pos)
+        if not word:
+            return None
+        line_end = lines.end(word.end())
+        date_start = _last_start(_SLASH_DATE_AHEAD, text, word.end(), line_end)
+        if date_start >= word.end():
+            return _SLASH_DATE_MATCH.match(text, date_start, line_end).group()
+        pos = line_end + 1
+
+def _street_after_label(text, label, segments):
+    r"""Group 1 of LABEL\s*([^SEP]+STREET[^SEP]*) where segments splits the text at SEP"""
+    last_suffix = {}  # segment end -> last suffix start, searched from the segment's first label
+    for head in label.finditer(text):
+        start = _SPACES.match(text, head.end()).end()
+        segment_end = segments.end(start)
+        if segment_end not in last_suffix:
+            last_suffix[segment_end] = _last_start(_STREET_SUFFIX_AHEAD, text, start + 1, segment_end)
+        if last_suffix[segment_end] > start:
+            return text[start:segment_end]
+        # \s* can hand its last character back when the suffix starts right away
+        if (start > head.end() and not segments.separator.match(text, start - 1)
+                and _STREET_SUFFIX.match(text, start, segment_end)):
+            return text[start - 1:segment_end]
+    return None
+
+def _numbered_street(text, segments):
+    r"""Group 1 of (\d+[^SEP]+STREET[^SEP]*): the first number with a suffix later in its segment"""
+    pos = 0
+    while True:
+        digit = _DIGIT.search(text, pos)
+        if not digit:
+            return None
+        segment_end = segments.end(digit.start())
+        if _STREET_SUFFIX.search(text, digit.start() + 2, segment_end):
+            return text[digit.start():segment_end]
+        pos = segment_end + 1
+
+def _hawaii_street_address(text, lines):
+    r"""Group 1 of (\d+[^\n]+STREET[^\n]*Hawaii[^\n]*\d{5}) under re.I, one line at a time"""
+    pos = 0
+    while True:
+        hawaii = _HAWAII.search(text, pos)
+        if not hawaii:
+            return None
+        line_start = text.rfind('\n', pos, hawaii.start()) + 1
+        if line_start == 0:
+            line_start = pos
+        line_end = lines.end(hawaii.start())
+        pos = line_end + 1
+
+        zip_start = -1
+        for run in _ZIP_RUN.finditer(text, line_start, line_end):
+            zip_start = run.end() - 5
+        state_start = _last_start(_HAWAII, text, line_start, zip_start) if zip_start >= 0 else -1
+        suffix_start = _last_start(_STREET_SUFFIX_AHEAD, text, line_start, state_start) if state_start >= 0 else -1
+        digit = _DIGIT.search(text, line_start, line_end)
+        if digit and suffix_start >= digit.start() + 2:
+            return text[digit.start():zip_start + 5]
+
+def _first(candidates, found):
+    """First non-None result among (anchor words, finder) pairs, skipping finders whose words are absent"""
+    for words, finder in candidates:
+        if words and found.isdisjoint((words,) if isinstance(words, str) else words):
+            continue
+        value = finder()
+        if value is not None:
+            return value
+    return None
+
+def _group(pattern, text, group=1):
+    def finder():
+        match = pattern.search(text)
+        return match.group(group) if match else None
+    return finder
+
+def _amounts_over(values, floor=1000):
+    amounts = []
+    for value in values:
+        try:
+            amount = float(str(value).replace('$', '').replace(',', ''))
+        except ValueError:
+            continue
+        if amount > floor:  # Filter out small numbers that aren't loan amounts
+            amounts.append(amount)
+    return amounts
+
+def extract_detailed_notice_fields(text):
+    """TMK, auction date, attorney, case number and largest amount from a full MFDR notice"""
+    text = text[:MAX_NOTICE_CHARS]
+    found = scan_anchors(text)
+    lines = _Segments(text, _NEWLINE)
+    info = {}
+
+    # TMK (Tax Map Key) - Hawaiian property identifier
+    tmk = _first([(words, _group(pattern, text)) for words, pattern in TMK_PATTERNS], found)
+    if tmk is not None:
+        info['tmk'] = tmk.strip()
+
+    auction_words = ('auction', 'sale')
+    auction_date = _first([
+        (auction_words, _group(LABELED_AUCTION_DATE_PATTERN, text)),
+        (auction_words, lambda: _first_with_word_after(_DATE_ON, text, lines, group=1)),
+        (auction_words, lambda: _first_with_word_after(_SLASH_DATE_MATCH, text, lines)),
+        (auction_words, lambda: _slash_date_after_auction_word(text, lines)),
+    ], found)
+    if auction_date is not None:
+        info['auction_date'] = auction_date.strip()
+
+    attorney = _first([
+        (('attorney', 'counsel', 'trustee', 'law firm'), _group(TRUSTEE_PATTERN, text)),
+        (('esq', 'attorney', 'llc', 'p.a.', 'alc'),
+         lambda: _name_before_firm_suffix(text, _FIRM_AFTER_NAME, _FIRM_INSIDE_NAME)),
+        (('trustee', 'attorney'), _group(TRUSTEE_LABEL_PATTERN, text)),
+    ], found)
+    if attorney is not None:
+        info['attorney_info'] = attorney.strip()
+
+    case_number = _first([(words, _group(pattern, text)) for words, pattern in CASE_PATTERNS], found)
+    if case_number is not None:
+        info['case_number'] = case_number.strip()
+
+    # Take the largest amount from the first pattern that finds any over $1000
+    amount_finders = [
+        ('$', lambda: DOLLAR_AMOUNT.findall(text)),
+        (('amount', 'debt', 'balance', 'owed'), lambda: _amounts_after_debt_words(text)),
+        (('owed', 'debt', 'balance'), lambda: _amounts_before_owed_words(text)),
+    ]
+    for words, finder in amount_finders:
+        if found.isdisjoint((words,) if isinstance(words, str) else words):
+            continue
+        amounts = _amounts_over(finder())
+        if amounts:
+            info['amount_owed'] = max(amounts)
+            break
+
+    return info
+
+def extract_notice_fields(text):
+    """Case number, address, borrower, notice date and first amount from an MFDR notice page"""
+    text = text[:MAX_NOTICE_CHARS]
+    found = scan_anchors(text)
+    lines = _Segments(text, _NEWLINE)
+    info = {}
+
+    if not found.isdisjoint(('case', 'mfdr', 'fc', 'cv')):
+        case_match = NOTICE_CASE_PATTERN.search(text)
+        if case_match:
+            info['case_number'] = case_match.group(2)
+
+    address = _first([
+        (('property', 'located at'), lambda: _street_after_label(text, _PROPERTY_LABEL, lines)),
+        ('hawaii', lambda: _hawaii_street_address(text, lines)),
+    ], found)
+    if address is not None:
+        info['address'] = address.strip()
+
+    borrower = _first([
+        (('borrower', 'defendant', 'mortgagor'), _group(BORROWER_PATTERN, text)),
+        ('vs', _group(VERSUS_PATTERN, text)),
+    ], found)
+    if borrower is not None:
+        info['borrower_name'] = borrower.strip()
+
+    notice_date = _first([
+        (('notice date', 'filed', 'date of notice'), _group(NOTICE_DATE_PATTERN, text)),
+        (None, lambda: _written_date(text)),
+    ], found)
+    if notice_date is not None:
+        info['notice_date'] = notice_date.strip()
+
+    if '$' in found:
+        amount_match = DOLLAR_AMOUNT.search(text)
+        if amount_match:
+            try:
+                info['amount_owed'] = float(amount_match.group().replace('$', '').replace(',', ''))
+            except ValueError:
+                pass
+
+    return info
+
+def extract_property_fields(text):
+    """Address, owner, auction date and attorney from a Star-Advertiser legal notice"""
+    text = text[:MAX_NOTICE_CHARS]
+    found = scan_anchors(text)
+    segments = _Segments(text, _LINE_OR_COMMA)
+    info = {}
+
+    address = _first([
+        (('located at', 'property at', 'situated at', 'known as'),
+         lambda: _street_after_label(text, _LOCATION_PHRASE, segments)),
+        (None, lambda: _numbered_street(text, segments)),
+    ], found)
+    if address is not None:
+        info['address'] = address.strip()
+
+    owner = _first([
+        (('borrower', 'mortgagor', 'owner', 'debtor'), _group(OWNER_PATTERN, text)),
+        ('vs', _group(VERSUS_PATTERN, text)),
+    ], found)
+    if owner is not None:
+        info['owner'] = owner.strip()
+
+    auction_date = _first([
+        (('sale date', 'auction date', 'date of sale'), _group(SALE_DATE_PATTERN, text)),
+        (None, lambda: _written_date_with_time(text)),
+    ], found)
+    if auction_date is not None:
+        info['auction_date'] = auction_date.strip()
+
+    attorney = _first([
+        (('attorney', 'counsel', 'law firm'), _group(ATTORNEY_PATTERN, text)),
+        (('esq', 'attorney', 'llc'),
+         lambda: _name_before_firm_suffix(text, _FIRM_AFTER_NAME_SHORT, _FIRM_INSIDE_NAME_SHORT)),
+    ], found)
+    if attorney is not None:
+        info['attorney'] = attorney.strip()
+
+    return info
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+
+from disk_cache import DEFAULT_CACHE_ROOT
+
+STATE_VERSION = 1
+
+def content_hash(text):
+    """Short stable digest of notice content"""
+    return hashlib.sha1((text or '').encode('utf-8')).hexdigest()[:16]
+
+def notice_identity(notice):
+    """Identity of a notice: its view link, else case number, else TMK"""
+    for field in ('view_link', 'case_number', 'tmk'):
+        value = notice.get(field)
+        if value:
+            return f"{field}:{value}"
+    return None
+
+class NoticeStateStore:
+    """Fingerprints of notices already emitted, persisted between incremental runs
+
+    Each notice is stored as identity -> content hash, both shortened to 16 hex
+    characters so the file stays small even with years of notices.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._seen = {}
+        self.counts = {'new': 0, 'changed': 0, 'unchanged': 0}
+        self._load()
+
+    @classmethod
+    def for_source(cls, source, path=None):
+        return cls(path or os.path.join(DEFAULT_CACHE_ROOT, 'state', f"{source}.json"))
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == STATE_VERSION:
+                self._seen = data.get('notices', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable state file {self.path}: {e}", file=sys.stderr)
+
+    def reset_counts(self):
+        """Start a new run's new/changed/unchanged tally"""
+        with self._lock:
+            self.counts = {'new': 0, 'changed': 0, 'unchanged': 0}
+
+    def check(self, identity, digest):
+        """Classify a notice as 'new', 'changed' or 'unchanged' and count it"""
+        key = content_hash(identity)
+        with self._lock:
+            previous = self._seen.get(key)
+            if previous is None:
+                status = 'new'
+            elif previous != digest:
+                status = 'changed'
+            else:
+                status = 'unchanged'
+            self.counts[status] += 1
+        return status
+
+    def mark(self, identity, digest):
+        with self._lock:
+            self._seen[content_hash(identity)] = digest
+
+    def save(self):
+        """Write the store; safe while a run is still marking, and from several threads at once"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:
+            payload = {'version': STATE_VERSION, 'notices': dict(self._seen)}
+        with self._save_lock:
+            with open(tmp_path, 'w') as f:
+                json.dump(payload, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+
+    def summary(self):
+        return {**self.counts, 'tracked': len(self._seen)}
@@ -0,0 +1,175 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+
+from pipeline import FetchParsePipeline
+
+DEFAULT_ARCHIVE_ROOT = os.environ.get(
+    'SCRAPER_ARCHIVE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '.cache', 'archive')
+)
+
+# A segment is closed and a new one started once it holds this many compressed bytes
+SEGMENT_BYTES = 64 * 1024 * 1024
+
+SEGMENT_SUFFIX = '.pages.gz'
+INDEX_SUFFIX = '.idx'
+
+def add_archive_arguments(parser):
+    parser.add_argument('--reparse-archive', action='store_true',
+                        help="Parse the pages stored in the raw page archive instead of fetching anything, "
+                             "on every CPU unless --parse-workers says otherwise")
+    parser.add_argument('--archive-since', metavar='DATE', default=None,
+                        help="With --reparse-archive, only pages fetched on or after this ISO date")
+
+class PageArchive:
+    """Append-only store of every fetched response body, for re-parsing without the network
+
+    Each response is one gzip member (a JSON header line with URL, fetch
+    time, status and headers, then the body) appended to the current
+    segment, so a segment is itself a valid .gz file. Next to it an index
+    holds one JSON line per response with its URL, fetch time, body
+    SHA-256 and the member's offset and length, so any page can be read
+    back without decompressing the others. Segment names start with their
+    creation time and carry the process id, so concurrent writers never
+    share a file and name order is fetch order.
+    """
+
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES):
+        self.directory = os.path.abspath(directory)
+        self.segment_bytes = segment_bytes
+        self._segment = None
+        self._index = None
+        self._name = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def append(self, url, body, status=200, headers=None, fetched_at=None):
+        """Store one response body; return its index entry"""
+        fetched_at = fetched_at or datetime.now(timezone.utc).isoformat(timespec='seconds')
+        header = {'url': url, 'fetched_at': fetched_at, 'status': status, 'headers': dict(headers or {})}
+        member = gzip.compress(json.dumps(header).encode('utf-8') + b'\n' + body, compresslevel=6)
+        entry = {'url': url, 'fetched_at': fetched_at, 'status': status,
+                 'sha256': hashlib.sha256(body).hexdigest(), 'size': len(body)}
+
+        with self._lock:
+            if self._segment is None or self._segment.tell() >= self.segment_bytes:
+                self._open_segment()
+            entry.update(segment=self._name, offset=self._segment.tell(), length=len(member))
+            self._segment.write(member)
+            self._segment.flush()
+            # The index line goes last: an entry is only listed once its bytes are on disk
+            self._index.write(json.dumps(entry) + '\n')
+            self._index.flush()
+        return entry
+
+    def _open_segment(self):
+        self._close_segment()
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        self._name = f"{stamp}-{os.getpid()}-{self._sequence:04d}"
+        self._sequence += 1
+        path = os.path.join(self.directory, self._name)
+        self._segment = open(path + SEGMENT_SUFFIX, 'ab')
+        self._index = open(path + INDEX_SUFFIX, 'a')
+
+    def _close_segment(self):
+        for f in (self._segment, self._index):
+            if f is not None:
+                f.close()
+        self._segment = self._index = None
+
+    def close(self):
+        with self._lock:
+            self._close_segment()
+
+    def entries(self, since=None):
+        """Index entries of every stored response in fetch order, those fetched before `since` skipped"""
+        for index_path in sorted(glob.glob(os.path.join(self.directory, f"*{INDEX_SUFFIX}"))):
+            with open(index_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a killed run
+                    if since and entry['fetched_at'] < since:
+                        continue
+                    yield entry
+
+    def read(self, entry):
+        """(header, body) of an index entry"""
+        with open(os.path.join(self.directory, entry['segment'] + SEGMENT_SUFFIX), 'rb') as f:
+            f.seek(entry['offset'])
+            member = f.read(entry['length'])
+        header, _, body = gzip.decompress(member).partition(b'\n')
+        return json.loads(header), body
+
+def open_archive(namespace):
+    """Open the page archive of a scraper, or None if archiving is disabled"""
+    if os.environ.get('SCRAPER_ARCHIVE', '').lower() in ('0', 'off', 'false', 'no'):
+        return None
+    try:
+        return PageArchive(os.path.join(DEFAULT_ARCHIVE_ROOT, namespace))
+    except OSError as e:
+        print(f"Archive disabled, could not open {namespace} archive: {e}", file=sys.stderr)
+        return None
+
+def iter_reparsed(archive, page, parse, parse_workers=1, since=None):
+    """Records re-parsed from every archived page, with no network access
+
+    `page(url, html)` turns an archived page into the payload of
+    `parse(payload)`, which returns the page's records and runs on
+    `parse_workers` processes like a live run's parse; `page` returns None
+    for pages to leave out. A body archived again unchanged under the same
+    URL is parsed once. Records' scraped_at becomes the time their page
+    was fetched.
+    """
+    if archive is None:
+        print("Nothing to re-parse: the page archive is disabled", file=sys.stderr)
+        return
+    seen = set()
+    stats = {'pages': 0, 'unchanged': 0, 'skipped': 0}
+
+    def entries():
+        for entry in archive.entries(since):
+            if entry.get('status') != 200:
+                continue
+            key = (entry['url'], entry['sha256'])
+            if key in seen:
+                stats['unchanged'] += 1
+                continue
+            seen.add(key)
+            yield entry
+
+    def load(entry):
+        header, body = archive.read(entry)
+        encoding = _charset(header.get('headers', {})) or 'utf-8'
+        return page(entry['url'], body.decode(encoding, errors='replace'))
+
+    pipeline = FetchParsePipeline(load, parse, parse_workers=parse_workers, label=lambda entry: entry['url'])
+    try:
+        for entry, records in pipeline.map(entries()):
+            if records is None:
+                stats['skipped'] += 1
+                continue
+            stats['pages'] += 1
+            for record in records:
+                if 'scraped_at' in record:
+                    record['scraped_at'] = entry['fetched_at']
+                yield record
+    finally:
+        pipeline.close()
+        print(f"Archive [{os.path.basename(archive.directory)}]: {stats['pages']} pages re-parsed, "
+              f"{stats['unchanged']} unchanged copies and {stats['skipped']} other pages skipped",
+              file=sys.stderr)
+
+def _charset(headers):
+    for name, value in headers.items():
+        if name.lower() == 'content-type' and 'charset=' in value:
+            return value.split('charset=', 1)[1].split(';')[0].strip().strip('"') or None
+    return None
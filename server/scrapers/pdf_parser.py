@@ -1,55 +1,458 @@
-        import json
-        import sys
-        from datetime import datetime
+import hashlib
+import json
+import mmap
+import os
+import resource
+import sys
+import argparse
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
 
-        def parse_judiciary_documents():
-            """Mock PDF parser for Hawaii Judiciary foreclosure cases"""
-            try:
-                # Mock data for Hawaii Judiciary foreclosure cases
-                properties = [
-                    {
-                        'address': '321 Court St, Honolulu, HI 96817',
-                        'defendant': 'Michael Thompson',
-                        'case_number': 'FC-2024-001234',
-                        'status': 'foreclosure',
-                        'source': 'hawaii_judiciary',
-                        'estimated_value': 675000,
-                        'amount_owed': 485000,
-                        'attorney_info': 'Hawaii Legal Group',
-                        'source_url': 'https://www.courts.state.hi.us/',
-                        'scraped_at': datetime.now().isoformat()
-                    },
-                    {
-                        'address': '789 Judicial Way, Kailua, HI 96734',
-                        'defendant': 'Sarah Wilson',
-                        'case_number': 'FC-2024-001235',
-                        'status': 'foreclosure',
-                        'source': 'hawaii_judiciary',
-                        'estimated_value': 890000,
-                        'amount_owed': 620000,
-                        'attorney_info': 'Pacific Law Firm',
-                        'source_url': 'https://www.courts.state.hi.us/',
-                        'scraped_at': datetime.now().isoformat()
-                    }
-                ]
-
-                return properties
+from PyPDF2 import PdfReader, __version__ as PYPDF2_VERSION
 
-            except Exception as e:
-                return []
+from disk_cache import open_cache
+from notice_extract import (
+    COURT_CASE_NUMBER, extract_detailed_notice_fields, extract_notice_fields, extract_property_fields
+)
+from instrumentation import ScraperRun, add_instrumentation_arguments
+from record_output import RecordWriter, add_output_arguments, install_sigterm_handler
+from records import JudiciaryCase
+from tmk import tag_canonical_tmk
 
-        if __name__ == "__main__":
-            try:
-                properties = parse_judiciary_documents()
+# Directory of downloaded court PDFs read when --pdf-dir is not given
+DEFAULT_PDF_DIR = os.environ.get(
+    'JUDICIARY_PDF_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '.cache', 'judiciary_pdfs')
+)
+
+# Pages read per worker task; small tasks keep every worker's memory flat on long dockets
+PAGES_PER_TASK = 25
+
+# A case without docket numbers on its pages is cut after this many pages
+MAX_CASE_PAGES = 50
+
+# Cached page text is keyed by PDF content and this version; bump it (or upgrade PyPDF2) to re-read every PDF
+TEXT_CACHE_VERSION = f"1:{PYPDF2_VERSION}"
+
+# Version of the case fields; bump it when build_case_record or the shared extractors change, and
+# cached documents get their fields extracted again from their cached text
+CASE_FIELDS_VERSION = 2
+
+# Document kept open by each worker between tasks: (path, file, memory map, reader)
+_open_document = None
+
+def _document_reader(path):
+    """PdfReader over a read-only memory map of `path`, reused while tasks stay on the same file"""
+    global _open_document
+    if _open_document and _open_document[0] == path:
+        return _open_document[3]
+
+    close_document()
+    f = open(path, 'rb')
+    try:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        f.close()
+        raise
+    # PdfReader seeks through the map and only resolves the objects a page needs
+    _open_document = (path, f, data, PdfReader(data))
+    return _open_document[3]
+
+def close_document():
+    global _open_document
+    if _open_document:
+        _, f, data, _ = _open_document
+        _open_document = None
+        data.close()
+        f.close()
+
+def page_count(path):
+    return len(_document_reader(path).pages)
+
+def read_page_texts(path, start, stop):
+    """Text of pages [start, stop) of a PDF as (page number, text) pairs"""
+    reader = _document_reader(path)
+    texts = []
+    for number in range(start, stop):
+        try:
+            texts.append((number, reader.pages[number].extract_text() or ''))
+        except Exception as e:
+            print(f"Error reading page {number + 1} of {path}: {e}", file=sys.stderr)
+            texts.append((number, ''))
+
+    # Drop the content streams read so far; page objects resolve them again if needed
+    reader.resolved_objects.clear()
+    return texts
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+class CasePages:
+    """Consecutive pages of one PDF belonging to the same court case"""
+
+    def __init__(self, path, first_page, case_number):
+        self.path = path
+        self.first_page = first_page
+        self.last_page = first_page
+        self.case_number = case_number
+        self.texts = []
+
+    def continues_with(self, path, case_number):
+        if path != self.path or len(self.texts) >= MAX_CASE_PAGES:
+            return False
+        return not (case_number and self.case_number and case_number != self.case_number)
+
+    def add(self, number, text, case_number):
+        self.last_page = number
+        self.case_number = self.case_number or case_number
+        self.texts.append(text)
+
+def build_case_record(case):
+    """Foreclosure case record from the text of a case's pages, or None if it names no case or property"""
+    text = '\n'.join(case.texts)
+    detailed = extract_detailed_notice_fields(text)
+    notice = extract_notice_fields(text)
+    # Court filings label addresses like newspaper notices more often than like MFDR pages
+    notice_property = extract_property_fields(text)
+
+    case_number = case.case_number or detailed.get('case_number') or notice.get('case_number')
+    address = notice.get('address') or notice_property.get('address', '')
+    if not case_number and not address:
+        return None
+
+    # Name patterns run on across line breaks; a caption name never does
+    defendant = (notice.get('borrower_name') or notice_property.get('owner', '')).split('\n')[0].strip()
+
+    record = {
+        'address': address,
+        'defendant': defendant,
+        'case_number': case_number or '',
+        'status': 'foreclosure',
+        'source': 'hawaii_judiciary',
+        'amount_owed': detailed.get('amount_owed', notice.get('amount_owed', 0)),
+        'attorney_info': detailed.get('attorney_info') or notice_property.get('attorney', ''),
+        'pages': f"{case.first_page + 1}-{case.last_page + 1}",
+    }
+    for key in ('auction_date', 'tmk'):
+        if key in detailed:
+            record[key] = detailed[key]
+    return tag_canonical_tmk(record)
+
+def extract_case_records(case):
+    """Records of one case as a list, the unit the text cache stores per document"""
+    record = build_case_record(case)
+    return [record] if record else []
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+class PdfDocument:
+    """One PDF of a run, with what the text cache has for it and what this run gathers for it"""
+
+    def __init__(self, path, digest):
+        self.path = path
+        self.digest = digest
+        self.cache_key = hashlib.sha256(f"{TEXT_CACHE_VERSION}:{digest}".encode('utf-8')).hexdigest()
+        self.cached_texts = None    # page texts from the cache
+        self.cached_records = None  # records from the cache, when extracted with CASE_FIELDS_VERSION
+        self.texts = []
+        self.records = []
+        self.complete = True        # False once a page or case fails, so the document is not cached
+
+class JudiciaryDocumentParser:
+    """Turns a directory of Hawaii Judiciary foreclosure PDFs into case records
+
+    Pages are read in tasks of PAGES_PER_TASK pages spread over a process
+    pool; each worker memory-maps the PDF and extracts one page at a time, so
+    no document is ever loaded whole. Cases are assembled from consecutive
+    pages by docket number, and their fields are extracted on the same pool.
+    Records come out in document order.
+
+    Page text and records are cached per document under the SHA-256 of the
+    PDF, so an unchanged PDF is neither read nor extracted again.
+    """
+
+    def __init__(self, pdf_dir=None, workers=None, cache=None):
+        self.pdf_dir = pdf_dir if pdf_dir is not None else DEFAULT_PDF_DIR
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.cache = cache if cache is not None else open_cache('judiciary_pdf')
+        self.stats = {}
+        self._emitting = None
+
+    def pdf_paths(self):
+        if not self.pdf_dir or not os.path.isdir(self.pdf_dir):
+            raise FileNotFoundError(f"Judiciary PDF directory {self.pdf_dir!r} does not exist; "
+                                    f"set JUDICIARY_PDF_DIR or --pdf-dir to the downloaded court PDFs")
+        return sorted(
+            entry.path for entry in os.scandir(self.pdf_dir)
+            if entry.is_file() and entry.name.lower().endswith('.pdf')
+        )
 
-                # Ensure we always output valid JSON
-                if properties:
-                    print(json.dumps(properties, default=str))
-                else:
-                    print("[]")
+    def iter_cases(self):
+        """Yield one foreclosure record per case found in the PDF directory"""
+        # Raised to the caller, not reported as a run that found nothing
+        paths = self.pdf_paths()
+        self.stats = {
+            'documents': 0, 'cached_documents': 0, 'cached_text_documents': 0, 'pages': 0,
+            'read_seconds': 0.0, 'extract_seconds': 0.0,
+        }
+        self._emitting = None
+        started = time.perf_counter()
 
+        # Workers are spawned, not forked, as the daemon and run_all call this from threads
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context('spawn'))
+        window = self.workers * 2
+        chunks = self._read_ahead(executor, self._tasks(paths), window)
+        cases = deque()
+        current = current_doc = None
+
+        try:
+            for doc, texts in chunks:
+                if doc.cached_records is not None:
+                    # Unchanged PDF with current fields: its records come straight from the cache
+                    if current:
+                        self._extract(executor, cases, current_doc, current)
+                        current = None
+                    cases.append((doc, _done(doc.cached_records)))
+                    self.stats['pages'] += len(doc.cached_texts)
+                    continue
+
+                for number, text in texts:
+                    case_match = COURT_CASE_NUMBER.search(text)
+                    case_number = case_match.group() if case_match else None
+                    if current is None or not current.continues_with(doc.path, case_number):
+                        if current:
+                            self._extract(executor, cases, current_doc, current)
+                        current, current_doc = CasePages(doc.path, number, case_number), doc
+                    current.add(number, text, case_number)
+                    doc.texts.append(text)
+                    self.stats['pages'] += 1
+
+                # Finished cases are extracted on the pool too; emit them in order once the window fills
+                yield from self._emit(cases, window)
+
+            if current:
+                self._extract(executor, cases, current_doc, current)
+            yield from self._emit(cases, 0)
+            self._store(self._emitting)
+
+        except Exception as e:
+            print(f"Error parsing judiciary documents: {e}", file=sys.stderr)
+        finally:
+            chunks.close()
+            # Joining the pool before the report makes its peak RSS count
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+            close_document()
+            self._report(time.perf_counter() - started)
+
+    def _extract(self, executor, cases, doc, case):
+        cases.append((doc, self._run(executor, 'extract_seconds', extract_case_records, case)))
+
+    def _tasks(self, paths):
+        """(document, first page, stop page) read tasks; (document, None, None) when the cache has its text"""
+        for path in paths:
+            try:
+                doc = PdfDocument(path, file_sha256(path))
+                if self._load_cached(doc):
+                    self.stats['documents'] += 1
+                    yield doc, None, None
+                    continue
+                pages = page_count(path)
             except Exception as e:
-                # Always output valid JSON, even on error
-                print("[]")
+                print(f"Error opening {path}: {e}", file=sys.stderr)
+                continue
             finally:
-                sys.stdout.flush()
\ No newline at end of file
+                close_document()
+
+            self.stats['documents'] += 1
+            for start in range(0, pages, PAGES_PER_TASK):
+                yield doc, start, min(start + PAGES_PER_TASK, pages)
+
+    def _load_cached(self, doc):
+        """Fill in the document's cached text (and records, if current); False on a cache miss"""
+        entry = self.cache.get(doc.cache_key) if self.cache is not None else None
+        if not entry:
+            return False
+        try:
+            data = json.loads(zlib.decompress(entry[0]))
+        except (zlib.error, ValueError) as e:
+            print(f"Ignoring unreadable cached text for {doc.path}: {e}", file=sys.stderr)
+            return False
+
+        doc.cached_texts = list(enumerate(data['pages']))
+        if data.get('fields_version') == CASE_FIELDS_VERSION:
+            doc.cached_records = data['records']
+            self.stats['cached_documents'] += 1
+        else:
+            self.stats['cached_text_documents'] += 1
+        return True
+
+    def _read_ahead(self, executor, tasks, window):
+        """Yield (document, page texts) per task in input order, keeping up to `window` tasks in flight"""
+        pending = deque()
+        for doc, start, stop in tasks:
+            if start is None:
+                pending.append((doc, _done(doc.cached_texts)))
+            else:
+                pending.append((doc, self._run(executor, 'read_seconds', read_page_texts, doc.path, start, stop)))
+            if len(pending) >= window:
+                yield self._page_texts(*pending.popleft())
+        while pending:
+            yield self._page_texts(*pending.popleft())
+
+    def _run(self, executor, stat, fn, *args):
+        """Submit fn to the pool, or run it here when there is none; either way return a Future"""
+        if executor is not None:
+            return executor.submit(fn, *args)
+
+        future = Future()
+        started = time.perf_counter()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        self.stats[stat] += time.perf_counter() - started
+        return future
+
+    def _result(self, stat, future):
+        waited = time.perf_counter()
+        try:
+            return future.result()
+        finally:
+            self.stats[stat] += time.perf_counter() - waited
+
+    def _page_texts(self, doc, future):
+        try:
+            return doc, self._result('read_seconds', future)
+        except Exception as e:
+            print(f"Error reading {doc.path}: {e}", file=sys.stderr)
+            doc.complete = False
+            return doc, []
+
+    def _emit(self, cases, keep):
+        """Yield the records of finished cases until `keep` remain, caching each document as it completes"""
+        while len(cases) > keep:
+            doc, future = cases.popleft()
+            if doc is not self._emitting:
+                self._store(self._emitting)
+                self._emitting = doc
+
+            try:
+                records = self._result('extract_seconds', future)
+            except Exception as e:
+                print(f"Error extracting judiciary case from {doc.path}: {e}", file=sys.stderr)
+                doc.complete = False
+                continue
+
+            if doc.cached_records is None:
+                doc.records.extend(records)
+            source_url = f"file://{os.path.abspath(doc.path)}"
+            for record in records:
+                yield JudiciaryCase.from_dict({**record, 'source_url': source_url, 'scraped_at': datetime.now().isoformat()})
+
+    def _store(self, doc):
+        """Cache a fully processed document's page text and records"""
+        if doc is None or self.cache is None or doc.cached_records is not None or not doc.complete:
+            return
+        payload = {'fields_version': CASE_FIELDS_VERSION, 'pages': doc.texts, 'records': doc.records}
+        meta = {'path': doc.path, 'sha256': doc.digest, 'text_version': TEXT_CACHE_VERSION,
+                'pages': len(doc.texts), 'stored_at': time.time()}
+        try:
+            self.cache.put(doc.cache_key, zlib.compress(json.dumps(payload).encode('utf-8'), 1), meta)
+        except OSError as e:
+            print(f"Could not cache text of {doc.path}: {e}", file=sys.stderr)
+        doc.texts = doc.records = None
+
+    def _report(self, elapsed):
+        pages = self.stats['pages']
+        self.stats.update({
+            'elapsed_seconds': round(elapsed, 3),
+            'pages_per_sec': round(pages / elapsed, 1) if elapsed else 0.0,
+            'peak_rss_mb': peak_rss_mb(),
+            'worker_peak_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN),
+        })
+        print(
+            f"Parsed {self.stats['documents']} documents ({self.stats['cached_documents']} from cache, "
+            f"{self.stats['cached_text_documents']} from cached text), {pages} pages in {elapsed:.1f}s "
+            f"({self.stats['pages_per_sec']} pages/sec, {self.workers} workers); peak RSS "
+            f"{self.stats['peak_rss_mb']} MB, workers {self.stats['worker_peak_rss_mb']} MB",
+            file=sys.stderr
+        )
+
+def parse_judiciary_documents(pdf_dir=None, workers=None):
+    """Parse Hawaii Judiciary foreclosure cases from a directory of PDFs"""
+    return list(iter_judiciary_documents(pdf_dir, workers))
+
+def iter_judiciary_documents(pdf_dir=None, workers=None):
+    """Yield Hawaii Judiciary foreclosure cases one record at a time"""
+    return JudiciaryDocumentParser(pdf_dir, workers).iter_cases()
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Parse Hawaii Judiciary foreclosure documents")
+    parser.add_argument('--pdf-dir', default=None,
+                        help="Directory of court PDFs (default: $JUDICIARY_PDF_DIR, else .cache/judiciary_pdfs)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes reading PDF pages (default: one per CPU; 1 = in-process)")
+    add_instrumentation_arguments(parser)
+    add_output_arguments(parser)
+    return parser
+
+def create_scraper(args):
+    return JudiciaryDocumentParser(args.pdf_dir, args.workers)
+
+def iter_records(scraper, args):
+    return scraper.iter_cases()
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    run = ScraperRun.from_args('hawaii_judiciary', args)
+
+    install_sigterm_handler()
+    writer = RecordWriter(ndjson=args.ndjson, dedupe=args.dedupe, score=args.score,
+                          raw_text=args.raw_text)
+    scraper = None
+    complete = False
+    exit_code = 0
+
+    try:
+        scraper = create_scraper(args)
+        writer.write_all(iter_records(scraper, args))
+        complete = True
+
+        # Mock data is intentionally not emitted when no documents are found
+        if not writer.count:
+            print("Debug: No foreclosure cases found in judiciary documents", file=sys.stderr)
+
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        exit_code = 1
+    except Exception as e:
+        print(f"Debug: Error in main execution: {e}", file=sys.stderr)
+    finally:
+        summary = {'source': 'hawaii_judiciary'}
+        if scraper and scraper.stats:
+            reported = ('documents', 'cached_documents', 'pages', 'pages_per_sec')
+            summary.update({key: scraper.stats[key] for key in reported if key in scraper.stats})
+        # Always output valid JSON, even on error
+        writer.finish(complete=complete, **summary)
+        if run.metrics is not None and scraper and scraper.stats:
+            # Pages are read and cases extracted on the parser's worker pool; these are the waits for them
+            run.metrics.add('parse', scraper.stats.get('read_seconds', 0.0))
+            run.metrics.add('extract', scraper.stats.get('extract_seconds', 0.0))
+        run.finish(records=writer.count)
+    sys.exit(exit_code)
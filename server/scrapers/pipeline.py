@@ -0,0 +1,168 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+
+import instrumentation
+
+# Items in flight per worker: enough to keep every stage busy, few enough that raw pages stay bounded
+WINDOW_PER_WORKER = 2
+
+def add_pipeline_arguments(parser):
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help="Processes parsing fetched pages (1 = parse in the scraper's process, 0 = one per CPU; "
+                             "default: 1)")
+
+def parse_worker_count(requested, default=1):
+    """Worker processes for a --parse-workers value; None means `default`, 0 one per CPU"""
+    if requested is None:
+        requested = default
+    return requested if requested > 0 else os.cpu_count() or 1
+
+class FetchParsePipeline:
+    """Fetch on threads, parse on worker processes, results back in input order
+
+    `fetch(item)` runs on `fetch_workers` threads and returns the page
+    payload to parse (or None to skip the item). `parse(payload)` runs on
+    `parse_workers` processes, so it must be a module-level function whose
+    payload and result pickle; with one parse worker it runs inline in the
+    consuming thread instead, with nothing pickled. At most `window` items
+    are fetched or parsed ahead of the consumer, which bounds both the raw
+    pages held in memory and the requests made past a point where the
+    consumer stops.
+
+    Parse workers are spawned, not forked, and all started by `map`'s
+    caller: pages are handed to them from fetch threads, and the daemon
+    and run_all run whole scrapers on threads, so a fork could copy a
+    lock some other thread holds.
+
+    When the run collects metrics, each page's parse is timed as the
+    "page" stage under `label(item)` (its URL), and metrics gathered in
+    worker processes are merged back into the run's.
+    """
+
+    def __init__(self, fetch, parse, fetch_workers=1, parse_workers=1, window=None, label=None):
+        self.fetch = fetch
+        self.parse = parse
+        self.label = label
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.window = window or WINDOW_PER_WORKER * (self.fetch_workers + self.parse_workers)
+        self._fetch_pool = None
+        self._parse_pool = None
+
+    def map(self, items):
+        """Yield (item, parse result) for each item in order; None results for skipped or failed fetches
+
+        Items are drawn from `items` only as the window frees up, so it may
+        be a lazy or endless generator. Leaving the loop early cancels
+        whatever has not started.
+        """
+        if self._fetch_pool is None:
+            self._fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        if self.parse_workers > 1 and self._parse_pool is None:
+            self._parse_pool = self._start_parse_pool()
+
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(self._submit(item))
+                if len(pending) >= self.window:
+                    yield self._result(*pending.popleft())
+            while pending:
+                yield self._result(*pending.popleft())
+        finally:
+            for _, fetched, parsed in pending:
+                fetched.cancel()
+                parsed.cancel()
+
+    def _start_parse_pool(self):
+        """A process pool with its workers already started from this thread"""
+        pool = ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=get_context('spawn'))
+        # The pool starts a worker per submit while none is idle; later submits from fetch threads reuse them
+        for _ in range(self.parse_workers):
+            pool.submit(os.getpid)
+        return pool
+
+    def _submit(self, item):
+        """(item, fetch future, result future) of a newly submitted item"""
+        fetched = self._fetch_pool.submit(self.fetch, item)
+        if self._parse_pool is None:
+            return item, fetched, fetched
+
+        # The parse is queued on the process pool as soon as its page arrives, not when the consumer asks
+        parsed = Future()
+        metrics = instrumentation.current()
+        url = self._label(item) if metrics is not None else None
+
+        def hand_over(future):
+            if future.cancelled() or future.exception() is not None or future.result() is None:
+                _copy_outcome(future, parsed)
+                return
+            try:
+                if metrics is None:
+                    submitted = self._parse_pool.submit(self.parse, future.result())
+                else:
+                    submitted = self._parse_pool.submit(_parse_in_worker, self.parse, future.result(), url)
+                submitted.add_done_callback(lambda done: _copy_outcome(done, parsed, metrics))
+            except RuntimeError:
+                # The pool was shut down while this page was being fetched
+                parsed.cancel()
+
+        fetched.add_done_callback(hand_over)
+        return item, fetched, parsed
+
+    def _result(self, item, fetched, parsed):
+        try:
+            outcome = parsed.result()
+            if self._parse_pool is None and outcome is not None:
+                with instrumentation.Timer('page', self._label(item)):
+                    outcome = self.parse(outcome)
+        except Exception as e:
+            print(f"Pipeline error on {item!r:.120}: {e}", file=sys.stderr)
+            return item, None
+        return item, outcome
+
+    def _label(self, item):
+        if self.label is None or instrumentation.current() is None:
+            return None
+        try:
+            return self.label(item)
+        except Exception:
+            return None
+
+    def close(self):
+        if self._fetch_pool is not None:
+            self._fetch_pool.shutdown(wait=False, cancel_futures=True)
+            self._fetch_pool = None
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=True, cancel_futures=True)
+            self._parse_pool = None
+
+def _parse_in_worker(parse, payload, url):
+    """parse(payload) in a worker process, returned with the metrics it recorded there"""
+    metrics = instrumentation.start_worker_metrics()
+    with instrumentation.Timer('page', url):
+        result = parse(payload)
+    return result, metrics.state()
+
+def _copy_outcome(source, target, metrics=None):
+    """Settle `target` as `source` ended, unless the consumer has cancelled it meanwhile
+
+    With `metrics`, `source` came from _parse_in_worker: its metrics are
+    merged and only the parse result is passed on.
+    """
+    try:
+        if source.cancelled():
+            target.cancel()
+        elif source.exception() is not None:
+            target.set_exception(source.exception())
+        elif metrics is not None:
+            result, state = source.result()
+            metrics.merge(state)
+            target.set_result(result)
+        else:
+            target.set_result(source.result())
+    except InvalidStateError:
+        pass
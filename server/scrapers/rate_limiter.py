@@ -0,0 +1,150 @@
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Request rate (per second) and burst for hosts no scraper has configured
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 2
+
+# Responses telling us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+# Backoff after a throttling response without Retry-After doubles from BACKOFF_BASE up to
+# MAX_PAUSE seconds; longer Retry-After values are capped too, as runs are killed after 5 minutes
+BACKOFF_BASE = 2.0
+MAX_PAUSE = 120.0
+
+# After throttling, the rate drops to half (no lower than MIN_RATE_FACTOR of the configured rate)
+# and each successful request wins back RECOVERY_STEP of the configured rate
+MIN_RATE_FACTOR = 0.1
+RECOVERY_STEP = 0.1
+
+def retry_after_seconds(response):
+    """Delay requested by a Retry-After header (seconds or HTTP date), or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class TokenBucket:
+    """Hands out request start times: `rate` per second on average, up to `burst` back to back
+
+    Callers reserve a token and sleep for the returned delay outside the lock,
+    so waiting threads queue in reservation order. A pause empties the bucket
+    and starts refilling only once the pause is over.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, float(burst))
+        self.strikes = 0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self):
+        """Take one token; return the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(0.0, self._updated - now)
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return wait
+
+    def configure(self, rate, burst):
+        with self._lock:
+            self.base_rate = self.rate = rate
+            self.burst = max(1.0, float(burst))
+            self._tokens = min(self._tokens, self.burst)
+
+    def throttled(self, retry_after=None):
+        """Slow down after a throttling response; return the pause applied"""
+        with self._lock:
+            self.strikes += 1
+            self.rate = max(self.base_rate * MIN_RATE_FACTOR, self.rate / 2)
+            if retry_after is None:
+                retry_after = BACKOFF_BASE * 2 ** (self.strikes - 1)
+            pause = min(MAX_PAUSE, retry_after)
+
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, now + pause)
+            return pause
+
+    def succeeded(self):
+        with self._lock:
+            self.strikes = 0
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_STEP)
+
+class HostRateLimiter:
+    """Per-host token buckets shared by every scraper session in the process
+
+    Sessions call acquire() right before a network request (never for cache
+    hits) and observe() with the response, which backs the host off on 429/503,
+    honouring Retry-After, and eases back to the configured rate on success.
+    """
+
+    def __init__(self, default_rate=DEFAULT_RATE, default_burst=DEFAULT_BURST):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.default_rate, self.default_burst)
+            return self._buckets[host]
+
+    def configure(self, url_or_host, rate, burst=None):
+        """Set the sustained rate (requests/sec) and burst for a host"""
+        host = urlparse(url_or_host).netloc or url_or_host
+        self.bucket(host).configure(rate, burst if burst is not None else max(1.0, rate))
+
+    def acquire(self, url):
+        """Block until a request to `url` may start; return the seconds waited"""
+        wait = self.bucket(urlparse(url).netloc).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def observe(self, url, response):
+        """Record a response; return the backoff pause if the host asked us to slow down, else None"""
+        host = urlparse(url).netloc
+        bucket = self.bucket(host)
+        if response.status_code not in THROTTLE_STATUSES:
+            bucket.succeeded()
+            return None
+
+        pause = bucket.throttled(retry_after_seconds(response))
+        print(
+            f"Throttled by {host} ({response.status_code}); pausing {pause:.1f}s, "
+            f"rate now {bucket.rate:.2f} req/s",
+            file=sys.stderr
+        )
+        return pause
+
+# The limiter every CachedSession uses unless given its own
+RATE_LIMITER = HostRateLimiter()
@@ -0,0 +1,139 @@
+import json
+import signal
+import sys
+
+from dedup import RecordMerger
+from instrumentation import Timer, stage
+from lead_scoring import SCORE_BATCH, score_batch
+from records import RAW_TEXT_MODES, TRUNCATED_CHARS, compact_record, record_json
+
+def add_output_arguments(parser):
+    parser.add_argument('--ndjson', action='store_true',
+                        help="Stream one JSON object per line as records are parsed, then a summary line")
+    parser.add_argument('--dedupe', action='store_true',
+                        help="Merge records for the same property (by TMK, parcel or address) before "
+                             "writing; records are then written only when the run ends")
+    parser.add_argument('--score', action='store_true',
+                        help="Add priority, days_until_auction, value_prior and equity_ratio to each record, "
+                             f"scoring {SCORE_BATCH} records per pass")
+    parser.add_argument('--raw-text', choices=RAW_TEXT_MODES, default='full',
+                        help="Notice raw_text/content: keep it, truncate it to "
+                             f"{TRUNCATED_CHARS} characters, replace it with the content hash it is stored "
+                             "under in the notice_text cache, or omit it (default: %(default)s)")
+    parser.add_argument('--omit-raw-text', dest='raw_text', action='store_const', const='omit',
+                        help="Same as --raw-text omit")
+
+def install_sigterm_handler():
+    """Turn SIGTERM into SystemExit so generators close and the summary line is still written"""
+    def handle_sigterm(signum, frame):
+        sys.exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+class RecordWriter:
+    """Writes scraper records to stdout as one JSON array (default) or as NDJSON lines
+
+    In NDJSON mode every record is flushed as soon as it is written, so a
+    killed run still leaves all records parsed so far on stdout. The final
+    line is a summary object tagged with "_type": "summary".
+
+    With dedupe, records are held in a RecordMerger and the merged records
+    are written by finish(), which runs even when the scraper is killed.
+    `count` is the number of records received either way.
+
+    With score, records are held back in batches of SCORE_BATCH and scored
+    by lead_scoring.score_batch in one pass per batch before being written.
+
+    Records waiting for the JSON array are kept as their source's slotted
+    record class, and the array is written one record at a time.
+    """
+
+    def __init__(self, ndjson=False, stream=None, dedupe=False, score=False, raw_text='full'):
+        self.ndjson = ndjson
+        self.stream = stream or sys.stdout
+        self.merger = RecordMerger() if dedupe else None
+        self.score = score
+        self.raw_text = raw_text
+        self.count = 0
+        self.written = 0
+        self._buffer = []
+        self._unscored = []
+        self._finished = False
+
+    def write(self, record):
+        self.count += 1
+        if self.merger is not None:
+            with Timer('dedupe'):
+                self.merger.add(record)
+        else:
+            self._emit(record)
+
+    def _emit(self, record):
+        if self.score:
+            self._unscored.append(record)
+            if len(self._unscored) >= SCORE_BATCH:
+                self._flush_unscored()
+        else:
+            self._write(record)
+
+    def _flush_unscored(self):
+        if not self._unscored:
+            return
+        records, self._unscored = self._unscored, []
+        with Timer('score'):
+            records = score_batch(records)
+        for record in records:
+            self._write(record)
+
+    @stage('serialize')
+    def _write(self, record):
+        self.written += 1
+        if self.ndjson:
+            self.stream.write(record_json(record, self.raw_text) + '\n')
+            self.stream.flush()
+        else:
+            self._buffer.append(compact_record(record))
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+
+    def finish(self, complete=True, **summary):
+        if self._finished:
+            return
+        self._finished = True
+
+        if self.merger is not None:
+            with Timer('dedupe'):
+                merged = list(self.merger.records())
+            for record in merged:
+                self._emit(record)
+            summary = {**summary, 'dedupe': self.merger.stats()}
+        self._flush_unscored()
+
+        if self.ndjson:
+            line = {'_type': 'summary', 'records': self.written, 'complete': complete, **summary}
+            self.stream.write(json.dumps(line, default=str) + '\n')
+        else:
+            # One line, as before, but without building the whole array as a single string
+            with Timer('serialize'):
+                separator = '['
+                for record in self._buffer:
+                    self.stream.write(separator + record_json(record, self.raw_text))
+                    separator = ', '
+                self.stream.write("]\n" if self._buffer else "[]\n")
+            self._buffer = []
+        self.stream.flush()
+
+def read_records(stream):
+    """Records from scraper output (a JSON array or NDJSON lines); summary lines are skipped"""
+    text = stream.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    records = []
+    for line in text.splitlines():
+        if line.strip():
+            record = json.loads(line)
+            if record.get('_type') != 'summary':
+                records.append(record)
+    return records
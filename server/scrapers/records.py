@@ -0,0 +1,321 @@
+import json
+import sys
+from collections.abc import MutableMapping
+from dataclasses import dataclass, fields
+
+from disk_cache import open_cache
+from notice_state import content_hash
+
+# What becomes of a record's notice text on output: kept, cut to a preview, replaced by the
+# content hash it is stored under in the notice_text cache, or left out
+RAW_TEXT_MODES = ('full', 'truncate', 'hash', 'omit')
+RAW_TEXT_FIELDS = ('raw_text', 'content')
+TRUNCATED_CHARS = 500
+
+class _Unset:
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'UNSET'
+
+    def __reduce__(self):
+        # Unpickles as the module's one UNSET, so `is UNSET` holds across processes
+        return 'UNSET'
+
+# Default of optional fields: the field is absent from the record, not None
+UNSET = _Unset()
+
+class Record(MutableMapping):
+    """Base of the per-source record classes: a slotted dataclass that reads and writes like a dict
+
+    Known fields live in slots and keys outside them in `extra`, so the
+    scrapers, dedup and scoring code keep using record['field'] and
+    record.get(). ALIASES are output names that repeat another field
+    (MFDR's borrower_name is its owner_name) and DERIVED fields are
+    rebuilt from others (a Star-Advertiser notice's raw_text is its title
+    and content); neither is stored unless set to a different value.
+    ORDER is the key order of the dict the scraper used to build.
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+    ALIASES = {}
+    DERIVED = {}
+    ORDER = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        """A record with exactly the keys of `data`; fields it lacks stay unset rather than defaulted"""
+        record = cls(**dict.fromkeys(cls.FIELDS, UNSET))
+        for key, value in data.items():
+            record[key] = value
+        return record
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is UNSET:
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        if key in self.ALIASES:
+            return self[self.ALIASES[key]]
+        if key in self.DERIVED:
+            value = self.DERIVED[key](self)
+            if value is not UNSET:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+            return
+        if key in self.ALIASES or key in self.DERIVED:
+            try:
+                if self[key] == value:
+                    if self.extra:
+                        self.extra.pop(key, None)
+                    return
+            except KeyError:
+                pass
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            if getattr(self, key) is UNSET:
+                raise KeyError(key)
+            setattr(self, key, UNSET)
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for key in self.ORDER:
+            if key in self:
+                yield key
+        if self.extra:
+            for key in self.extra:
+                if key not in self.ORDER:
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def to_dict(self):
+        """The record as a plain dict, keys in ORDER then extras; the fast path of dict(record)"""
+        extra = self.extra or {}
+        data = {}
+        for key in self.ORDER:
+            if key in extra:
+                data[key] = extra[key]
+            elif key in self.FIELDS:
+                value = getattr(self, key)
+                if value is not UNSET:
+                    data[key] = value
+            elif key in self.ALIASES:
+                value = getattr(self, self.ALIASES[key])
+                if value is not UNSET:
+                    data[key] = value
+            else:
+                value = self.DERIVED[key](self)
+                if value is not UNSET:
+                    data[key] = value
+        for key, value in extra.items():
+            if key not in data:
+                data[key] = value
+        return data
+
+    def copy(self):
+        record = type(self)(**{name: getattr(self, name) for name in self.FIELDS})
+        record.extra = dict(self.extra) if self.extra else None
+        return record
+
+def record_class(cls):
+    """Make a Record subclass a slotted dataclass and fill in its FIELDS and ORDER"""
+    cls = dataclass(slots=True, eq=False)(cls)
+    cls.FIELDS = frozenset(field.name for field in fields(cls) if field.name != 'extra')
+    cls.ORDER = tuple(cls.ORDER) or tuple(field.name for field in fields(cls) if field.name != 'extra')
+    cls.RANK = {key: rank for rank, key in enumerate(cls.ORDER)}
+    return cls
+
+def _notice_text(record):
+    if record.title is UNSET or record.content is UNSET:
+        return UNSET
+    return f"{record.title} {record.content}".strip()
+
+def _mfdr_row_text(record):
+    if UNSET in (record.owner_name, record.address, record.posting_date):
+        return UNSET
+    return f"Owner: {record.owner_name} | Address: {record.address} | Posted: {record.posting_date}"
+
+@record_class
+class StarAdvertiserNotice(Record):
+    """A foreclosure or auction notice from the Star-Advertiser legal notices"""
+
+    title: str = ''
+    content: str = ''
+    address: str = ''
+    owner_name: str = ''
+    auction_date: str = ''
+    attorney_info: str = ''
+    status: str = 'foreclosure'
+    source: str = 'star_advertiser'
+    source_url: str = ''
+    scraped_at: str = ''
+    extra: dict = None
+
+    DERIVED = {'raw_text': _notice_text}
+    ORDER = ('title', 'content', 'address', 'owner_name', 'auction_date', 'attorney_info', 'status',
+             'source', 'source_url', 'scraped_at', 'raw_text')
+
+@record_class
+class MfdrNotice(Record):
+    """A row of the eHawaii MFDR notice table, with the details of its notice page once fetched"""
+
+    owner_name: str = ''
+    address: str = ''
+    posting_date: str = ''
+    view_link: str = ''
+    status: str = 'mfdr_notice'
+    source: str = 'ehawaii_mfdr'
+    source_url: str = ''
+    scraped_at: str = ''
+    tmk: object = UNSET
+    canonical_tmk: object = UNSET
+    auction_date: object = UNSET
+    attorney_info: object = UNSET
+    case_number: object = UNSET
+    amount_owed: object = UNSET
+    has_details: object = UNSET
+    extra: dict = None
+
+    ALIASES = {'borrower_name': 'owner_name', 'notice_date': 'posting_date'}
+    DERIVED = {'raw_data': _mfdr_row_text}
+    ORDER = ('owner_name', 'borrower_name', 'address', 'posting_date', 'notice_date', 'view_link', 'status',
+             'source', 'source_url', 'scraped_at', 'raw_data', 'tmk', 'auction_date', 'attorney_info',
+             'case_number', 'amount_owed', 'has_details', 'canonical_tmk')
+
+@record_class
+class JudiciaryCase(Record):
+    """A foreclosure case read from Hawaii Judiciary PDFs"""
+
+    address: str = ''
+    defendant: str = ''
+    case_number: str = ''
+    status: str = 'foreclosure'
+    source: str = 'hawaii_judiciary'
+    amount_owed: object = 0
+    attorney_info: str = ''
+    pages: str = ''
+    auction_date: object = UNSET
+    tmk: object = UNSET
+    canonical_tmk: object = UNSET
+    source_url: str = ''
+    scraped_at: str = ''
+    extra: dict = None
+
+@record_class
+class TaxDelinquency(Record):
+    """A property on a Honolulu tax-delinquency list"""
+
+    address: str = ''
+    parcel_number: str = ''
+    owner_name: str = ''
+    amount_owed: object = 0
+    status: str = 'tax_delinquent'
+    source: str = 'honolulu_tax'
+    canonical_tmk: object = UNSET
+    source_url: object = UNSET
+    extra: dict = None
+
+RECORD_CLASSES = {
+    'star_advertiser': StarAdvertiserNotice,
+    'ehawaii_mfdr': MfdrNotice,
+    'hawaii_judiciary': JudiciaryCase,
+    'honolulu_tax': TaxDelinquency,
+}
+
+def compact_record(record):
+    """The record as its source's slotted class, when that writes its keys back in the same order
+
+    Records of other shapes (an MFDR notice page, a merged record) are
+    returned as they are.
+    """
+    if isinstance(record, Record) or not isinstance(record, dict):
+        return record
+    cls = RECORD_CLASSES.get(record.get('source'))
+    if cls is None:
+        return record
+    last = -1
+    for key in record:
+        rank = cls.RANK.get(key, len(cls.ORDER))
+        if rank < last:
+            return record
+        last = rank
+    return cls.from_dict(record)
+
+class TextStore:
+    """Notice text stored once per content hash in the notice_text cache"""
+
+    def __init__(self):
+        self.cache = open_cache('notice_text')
+        self._stored = set()
+
+    def put(self, text):
+        digest = content_hash(text)
+        if digest not in self._stored:
+            self._stored.add(digest)
+            if self.cache is not None:
+                try:
+                    self.cache.put(digest, text.encode('utf-8'), {'chars': len(text)})
+                except OSError as e:
+                    print(f"Could not store notice text {digest}: {e}", file=sys.stderr)
+        return digest
+
+    def get(self, digest):
+        entry = self.cache.get(digest) if self.cache is not None else None
+        return entry[0].decode('utf-8') if entry else None
+
+_text_store = None
+
+def text_store():
+    global _text_store
+    if _text_store is None:
+        _text_store = TextStore()
+    return _text_store
+
+def record_dict(record, raw_text='full'):
+    """A record as the plain dict written to the output, with its notice text handled per `raw_text`"""
+    data = record.to_dict() if isinstance(record, Record) else record
+    if raw_text == 'full' or not any(field in data for field in RAW_TEXT_FIELDS):
+        return data
+    if data is record:
+        data = dict(record)
+    if raw_text == 'omit':
+        for field in RAW_TEXT_FIELDS:
+            data.pop(field, None)
+    elif raw_text == 'truncate':
+        for field in RAW_TEXT_FIELDS:
+            value = data.get(field)
+            if isinstance(value, str) and len(value) > TRUNCATED_CHARS:
+                data[field] = value[:TRUNCATED_CHARS]
+    elif raw_text == 'hash':
+        text = data.pop('raw_text', None) or data.get('content')
+        data.pop('content', None)
+        if text:
+            data['raw_text_hash'] = text_store().put(text)
+    return data
+
+def record_json(record, raw_text='full'):
+    return json.dumps(record_dict(record, raw_text), default=str)
@@ -0,0 +1,125 @@
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+# Seconds to wait for a connection and then between bytes of the response; a hung host costs at most
+# their sum per attempt instead of the whole run
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 20.0
+
+# Retries of a GET that failed to connect, timed out or got a server error, after a jittered
+# exponential delay: uniform between 0 and BACKOFF_BASE * 2**retry, capped at BACKOFF_MAX seconds
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+# Responses meaning the host failed the request; a retry may get through
+SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+
+# Errors of requests meaning the host could not be reached or did not answer in time
+TRANSIENT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+# Consecutive failures that trip a host's breaker, and how long it then stays open before a probe
+FAILURE_THRESHOLD = 3
+COOL_DOWN = 30.0
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request to a host whose breaker is open"""
+
+class RetryPolicy:
+    """Timeouts and the retry budget of a session's GETs (which are idempotent, so always safe to retry)"""
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def delay(self, retry):
+        """Seconds to wait before retry number `retry` (0-based), with full jitter"""
+        return random.uniform(0.0, min(self.backoff_max, self.backoff_base * 2 ** retry))
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one host
+
+    Closed, requests go through. After `threshold` failures in a row it
+    opens and every request fails at once for `cool_down` seconds; then a
+    single probe is let through (half open), whose success closes the
+    breaker and whose failure opens it again. A probe that never reports
+    back (its thread was interrupted) does not hold the breaker half open:
+    after another `cool_down` the next request is let through as a probe.
+    """
+
+    def __init__(self, threshold=FAILURE_THRESHOLD, cool_down=COOL_DOWN):
+        self.threshold = threshold
+        self.cool_down = cool_down
+        self.state = 'closed'
+        self.failures = 0
+        self.trips = 0
+        self._opened = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a request may be sent now"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if time.monotonic() - self._opened >= self.cool_down:
+                # Open and cooled down, or half open with a probe that has gone quiet for as long
+                self.state = 'half_open'
+                self._opened = time.monotonic()
+                return True
+            # Open, or half open with the probe still in flight
+            return False
+
+    def succeeded(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def failed(self):
+        """Record a failure; return True if it opened the breaker"""
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.threshold):
+                self.state = 'open'
+                self._opened = time.monotonic()
+                self.trips += 1
+                return True
+            return False
+
+    def summary(self):
+        with self._lock:
+            return {'state': self.state, 'consecutive_failures': self.failures, 'trips': self.trips}
+
+class HostCircuitBreakers:
+    """Per-host breakers shared by every scraper session in the process"""
+
+    def __init__(self, threshold=FAILURE_THRESHOLD, cool_down=COOL_DOWN):
+        self.threshold = threshold
+        self.cool_down = cool_down
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, url_or_host):
+        host = urlparse(url_or_host).netloc or url_or_host
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.threshold, self.cool_down)
+            return self._breakers[host]
+
+    def failed(self, url, reason):
+        """Record a failed request to `url`'s host, reporting on stderr when it trips the breaker"""
+        breaker = self.breaker(url)
+        if breaker.failed():
+            host = urlparse(url).netloc
+            print(f"Circuit open for {host} after {breaker.failures} consecutive failures ({reason}); "
+                  f"failing its requests for {breaker.cool_down:.0f}s", file=sys.stderr)
+
+# The breakers every CachedSession uses unless given its own
+CIRCUIT_BREAKERS = HostCircuitBreakers()
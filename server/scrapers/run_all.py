@@ -0,0 +1,195 @@
+import argparse
+import json
+import queue
+import shlex
+import sys
+import threading
+import time
+
+from instrumentation import ScraperRun, add_instrumentation_arguments
+from record_output import RecordWriter, add_output_arguments, install_sigterm_handler
+from scraper_registry import SOURCE_MODULES, ScraperRegistry
+
+# Seconds each source may run before it is cancelled; below the 5-minute kill in ScraperService
+DEFAULT_SOURCE_TIMEOUT = 240
+
+# Seconds a cancelled source gets to finish its fetch and save its own state before it is saved for it
+CANCEL_GRACE = 5
+
+_DONE = object()
+
+class SourceRun:
+    """One source scraped on its own thread, feeding tagged records into a shared queue"""
+
+    def __init__(self, registry, source, argv, timeout, output):
+        self.registry = registry
+        self.source = source
+        self.argv = argv
+        self.timeout = timeout
+        self.output = output
+        self.cancelled = threading.Event()
+        self.summary = {}
+        self.status = 'running'
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.deadline = None
+        self.thread = threading.Thread(target=self._run, name=f"scrape-{source}", daemon=True)
+
+    def start(self):
+        self.started = time.monotonic()
+        self.deadline = self.started + self.timeout
+        self.thread.start()
+
+    def _run(self):
+        records = self.registry.iter_records(self.source, self.argv, summary=self.summary)
+        try:
+            for record in records:
+                # Cancellation is checked between records; closing the generator stops further fetches
+                if self.cancelled.is_set():
+                    break
+                self.output.put((self, record))
+        except Exception as e:
+            self.error = str(e)
+            print(f"Source {self.source} failed: {e}", file=sys.stderr)
+        finally:
+            records.close()
+            self.finished = time.monotonic()
+            self.output.put((self, _DONE))
+
+    def report(self):
+        end = self.finished or time.monotonic()
+        elapsed = end - self.started if self.started else 0.0
+        report = {
+            'status': self.status,
+            'records': self.summary.get('records', 0),
+            'elapsed_seconds': round(self.summary.get('elapsed_seconds', elapsed), 3),
+        }
+        if self.error:
+            report['error'] = self.error
+        for key in ('incremental', 'cache', 'transport'):
+            if key in self.summary:
+                report[key] = self.summary[key]
+        return report
+
+def run_sources(registry, sources, argv_by_source, timeout_by_source, emit):
+    """Scrape all sources concurrently, calling emit(source, record) as records arrive"""
+    output = queue.Queue(maxsize=1000)
+    runs = [
+        SourceRun(registry, source, argv_by_source.get(source, []), timeout_by_source[source], output)
+        for source in sources
+    ]
+    for run in runs:
+        run.start()
+
+    active = set(runs)
+    while active:
+        now = time.monotonic()
+        for run in list(active):
+            if now >= run.deadline:
+                run.cancelled.set()
+                run.status = 'timeout'
+                active.discard(run)
+                print(f"Source {run.source} cancelled after {run.timeout}s", file=sys.stderr)
+
+        if not active:
+            break
+
+        wait = max(0.0, min(run.deadline for run in active) - now)
+        try:
+            run, record = output.get(timeout=wait)
+        except queue.Empty:
+            continue
+
+        if run not in active:
+            continue  # late records from a cancelled source
+        if record is _DONE:
+            run.status = 'error' if run.error else 'ok'
+            active.discard(run)
+        else:
+            emit(run.source, record)
+
+    _settle_cancelled(registry, [run for run in runs if run.status == 'timeout'])
+    return {run.source: run.report() for run in runs}
+
+def _settle_cancelled(registry, runs, grace=CANCEL_GRACE):
+    """Give cancelled runs `grace` seconds to stop, then save the state of those still blocked
+
+    A run blocked in a fetch never reaches the registry's cleanup before
+    the process exits; without its state, the notices it already emitted
+    would all be new again next run.
+    """
+    deadline = time.monotonic() + grace
+    for run in runs:
+        run.thread.join(max(0.0, deadline - time.monotonic()))
+    for run in runs:
+        if not run.thread.is_alive():
+            continue
+        try:
+            state = registry.save_state(run.source, run.argv)
+            if state is not None:
+                run.summary['incremental'] = state
+        except Exception as e:
+            print(f"Could not save state of cancelled source {run.source}: {e}", file=sys.stderr)
+
+def _parse_source_options(values, convert, option):
+    parsed = {}
+    for value in values or []:
+        source, _, setting = value.partition('=')
+        if source not in SOURCE_MODULES or not setting:
+            raise SystemExit(f"{option} expects SOURCE=VALUE with SOURCE one of {', '.join(SOURCE_MODULES)}")
+        parsed[source] = convert(setting)
+    return parsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run all scrapers concurrently and merge their records")
+    parser.add_argument('--sources', default=','.join(SOURCE_MODULES),
+                        help="Comma-separated sources to run (default: all)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_SOURCE_TIMEOUT,
+                        help="Per-source timeout in seconds")
+    parser.add_argument('--source-timeout', action='append', metavar='SOURCE=SECONDS',
+                        help="Override the timeout for one source (repeatable)")
+    parser.add_argument('--args', action='append', metavar='SOURCE=ARGS',
+                        help="Extra command-line arguments for one source's scraper (repeatable)")
+    add_instrumentation_arguments(parser)
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    sources = [source.strip() for source in args.sources.split(',') if source.strip()]
+    unknown = [source for source in sources if source not in SOURCE_MODULES]
+    if unknown:
+        parser.error(f"Unknown sources: {', '.join(unknown)}")
+
+    timeouts = {source: args.timeout for source in sources}
+    timeouts.update(_parse_source_options(args.source_timeout, float, '--source-timeout'))
+    argv_by_source = _parse_source_options(args.args, shlex.split, '--args')
+
+    install_sigterm_handler()
+    run = ScraperRun.from_args('run_all', args)
+    writer = RecordWriter(ndjson=args.ndjson, dedupe=args.dedupe, score=args.score,
+                          raw_text=args.raw_text)
+    registry = ScraperRegistry()
+    started = time.monotonic()
+    report = {}
+    complete = False
+
+    def emit(source, record):
+        writer.write({**record, '_source': source})
+
+    try:
+        registry.warm_up()
+        report = run_sources(registry, sources, argv_by_source, timeouts, emit)
+        complete = True
+
+        for source, source_report in report.items():
+            print(f"{source}: {source_report['status']}, {source_report['records']} records "
+                  f"in {source_report['elapsed_seconds']}s", file=sys.stderr)
+
+    except Exception as e:
+        print(f"Debug: Error in main execution: {e}", file=sys.stderr)
+    finally:
+        elapsed = round(time.monotonic() - started, 3)
+        print(json.dumps({'sources': report, 'elapsed_seconds': elapsed}), file=sys.stderr)
+        # Always output valid JSON, even on error
+        writer.finish(complete=complete, sources=report, elapsed_seconds=elapsed)
+        run.finish(records=writer.count)
@@ -0,0 +1,236 @@
+import argparse
+import functools
+import importlib
+import itertools
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from disk_cache import DEFAULT_CACHE_ROOT
+from fixture_replay import SYNTHETIC_SITES, FixtureAdapter, recorded_pages, write_judiciary_docket
+from html_parsing import HTML_PARSER
+from record_output import RecordWriter
+from scraper_registry import SOURCE_MODULES
+
+DEFAULT_SIZES = [10, 1000, 50000]
+DEFAULT_DOCKET_PAGES = [500]
+DEFAULT_OUTPUT = os.path.join(DEFAULT_CACHE_ROOT, 'benchmark.json')
+
+# Scraper methods timed as the extract stage; the parse stage is each module's make_soup
+EXTRACT_METHODS = {
+    'honolulu_tax': ('_parse_property_row', '_parse_property_container'),
+    'ehawaii_mfdr': ('_parse_mfdr_table_row', '_extract_detailed_notice_info', '_extract_notice_details'),
+    'star_advertiser': ('_extract_property_info',),
+}
+
+# Sources benchmarked on a synthetic court docket of a given number of pages
+PDF_SOURCES = ('hawaii_judiciary',)
+
+STAGES = ('fetch', 'parse', 'extract', 'serialize', 'other')
+
+class StageTimer:
+    """Accumulates wall time per pipeline stage for wrapped callables"""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+
+    def wrap(self, stage, func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds[stage] += time.perf_counter() - started
+        return timed
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def prepare_html_scraper(module, scraper, source, size, timer):
+    """Serve the scraper's session from fixtures; return the adapter and the fixture size"""
+    pages = recorded_pages(scraper.session.namespace) if size is None else SYNTHETIC_SITES[source](scraper, size)
+    adapter = FixtureAdapter(pages)
+    del pages
+
+    # Every page goes through the transport, as on a cold run, without rate-limit sleeps
+    session = scraper.session
+    session.cache = None
+    session.rate_limiter = None
+    session.archive = None
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    session.get = timer.wrap('fetch', session.get)
+    module.make_soup = timer.wrap('parse', module.make_soup)
+    # Extract steps are scraper methods or, where pages are parsed on workers, module functions;
+    # with more than one parse worker they run in the workers and are not timed
+    for name in EXTRACT_METHODS[source]:
+        owner = scraper if hasattr(scraper, name) else module
+        setattr(owner, name, timer.wrap('extract', getattr(owner, name)))
+    return adapter, size if size is not None else len(adapter.pages)
+
+def prepare_pdf_scraper(scraper, size, fixture_dir):
+    """Point the parser at a synthetic docket of `size` pages, or leave its PDF directory for recorded runs"""
+    # Every page is read and extracted, as on a cold run
+    scraper.cache = None
+    if size is not None:
+        write_judiciary_docket(os.path.join(fixture_dir, 'docket.pdf'), size)
+        scraper.pdf_dir = fixture_dir
+    return None, size
+
+def run_case(source, size, ndjson=False, quiet=True, parse_workers=1):
+    """Run one scraper end to end against fixtures; meant for a fresh process so peak RSS is its own"""
+    module = importlib.import_module(SOURCE_MODULES[source])
+    argv = [] if source in PDF_SOURCES else ['--parse-workers', str(parse_workers)]
+    args = module.build_arg_parser().parse_args(argv)
+    scraper = module.create_scraper(args)
+    fixtures = 'recorded' if size is None else 'synthetic'
+    timer = StageTimer()
+
+    with tempfile.TemporaryDirectory(prefix='scraper-benchmark-') as fixture_dir:
+        if source in PDF_SOURCES:
+            adapter, size = prepare_pdf_scraper(scraper, size, fixture_dir)
+        else:
+            adapter, size = prepare_html_scraper(module, scraper, source, size, timer)
+        fixture_rss = peak_rss_mb()
+        elapsed, writer = run_scraper(module, scraper, args, source, ndjson, quiet, timer)
+
+    if source in PDF_SOURCES:
+        # Pages are read on the parser's worker pool; parse is the time spent waiting for their text
+        timer.seconds['parse'] = scraper.stats.get('read_seconds', 0.0)
+        timer.seconds['extract'] = scraper.stats.get('extract_seconds', 0.0)
+        if size is None:
+            size = scraper.stats.get('pages', 0)
+
+    stages = {stage: timer.seconds[stage] for stage in STAGES if stage != 'other'}
+    stages['other'] = max(0.0, elapsed - sum(stages.values()))
+    return {
+        'source': source,
+        'fixtures': fixtures,
+        'size': size,
+        'parse_workers': 1 if source in PDF_SOURCES else parse_workers,
+        'unit': 'pages' if source in PDF_SOURCES else 'notices',
+        'records': writer.count,
+        'requests': adapter.requests if adapter else 0,
+        'seconds': round(elapsed, 4),
+        'records_per_sec': round(writer.count / elapsed, 1) if elapsed else 0.0,
+        'stages_seconds': {stage: round(seconds, 4) for stage, seconds in stages.items()},
+        'fixture_rss_mb': fixture_rss,
+        'peak_rss_mb': peak_rss_mb(),
+        'worker_peak_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+def run_scraper(module, scraper, args, source, ndjson, quiet, timer):
+    """Drive iter_records into a RecordWriter on /dev/null; return the wall time and the writer"""
+    stderr = sys.stderr
+    with open(os.devnull, 'w') as devnull:
+        # Progress and per-page messages still cost their write, but do not flood the terminal
+        if quiet:
+            sys.stderr = devnull
+        try:
+            writer = RecordWriter(ndjson=ndjson, stream=devnull)
+            write = timer.wrap('serialize', writer.write)
+            finish = timer.wrap('serialize', writer.finish)
+
+            started = time.perf_counter()
+            for record in module.iter_records(scraper, args):
+                write(record)
+            finish(source=source)
+            elapsed = time.perf_counter() - started
+        finally:
+            sys.stderr = stderr
+    return elapsed, writer
+
+def run_isolated(source, size, ndjson, quiet, parse_workers=1):
+    # A spawned worker starts from a bare interpreter, so ru_maxrss covers this case only
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(run_case, source, size, ndjson, quiet, parse_workers).result()
+
+def case_key(result):
+    key = f"{result['source']}:{result['fixtures']}:{result['size']}"
+    workers = result.get('parse_workers', 1)
+    return key if workers == 1 else f"{key}:{workers}w"
+
+def compare(results, baseline_path, max_slowdown):
+    """Print throughput against a previous results file; return the regressed cases"""
+    with open(baseline_path) as f:
+        baseline = {case_key(result): result for result in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(case_key(result))
+        if not previous or not previous['records_per_sec']:
+            continue
+        ratio = result['records_per_sec'] / previous['records_per_sec']
+        print(f"{case_key(result)}: {ratio:.2f}x baseline throughput", file=sys.stderr)
+        if ratio < 1 - max_slowdown:
+            regressions.append(case_key(result))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers offline against replayed HTML fixtures")
+    parser.add_argument('--source', choices=sorted([*SYNTHETIC_SITES, *PDF_SOURCES]), action='append',
+                        help="Scraper to benchmark (repeatable; default: all)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Notices per synthetic site (default: 10 1000 50000)")
+    parser.add_argument('--docket-pages', type=int, nargs='+', default=DEFAULT_DOCKET_PAGES,
+                        help="Pages per synthetic court docket for the PDF parser (default: 500)")
+    parser.add_argument('--recorded', action='store_true',
+                        help="Replay the pages in each scraper's HTTP cache (and the PDFs in "
+                             "$JUDICIARY_PDF_DIR) instead of synthetic fixtures")
+    parser.add_argument('--ndjson', action='store_true', help="Serialize records as NDJSON lines")
+    parser.add_argument('--parse-workers', type=int, nargs='+', default=[1],
+                        help="Parse worker processes of the HTML scrapers; several values benchmark each (default: 1)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Results file (default: %(default)s)")
+    parser.add_argument('--baseline', default=None, help="Previous results file to compare throughput against")
+    parser.add_argument('--max-slowdown', type=float, default=0.2,
+                        help="Fractional throughput drop against --baseline that fails the run")
+    parser.add_argument('--verbose', action='store_true', help="Show the scrapers' own stderr output")
+    args = parser.parse_args()
+
+    results = []
+    for source in args.source or sorted([*SYNTHETIC_SITES, *PDF_SOURCES]):
+        sizes = args.docket_pages if source in PDF_SOURCES else args.sizes
+        for size, workers in itertools.product([None] if args.recorded else sizes, args.parse_workers):
+            if source in PDF_SOURCES and workers != args.parse_workers[0]:
+                continue
+            result = run_isolated(source, size, args.ndjson, not args.verbose, workers)
+            results.append(result)
+            stages = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in result['stages_seconds'].items())
+            print(
+                f"{case_key(result)}: {result['records']} records in {result['seconds']:.2f}s "
+                f"({result['records_per_sec']:.0f}/s; {stages}; peak RSS {result['peak_rss_mb']} MB)",
+                file=sys.stderr
+            )
+            if not result['records']:
+                print(f"Warning: {case_key(result)} produced no records", file=sys.stderr)
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'html_parser': HTML_PARSER,
+        'ndjson': args.ndjson,
+        'results': results,
+    }
+    # The baseline is read before writing, so --output may overwrite it
+    regressions = compare(results, args.baseline, args.max_slowdown) if args.baseline else []
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if regressions:
+        print(f"Throughput regressed: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+
+from records import record_dict
+from scraper_registry import ScraperRegistry
+
+class DaemonProtocol:
+    """Line-delimited JSON-RPC over one input/output stream pair
+
+    Requests:  {"id": 1, "method": "run", "params": {"source": "ehawaii_mfdr", "args": ["--concurrency", "4"]}}
+    Records:   {"id": 1, "record": {...}}   (one line per record, as soon as it is parsed)
+    Final:     {"id": 1, "result": {...summary...}}  or  {"id": 1, "error": {"message": "..."}}
+
+    Other methods: "ping", "sources", "cancel" ({"params": {"id": 1}}, which
+    stops that run at its next record) and "shutdown". Runs are handled on
+    worker threads, so several sources can be scraped at once.
+    """
+
+    def __init__(self, registry, output, on_shutdown=None):
+        self.registry = registry
+        self.output = output
+        self.on_shutdown = on_shutdown
+        self._write_lock = threading.Lock()
+        self._workers = []
+        self._cancels = {}
+
+    def send(self, message):
+        line = json.dumps(message, default=str) + '\n'
+        with self._write_lock:
+            self.output.write(line)
+            self.output.flush()
+
+    def handle_line(self, line):
+        line = line.strip()
+        if not line:
+            return True
+
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            method = request.get('method')
+            params = request.get('params') or {}
+        except (ValueError, AttributeError) as e:
+            self.send({'id': None, 'error': {'message': f"Invalid request: {e}"}})
+            return True
+
+        if method == 'ping':
+            self.send({'id': request_id, 'result': {'pong': True, 'pid': os.getpid()}})
+        elif method == 'sources':
+            self.send({'id': request_id, 'result': self.registry.sources()})
+        elif method == 'run':
+            cancel = self._cancels[request_id] = threading.Event()
+            worker = threading.Thread(target=self._run, args=(request_id, params, cancel), daemon=True)
+            worker.start()
+            self._workers = [w for w in self._workers if w.is_alive()] + [worker]
+        elif method == 'cancel':
+            cancel = self._cancels.get(params.get('id'))
+            if cancel is not None:
+                cancel.set()
+            self.send({'id': request_id, 'result': {'cancelled': cancel is not None}})
+        elif method == 'shutdown':
+            self.wait()
+            self.send({'id': request_id, 'result': {'stopped': True}})
+            if self.on_shutdown:
+                self.on_shutdown()
+            return False
+        else:
+            self.send({'id': request_id, 'error': {'message': f"Unknown method: {method}"}})
+
+        return True
+
+    def _run(self, request_id, params, cancel):
+        summary = {}
+        try:
+            source = params.get('source')
+            argv = [str(arg) for arg in params.get('args') or []]
+            for record in self.registry.iter_records(source, argv, summary=summary, cancel=cancel):
+                if cancel.is_set():
+                    summary['cancelled'] = True
+                    break
+                self.send({'id': request_id, 'record': record_dict(record)})
+            self.send({'id': request_id, 'result': summary})
+        except SystemExit:
+            # argparse exits on bad arguments; report it instead of stopping the daemon
+            self.send({'id': request_id, 'error': {'message': f"Invalid arguments for {params.get('source')}"}})
+        except Exception as e:
+            print(f"Daemon run {request_id} failed: {e}", file=sys.stderr)
+            self.send({'id': request_id, 'error': {'message': str(e)}})
+        finally:
+            self._cancels.pop(request_id, None)
+
+    def wait(self):
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+def serve_stdio(registry):
+    protocol = DaemonProtocol(registry, sys.stdout)
+    for line in sys.stdin:
+        if not protocol.handle_line(line):
+            return
+    protocol.wait()
+
+def serve_unix_socket(registry, path):
+    if os.path.exists(path):
+        os.remove(path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            output = _SocketWriter(self.wfile)
+            protocol = DaemonProtocol(
+                registry, output,
+                on_shutdown=lambda: threading.Thread(target=server.shutdown, daemon=True).start()
+            )
+            for raw_line in self.rfile:
+                if not protocol.handle_line(raw_line.decode('utf-8')):
+                    break
+            protocol.wait()
+
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"Scraper daemon listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(path)
+
+class _SocketWriter:
+    """Text-mode adapter over a socket's binary write file"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        self.wfile.write(text.encode('utf-8'))
+
+    def flush(self):
+        self.wfile.flush()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Long-lived scraper server speaking line-delimited JSON-RPC")
+    parser.add_argument('--socket', default=None,
+                        help="Listen on this Unix socket path instead of stdin/stdout")
+    args = parser.parse_args()
+
+    registry = ScraperRegistry()
+    registry.warm_up()
+    print(f"Scraper daemon ready (pid {os.getpid()})", file=sys.stderr)
+
+    if args.socket:
+        serve_unix_socket(registry, args.socket)
+    else:
+        serve_stdio(registry)
@@ -0,0 +1,128 @@
+import importlib
+import threading
+import time
+
+from dedup import dedupe_records
+from lead_scoring import iter_scored
+from records import record_dict
+
+# Source name (as used by ScraperService) -> scraper script module
+SOURCE_MODULES = {
+    'star_advertiser': 'staradvertiser_foreclosure_scraper',
+    'honolulu_tax': 'honolulu_tax_scraper',
+    'hawaii_judiciary': 'pdf_parser',
+    'ehawaii_mfdr': 'ehawaii_mfdr_scraper',
+}
+
+# Arguments added by record_output.add_output_arguments
+OUTPUT_OPTIONS = ('ndjson', 'dedupe', 'score', 'raw_text')
+
+class ScraperRegistry:
+    """Keeps scraper instances alive between runs so sessions and connection pools stay warm
+
+    Every source module exposes build_arg_parser(), create_scraper(args) and
+    iter_records(scraper, args); the per-script CLIs use the same three
+    functions, so a run accepts exactly the script's command-line arguments.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._modules = {}
+        self._scrapers = {}
+        self._run_locks = {}
+
+    def sources(self):
+        return list(SOURCE_MODULES)
+
+    def module(self, source):
+        if source not in SOURCE_MODULES:
+            raise ValueError(f"Unknown scraping source: {source}")
+        with self._lock:
+            if source not in self._modules:
+                self._modules[source] = importlib.import_module(SOURCE_MODULES[source])
+            return self._modules[source]
+
+    def warm_up(self):
+        """Import every scraper module up front"""
+        for source in SOURCE_MODULES:
+            self.module(source)
+
+    def parse_args(self, source, argv=()):
+        return self.module(source).build_arg_parser().parse_args(list(argv))
+
+    def _scraper_for(self, source, args):
+        # Output flags do not affect the scraper, so they do not split the instance cache
+        options = tuple(sorted((k, v) for k, v in vars(args).items() if k not in OUTPUT_OPTIONS))
+        key = (source, options)
+        with self._lock:
+            if key not in self._scrapers:
+                self._scrapers[key] = self._modules[source].create_scraper(args)
+                self._run_locks[key] = threading.Lock()
+            return self._scrapers[key], self._run_locks[key]
+
+    def save_state(self, source, argv=()):
+        """Persist the incremental state of a source's scraper, e.g. for a run whose thread is stuck in a fetch"""
+        scraper, _ = self._scraper_for(source, self.parse_args(source, argv))
+        state = getattr(scraper, 'state', None)
+        if state:
+            state.save()
+            return state.summary()
+        return None
+
+    def iter_records(self, source, argv=(), summary=None, cancel=None):
+        """Yield records for one run of a source; fills `summary` with counts and timing
+
+        Setting the `cancel` event ends the run at the next record the
+        scraper produces, dedupe or not, and releases the source for the
+        next run.
+        """
+        module = self.module(source)
+        args = self.parse_args(source, argv)
+        scraper, run_lock = self._scraper_for(source, args)
+        state = getattr(scraper, 'state', None)
+        summary = summary if summary is not None else {}
+        summary.update({'source': source, 'records': 0})
+        started = time.monotonic()
+
+        # A scraper instance is not re-entrant; concurrent runs of the same source queue up
+        with run_lock:
+            if state:
+                state.reset_counts()
+            try:
+                records = module.iter_records(scraper, args)
+                if cancel is not None:
+                    records = _until_cancelled(records, cancel, summary)
+                if getattr(args, 'dedupe', False):
+                    summary['dedupe'] = {}
+                    records = dedupe_records(records, summary['dedupe'])
+                if getattr(args, 'score', False):
+                    records = iter_scored(records)
+                raw_text = getattr(args, 'raw_text', 'full')
+                if raw_text != 'full':
+                    records = (record_dict(record, raw_text) for record in records)
+                for record in records:
+                    summary['records'] += 1
+                    yield record
+            finally:
+                summary['elapsed_seconds'] = round(time.monotonic() - started, 3)
+                if state:
+                    state.save()
+                    summary['incremental'] = state.summary()
+                session = getattr(scraper, 'session', None)
+                if session is not None and hasattr(session, 'stats'):
+                    summary['cache'] = dict(session.stats)
+                if session is not None and hasattr(session, 'transport_summary'):
+                    summary['transport'] = session.transport_summary()
+
+def _until_cancelled(records, cancel, summary):
+    """`records` until `cancel` is set; closing them stops the scraper's fetches"""
+    try:
+        for record in records:
+            if cancel.is_set():
+                summary['cancelled'] = True
+                return
+            yield record
+    finally:
+        close = getattr(records, 'close', None)
+        if close:
+            close()
@@ -0,0 +1,172 @@
+import re
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+# First TMK digit: the county division. Honolulu's own lists usually leave it out.
+ISLANDS = {1: 'Oahu', 2: 'Maui', 3: 'Hawaii', 4: 'Kauai'}
+HONOLULU = 1
+
+# A packed key is the 13 TMK digits read as one integer, so keys sort like TMKs and each
+# island, zone, section, plat and parcel is a contiguous key range
+CPR_PLACE = 1
+PARCEL_PLACE = 10 ** 4
+PLAT_PLACE = 10 ** 7
+SECTION_PLACE = 10 ** 10
+ZONE_PLACE = 10 ** 11
+ISLAND_PLACE = 10 ** 12
+
+# Digit counts of zone, section, plat, parcel and CPR
+_FIELD_WIDTHS = (1, 1, 3, 3, 4)
+
+_ISLAND_PREFIX = re.compile(r'\(\s*([1-4])\s*\)')
+_DIGIT_RUN = re.compile(r'\d+')
+
+class Tmk(namedtuple('Tmk', 'island zone section plat parcel cpr')):
+    """A parsed Tax Map Key; island is 0 when the source left it out"""
+
+    __slots__ = ()
+
+    @property
+    def key(self):
+        return (self.island * ISLAND_PLACE + self.zone * ZONE_PLACE + self.section * SECTION_PLACE
+                + self.plat * PLAT_PLACE + self.parcel * PARCEL_PLACE + self.cpr)
+
+    @classmethod
+    def from_key(cls, key):
+        island, key = divmod(key, ISLAND_PLACE)
+        zone, key = divmod(key, ZONE_PLACE)
+        section, key = divmod(key, SECTION_PLACE)
+        plat, key = divmod(key, PLAT_PLACE)
+        parcel, cpr = divmod(key, PARCEL_PLACE)
+        return cls(island, zone, section, plat, parcel, cpr)
+
+    def matches(self, other):
+        """Same parcel and CPR, with an unknown island matching any island"""
+        return self[1:] == other[1:] and (self.island == other.island or not self.island or not other.island)
+
+    def __str__(self):
+        island = f"{self.island}-" if self.island else ''
+        return f"{island}{self.zone}-{self.section}-{self.plat:03d}-{self.parcel:03d}-{self.cpr:04d}"
+
+def _split_compact(digits):
+    """Zone..CPR fields of an undivided 8- or 12-digit TMK"""
+    fields = []
+    pos = 0
+    for width in _FIELD_WIDTHS[:4 if len(digits) == 8 else 5]:
+        fields.append(digits[pos:pos + width])
+        pos += width
+    return fields
+
+def parse_tmk(value, default_island=0):
+    """Parse a TMK in any common Hawaii format into a Tmk, or None
+
+    Accepts "(1) 2-3-004:005", "1-2-3-004-005-0000", "2-3-004:005",
+    "23-004-005", "123004005", "230040050000" and the like; plat, parcel
+    and CPR may be unpadded. The island comes from a "(n)" prefix or a
+    leading sixth field, else `default_island`. A body that repeats the
+    prefix's island drops it; one naming another island is rejected:
+
+    >>> str(parse_tmk('(2) 2-1-2-003-004'))
+    '2-1-2-003-004-0000'
+    >>> parse_tmk('(2) 1-2-3-004-005') is None
+    True
+    """
+    if not value:
+        return None
+    text = str(value)
+    island = 0
+    prefix = _ISLAND_PREFIX.search(text)
+    if prefix:
+        island = int(prefix.group(1))
+        text = text[prefix.end():]
+
+    groups = _DIGIT_RUN.findall(text)
+    if len(groups) == 1:
+        digits = groups[0]
+        if len(digits) in (9, 13) and not island:
+            island, digits = int(digits[0]), digits[1:]
+        if len(digits) not in (8, 12):
+            return None
+        fields = _split_compact(digits)
+    else:
+        # "23-004-005" runs zone and section (and perhaps the island) together
+        if groups and len(groups[0]) in (2, 3):
+            groups = list(groups[0]) + groups[1:]
+        # Five groups shaped island-zone-section-plat-parcel lead with the island, prefixed or not
+        if len(groups) == 6 or (len(groups) == 5 and len(groups[2]) == 1 and len(groups[4]) <= 3):
+            if island and int(groups[0]) != island:
+                return None
+            island, groups = int(groups[0]), groups[1:]
+        if len(groups) not in (4, 5):
+            return None
+        fields = groups
+
+    if any(len(field) > width for field, width in zip(fields, _FIELD_WIDTHS)) or island > 4:
+        return None
+    numbers = [int(field) for field in fields] + [0] * (5 - len(fields))
+    if not any(numbers):
+        return None
+    return Tmk(island or default_island, *numbers)
+
+def tag_canonical_tmk(record, default_island=0):
+    """Set record['canonical_tmk'] from its `tmk` or `parcel_number`, when either parses"""
+    for field in ('tmk', 'parcel_number'):
+        tmk = parse_tmk(record.get(field), default_island)
+        if tmk:
+            record['canonical_tmk'] = str(tmk)
+            break
+    return record
+
+class ParcelIndex:
+    """Sorted packed TMK keys with the row each came from, for joins over many parcels
+
+    Keys and rows live in two int64 arrays (16 bytes per parcel). Lookups
+    are binary searches, and an island, zone, section or plat is one
+    contiguous slice. Values that do not parse as a TMK are left out.
+    """
+
+    def __init__(self, tmks=(), default_island=0):
+        keys = []
+        rows = []
+        for row, value in enumerate(tmks):
+            tmk = value if isinstance(value, Tmk) else parse_tmk(value, default_island)
+            if tmk:
+                keys.append(tmk.key)
+                rows.append(row)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = array('q', [keys[i] for i in order])
+        self.rows = array('q', [rows[i] for i in order])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rows_between(self, low, high):
+        """Rows whose keys fall in [low, high)"""
+        start = bisect_left(self.keys, low)
+        return self.rows[start:bisect_left(self.keys, high, start)]
+
+    def lookup(self, tmk, default_island=0):
+        """Rows for a TMK (any CPR when it has none); a TMK without island matches every island"""
+        if not isinstance(tmk, Tmk):
+            tmk = parse_tmk(tmk, default_island)
+            if tmk is None:
+                return array('q')
+        span = CPR_PLACE if tmk.cpr else PARCEL_PLACE
+        islands = (tmk.island,) if tmk.island else range(len(ISLANDS) + 1)
+        found = array('q')
+        for island in islands:
+            low = tmk._replace(island=island).key
+            found.extend(self.rows_between(low, low + span))
+        return found
+
+    def area(self, island, zone=None, section=None, plat=None):
+        """Rows of an island, or of one zone, section or plat of it"""
+        low = island * ISLAND_PLACE
+        span = ISLAND_PLACE
+        for value, place in ((zone, ZONE_PLACE), (section, SECTION_PLACE), (plat, PLAT_PLACE)):
+            if value is None:
+                break
+            low += value * place
+            span = place
+        return self.rows_between(low, low + span)
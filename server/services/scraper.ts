@@ -1,9 +1,20 @@
 import { spawn } from 'child_process';
 import { storage } from '../storage';
 import { ContactEnrichmentService } from './contactEnrichment.js';
+import { scraperDaemon } from './scraperDaemon';
 import type { InsertProperty, InsertContact, InsertScrapingJob } from '@shared/schema';
 import path from 'path';
 
+type RecordHandler = (record: any) => void;
+
+// Scraper scripts and the source names the scraper daemon knows them by
+const DAEMON_SOURCES: Record<string, string> = {
+  'staradvertiser_foreclosure_scraper.py': 'star_advertiser',
+  'honolulu_tax_scraper.py': 'honolulu_tax',
+  'pdf_parser.py': 'hawaii_judiciary',
+  'ehawaii_mfdr_scraper.py': 'ehawaii_mfdr',
+};
+
 class ScraperService {
   private contactEnrichment: ContactEnrichmentService;
 
@@ -24,47 +35,54 @@ class ScraperService {
     });
 
     try {
-      let properties: any[] = [];
+      let propertiesFound = 0;
+      let processedCount = 0;
+      let processing = Promise.resolve();
+
+      // Store properties as the scrapers stream them instead of after each run finishes
+      const onRecord: RecordHandler = (property) => {
+        propertiesFound++;
+        processing = processing.then(async () => {
+          if (await this.processProperty(property)) {
+            processedCount++;
+          }
+        });
+      };
 
       switch (source) {
         case 'star_advertiser':
-          properties = await this.scrapeStarAdvertiser();
+          await this.scrapeStarAdvertiser(onRecord);
           break;
         case 'honolulu_tax':
-          properties = await this.scrapeHonoluluTax();
+          await this.scrapeHonoluluTax(onRecord);
           break;
         case 'hawaii_judiciary':
-          properties = await this.scrapeHawaiiJudiciary();
+          await this.scrapeHawaiiJudiciary(onRecord);
           break;
         case 'ehawaii_mfdr':
-          properties = await this.scrapeEHawaiiMFDR();
+          await this.scrapeEHawaiiMFDR(onRecord);
           break;
         case 'all':
-          const starProps = await this.scrapeStarAdvertiser();
-          const taxProps = await this.scrapeHonoluluTax();
-          const judiciaryProps = await this.scrapeHawaiiJudiciary();
-          const mfdrProps = await this.scrapeEHawaiiMFDR();
-          properties = [...starProps, ...taxProps, ...judiciaryProps, ...mfdrProps];
+          await this.scrapeAllParallel(onRecord);
           break;
         default:
           throw new Error(`Unknown scraping source: ${source}`);
       }
 
-      // Process and store properties
-      const processedCount = await this.processProperties(properties);
+      await processing;
 
       // Update job status
       await storage.updateScrapingJob(job.id, {
         status: 'completed',
         completedAt: new Date(),
-        propertiesFound: properties.length,
+        propertiesFound,
         propertiesProcessed: processedCount,
       });
 
       return {
         success: true,
-        message: `Successfully scraped ${properties.length} properties from ${source}`,
-        propertiesFound: properties.length,
+        message: `Successfully scraped ${propertiesFound} properties from ${source}`,
+        propertiesFound,
       };
     } catch (error: any) {
       console.error('Scraping job error:', error);
@@ -84,15 +102,42 @@ class ScraperService {
     }
   }
 
-  private async runPythonScraper(scriptName: string, args: string[] = []): Promise<any[]> {
+  private async runPythonScraper(scriptName: string, args: string[] = [], onRecord?: RecordHandler): Promise<any[]> {
+    // With SCRAPER_DAEMON=true, runs go to one long-lived Python process instead of a fresh interpreter
+    const daemonSource = DAEMON_SOURCES[scriptName];
+    if (process.env.SCRAPER_DAEMON === 'true' && daemonSource) {
+      return scraperDaemon.run(daemonSource, args.filter(arg => arg !== '--ndjson'), onRecord);
+    }
+
     return new Promise((resolve, reject) => {
       const scriptPath = path.join(process.cwd(), 'server', 'scrapers', scriptName);
+      const streaming = args.includes('--ndjson');
       const pythonProcess = spawn('python3', [scriptPath, ...args]);
 
       let output = '';
       let errorOutput = '';
       let isResolved = false;
 
+      // NDJSON mode: one record per line, handed to onRecord as soon as the line is complete
+      const streamed: any[] = [];
+      let pendingLine = '';
+      let summary: any = null;
+      const handleLine = (line: string) => {
+        const trimmed = line.trim();
+        if (!trimmed.startsWith('{')) return;
+        try {
+          const record = JSON.parse(trimmed);
+          if (record._type === 'summary') {
+            summary = record;
+            return;
+          }
+          streamed.push(record);
+          onRecord?.(record);
+        } catch (error) {
+          console.warn(`Skipping malformed NDJSON line from ${scriptName}:`, trimmed.slice(0, 200));
+        }
+      };
+
       // Set timeout for Python scraper execution (5 minutes)
       const timeout = setTimeout(() => {
         if (pythonProcess && !pythonProcess.killed) {
@@ -101,7 +146,14 @@ class ScraperService {
       }, 300000); // 5 minutes
 
       pythonProcess.stdout.on('data', (data) => {
-        output += data.toString();
+        if (!streaming) {
+          output += data.toString();
+          return;
+        }
+        pendingLine += data.toString();
+        const lines = pendingLine.split('\n');
+        pendingLine = lines.pop() ?? '';
+        lines.forEach(handleLine);
       });
 
       pythonProcess.stderr.on('data', (data) => {
@@ -114,11 +166,29 @@ class ScraperService {
         clearTimeout(timeout);
 
         console.log(`Python script ${scriptName} completed with exit code ${code}`);
-        console.log(`Output: ${output.slice(0, 1000)}`);
         if (errorOutput) {
           console.log(`Error output: ${errorOutput.slice(0, 500)}`);
         }
 
+        if (streaming) {
+          if (pendingLine) handleLine(pendingLine);
+
+          // Records already streamed are kept even if the script was killed by the timeout
+          if (code === 0 || streamed.length > 0) {
+            if (code !== 0 || (summary && !summary.complete)) {
+              console.warn(`Python script ${scriptName} stopped early; keeping ${streamed.length} streamed properties`);
+            }
+            console.log(`Streamed ${streamed.length} properties from ${scriptName}`);
+            resolve(streamed);
+          } else {
+            console.error(`Python script ${scriptName} failed with exit code ${code}:`, errorOutput);
+            reject(new Error(`Script failed with code ${code}: ${errorOutput.slice(0, 500)}`));
+          }
+          return;
+        }
+
+        console.log(`Output: ${output.slice(0, 1000)}`);
+
         if (code === 0) {
           try {
             // Try to parse JSON output from Python script
@@ -132,6 +202,7 @@ class ScraperService {
               const data = JSON.parse(jsonLine);
               const properties = Array.isArray(data) ? data : [data];
               console.log(`Successfully parsed ${properties.length} properties from ${scriptName}`);
+              properties.forEach(property => onRecord?.(property));
               resolve(properties);
             } else {
               console.warn(`No valid JSON output from ${scriptName}. Output was: ${output}`);
@@ -157,17 +228,45 @@ class ScraperService {
     });
   }
 
-  private async scrapeStarAdvertiser(): Promise<any[]> {
+  private incrementalArgs(): string[] {
+    // Incremental runs only emit notices not seen by a previous run (state kept under .cache/scrapers)
+    return process.env.SCRAPER_INCREMENTAL === 'true' ? ['--incremental'] : [];
+  }
+
+  private outputArgs(): string[] {
+    // Notice text (raw_text, content) is never stored, so it is not shipped either.
+    // Pre-scored runs also compute priority and auction days in Python
+    const args = ['--omit-raw-text'];
+    return process.env.SCRAPER_PRESCORE === 'true' ? ['--score', ...args] : args;
+  }
+
+  private dedupeArgs(): string[] {
+    // --dedupe holds every record until the run ends so it can merge duplicates; off by default so
+    // records are stored as they stream in and a run cut short by the timeout keeps what it found
+    return process.env.SCRAPER_DEDUPE === 'true' ? ['--dedupe'] : [];
+  }
+
+  private judiciaryArgs(): string[] {
+    // Court PDFs are downloaded outside the scraper; without the directory the run fails instead of finding nothing
+    const pdfDir = process.env.JUDICIARY_PDF_DIR || path.join(process.cwd(), '.cache', 'judiciary_pdfs');
+    return ['--pdf-dir', pdfDir];
+  }
+
+  private mfdrArgs(): string[] {
+    return ['--concurrency', '4', ...this.incrementalArgs()];
+  }
+
+  private async scrapeStarAdvertiser(onRecord?: RecordHandler): Promise<any[]> {
     console.log('Scraping Star Advertiser foreclosures...');
 
     try {
-      const properties = await this.runPythonScraper('staradvertiser_foreclosure_scraper.py');
-      return properties.map(prop => ({
-        ...prop,
-        priority: this.calculatePriority(prop),
-        estimatedValue: prop.estimated_value || this.estimatePropertyValue(prop.address),
-        daysUntilAuction: prop.auction_date ? this.calculateDaysUntilAuction(prop.auction_date) : null,
-      }));
+      const properties: any[] = [];
+      await this.runPythonScraper('staradvertiser_foreclosure_scraper.py', ['--ndjson', ...this.outputArgs(), ...this.incrementalArgs()], prop => {
+        const prepared = this.prepareStarAdvertiser(prop);
+        properties.push(prepared);
+        onRecord?.(prepared);
+      });
+      return properties;
     } catch (error) {
       console.error('Star Advertiser scraping failed:', error);
       // Return empty array instead of mock data to maintain data integrity
@@ -175,17 +274,17 @@ class ScraperService {
     }
   }
 
-  private async scrapeHonoluluTax(): Promise<any[]> {
+  private async scrapeHonoluluTax(onRecord?: RecordHandler): Promise<any[]> {
     console.log('Scraping Honolulu Property Tax delinquencies...');
 
     try {
-      const properties = await this.runPythonScraper('honolulu_tax_scraper.py');
-      return properties.map(prop => ({
-        ...prop,
-        priority: this.calculatePriority(prop),
-        estimatedValue: prop.estimated_value || this.estimatePropertyValue(prop.address),
-        status: 'tax_delinquent',
-      }));
+      const properties: any[] = [];
+      await this.runPythonScraper('honolulu_tax_scraper.py', ['--ndjson', ...this.outputArgs()], prop => {
+        const prepared = this.prepareHonoluluTax(prop);
+        properties.push(prepared);
+        onRecord?.(prepared);
+      });
+      return properties;
     } catch (error) {
       console.error('Honolulu Tax scraping failed:', error);
       // Return empty array instead of mock data to maintain data integrity
@@ -193,18 +292,17 @@ class ScraperService {
     }
   }
 
-  private async scrapeHawaiiJudiciary(): Promise<any[]> {
+  private async scrapeHawaiiJudiciary(onRecord?: RecordHandler): Promise<any[]> {
     console.log('Scraping Hawaii Judiciary foreclosure cases...');
 
     try {
-      const properties = await this.runPythonScraper('pdf_parser.py');
-      return properties.map(prop => ({
-        ...prop,
-        priority: this.calculatePriority(prop),
-        estimatedValue: prop.estimated_value || this.estimatePropertyValue(prop.address),
-        status: 'foreclosure',
-        source: 'hawaii_judiciary',
-      }));
+      const properties: any[] = [];
+      await this.runPythonScraper('pdf_parser.py', ['--ndjson', ...this.outputArgs(), ...this.judiciaryArgs()], prop => {
+        const prepared = this.prepareHawaiiJudiciary(prop);
+        properties.push(prepared);
+        onRecord?.(prepared);
+      });
+      return properties;
     } catch (error) {
       console.error('Hawaii Judiciary scraping failed:', error);
       // Return empty array instead of mock data to maintain data integrity
@@ -212,18 +310,18 @@ class ScraperService {
     }
   }
 
-  private async scrapeEHawaiiMFDR(): Promise<any[]> {
+  private async scrapeEHawaiiMFDR(onRecord?: RecordHandler): Promise<any[]> {
     console.log('Scraping eHawaii MFDR foreclosure notices...');
 
     try {
-      const properties = await this.runPythonScraper('ehawaii_mfdr_scraper.py');
-      return properties.map(prop => ({
-        ...prop,
-        priority: this.calculatePriority(prop),
-        estimatedValue: prop.estimated_value || this.estimatePropertyValue(prop.address),
-        status: prop.status || 'mfdr_notice',
-        source: 'ehawaii_mfdr',
-      }));
+      const properties: any[] = [];
+      // MFDR emits each table row and its detail page as separate records; SCRAPER_DEDUPE merges them
+      await this.runPythonScraper('ehawaii_mfdr_scraper.py', ['--ndjson', ...this.dedupeArgs(), ...this.outputArgs(), ...this.mfdrArgs()], prop => {
+        const prepared = this.prepareEHawaiiMFDR(prop);
+        properties.push(prepared);
+        onRecord?.(prepared);
+      });
+      return properties;
     } catch (error) {
       console.error('eHawaii MFDR scraping failed:', error);
       // Return empty array instead of mock data to maintain data integrity
@@ -231,6 +329,91 @@ class ScraperService {
     }
   }
 
+  private async scrapeAllParallel(onRecord?: RecordHandler): Promise<any[]> {
+    console.log('Scraping all sources in parallel...');
+
+    // run_all.py tags each record with the source that produced it
+    const prepareBySource: Record<string, (prop: any) => any> = {
+      star_advertiser: prop => this.prepareStarAdvertiser(prop),
+      honolulu_tax: prop => this.prepareHonoluluTax(prop),
+      hawaii_judiciary: prop => this.prepareHawaiiJudiciary(prop),
+      ehawaii_mfdr: prop => this.prepareEHawaiiMFDR(prop),
+    };
+    // SCRAPER_DEDUPE merges the same property reported by several sources into one record with a `sources` list
+    const args = ['--ndjson', ...this.dedupeArgs(), ...this.outputArgs(), '--args', `ehawaii_mfdr=${this.mfdrArgs().join(' ')}`];
+    if (this.incrementalArgs().length > 0) {
+      args.push('--args', `star_advertiser=${this.incrementalArgs().join(' ')}`);
+    }
+    // Quoted for run_all's shell-style split, as the directory may contain spaces
+    args.push('--args', `hawaii_judiciary=${this.judiciaryArgs().map(arg => JSON.stringify(arg)).join(' ')}`);
+
+    try {
+      const properties: any[] = [];
+      await this.runPythonScraper('run_all.py', args, prop => {
+        const { _source, ...record } = prop;
+        const prepare = prepareBySource[_source];
+        if (!prepare) return;
+        const prepared = prepare(record);
+        properties.push(prepared);
+        onRecord?.(prepared);
+      });
+      return properties;
+    } catch (error) {
+      console.error('Parallel scraping failed:', error);
+      // Return empty array instead of mock data to maintain data integrity
+      return [];
+    }
+  }
+
+  private prepareStarAdvertiser(prop: any): any {
+    return {
+      ...prop,
+      ...this.scoreFields(prop),
+    };
+  }
+
+  private prepareHonoluluTax(prop: any): any {
+    return {
+      ...prop,
+      ...this.scoreFields(prop),
+      status: 'tax_delinquent',
+    };
+  }
+
+  private prepareHawaiiJudiciary(prop: any): any {
+    return {
+      ...prop,
+      ...this.scoreFields(prop),
+      status: 'foreclosure',
+      source: 'hawaii_judiciary',
+    };
+  }
+
+  private prepareEHawaiiMFDR(prop: any): any {
+    return {
+      ...prop,
+      ...this.scoreFields(prop),
+      status: prop.status || 'mfdr_notice',
+      source: 'ehawaii_mfdr',
+    };
+  }
+
+  private scoreFields(prop: any): any {
+    // Records from --score runs arrive with priority and auction days already computed in one batch pass
+    if (prop.scored) {
+      return {
+        priority: prop.priority,
+        estimatedValue: prop.estimated_value || null,
+        daysUntilAuction: prop.days_until_auction,
+      };
+    }
+    return {
+      priority: this.calculatePriority(prop),
+      estimatedValue: prop.estimated_value || this.estimatePropertyValue(prop.address),
+      daysUntilAuction: prop.auction_date ? this.calculateDaysUntilAuction(prop.auction_date) : null,
+    };
+  }
+
   private calculatePriority(property: any): string {
     const amountOwed = property.amount_owed || property.amountOwed || 0;
     const estimatedValue = property.estimated_value || property.estimatedValue || 0;
@@ -270,61 +453,56 @@ class ScraperService {
     return null;
   }
 
-  private async processProperties(properties: any[]): Promise<number> {
-    let processedCount = 0;
-
-    for (const propertyData of properties) {
-      try {
-        // Check if property already exists
-        const existingProperties = await storage.getProperties({ limit: 1000 });
-        const exists = existingProperties.some(p => 
-          p.address.toLowerCase() === propertyData.address?.toLowerCase()
-        );
+  private async processProperty(propertyData: any): Promise<boolean> {
+    try {
+      // Check if property already exists
+      const existingProperties = await storage.getProperties({ limit: 1000 });
+      const exists = existingProperties.some(p => 
+        p.address.toLowerCase() === propertyData.address?.toLowerCase()
+      );
+
+      if (exists) {
+        console.log(`Property already exists: ${propertyData.address}`);
+        return false;
+      }
 
-        if (exists) {
-          console.log(`Property already exists: ${propertyData.address}`);
-          continue;
-        }
+      // Create property record
+      const property = await storage.createProperty({
+        address: propertyData.address || '',
+        city: this.extractCity(propertyData.address || ''),
+        state: 'HI',
+        zipCode: this.extractZipCode(propertyData.address || ''),
+        estimatedValue: propertyData.estimatedValue || propertyData.estimated_value,
+        status: propertyData.status,
+        priority: propertyData.priority || 'medium',
+        amountOwed: propertyData.amountOwed || propertyData.amount_owed,
+        daysUntilAuction: propertyData.daysUntilAuction || this.calculateDaysUntilAuction(propertyData.auction_date),
+        auctionDate: propertyData.auction_date ? new Date(propertyData.auction_date).toISOString().split('T')[0] : null,
+        sourceUrl: propertyData.source_url || propertyData.sourceUrl,
+        propertyType: propertyData.propertyType || propertyData.property_type || 'residential',
+      });
 
-        // Create property record
-        const property = await storage.createProperty({
-          address: propertyData.address || '',
-          city: this.extractCity(propertyData.address || ''),
-          state: 'HI',
-          zipCode: this.extractZipCode(propertyData.address || ''),
-          estimatedValue: propertyData.estimatedValue || propertyData.estimated_value,
-          status: propertyData.status,
-          priority: propertyData.priority || 'medium',
-          amountOwed: propertyData.amountOwed || propertyData.amount_owed,
-          daysUntilAuction: propertyData.daysUntilAuction || this.calculateDaysUntilAuction(propertyData.auction_date),
-          auctionDate: propertyData.auction_date ? new Date(propertyData.auction_date).toISOString().split('T')[0] : null,
-          sourceUrl: propertyData.source_url || propertyData.sourceUrl,
-          propertyType: propertyData.propertyType || propertyData.property_type || 'residential',
+      // Create contact if owner information exists
+      const ownerName = propertyData.owner_name || propertyData.ownerName || propertyData.defendant;
+      if (ownerName) {
+        const contact = await storage.createContact({
+          propertyId: property.id,
+          name: ownerName,
+          email: propertyData.owner_email || propertyData.ownerEmail,
+          phone: propertyData.owner_phone || propertyData.ownerPhone,
         });
 
-        // Create contact if owner information exists
-        const ownerName = propertyData.owner_name || propertyData.ownerName || propertyData.defendant;
-        if (ownerName) {
-          const contact = await storage.createContact({
-            propertyId: property.id,
-            name: ownerName,
-            email: propertyData.owner_email || propertyData.ownerEmail,
-            phone: propertyData.owner_phone || propertyData.ownerPhone,
-          });
-
-          // Enrich contact information in background
-          this.contactEnrichment.enrichContact(contact.id).catch(error => {
-            console.error(`Error enriching contact ${contact.id}:`, error);
-          });
-        }
-
-        processedCount++;
-      } catch (error) {
-        console.error(`Error processing property ${propertyData.address}:`, error);
+        // Enrich contact information in background
+        this.contactEnrichment.enrichContact(contact.id).catch(error => {
+          console.error(`Error enriching contact ${contact.id}:`, error);
+        });
       }
-    }
 
-    return processedCount;
+      return true;
+    } catch (error) {
+      console.error(`Error processing property ${propertyData.address}:`, error);
+      return false;
+    }
   }
 
   private extractCity(address: string): string {
@@ -348,42 +526,15 @@ class ScraperService {
   async runAllScrapers(): Promise<{ success: boolean; message: string; results: any[] }> {
     console.log('Running all scrapers...');
 
-    const results = [];
-
-    try {
-      const starResult = await this.startScraping('star_advertiser');
-      results.push({ source: 'star_advertiser', ...starResult });
-    } catch (error: any) {
-      results.push({ source: 'star_advertiser', success: false, message: error.message, propertiesFound: 0 });
-    }
-
-    try {
-      const taxResult = await this.startScraping('honolulu_tax');
-      results.push({ source: 'honolulu_tax', ...taxResult });
-    } catch (error: any) {
-      results.push({ source: 'honolulu_tax', success: false, message: error.message, propertiesFound: 0 });
-    }
-
-    try {
-      const judiciaryResult = await this.startScraping('hawaii_judiciary');
-      results.push({ source: 'hawaii_judiciary', ...judiciaryResult });
-    } catch (error: any) {
-      results.push({ source: 'hawaii_judiciary', success: false, message: error.message, propertiesFound: 0 });
-    }
-
-    try {
-      const mfdrResult = await this.startScraping('ehawaii_mfdr');
-      results.push({ source: 'ehawaii_mfdr', ...mfdrResult });
-    } catch (error: any) {
-      results.push({ source: 'ehawaii_mfdr', success: false, message: error.message, propertiesFound: 0 });
-    }
-
-    const totalProperties = results.reduce((sum, result) => sum + (result.propertiesFound || 0), 0);
+    // One run_all.py job scrapes every source concurrently instead of one source after another
+    const result = await this.startScraping('all');
 
     return {
-      success: true,
-      message: `Completed all scrapers. Found ${totalProperties} total properties.`,
-      results
+      success: result.success,
+      message: result.success
+        ? `Completed all scrapers. Found ${result.propertiesFound} total properties.`
+        : result.message,
+      results: [{ source: 'all', ...result }]
     };
   }
 
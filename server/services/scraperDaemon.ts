@@ -0,0 +1,141 @@
+import { spawn, type ChildProcessWithoutNullStreams } from 'child_process';
+import path from 'path';
+
+type RecordHandler = (record: any) => void;
+
+interface PendingRun {
+  source: string;
+  records: any[];
+  onRecord?: RecordHandler;
+  resolve: (records: any[]) => void;
+  reject: (error: Error) => void;
+  timeout: NodeJS.Timeout;
+}
+
+// Client for server/scrapers/scraper_daemon.py: one warm Python process shared by all scraping runs
+class ScraperDaemonClient {
+  private process: ChildProcessWithoutNullStreams | null = null;
+  private pending = new Map<number, PendingRun>();
+  private nextId = 1;
+  private buffer = '';
+
+  private ensureStarted(): ChildProcessWithoutNullStreams {
+    if (this.process) return this.process;
+
+    const daemonPath = path.join(process.cwd(), 'server', 'scrapers', 'scraper_daemon.py');
+    const daemon = spawn('python3', [daemonPath]);
+
+    // Decoded as a stream, so a multibyte character split across chunks is not corrupted
+    daemon.stdout.setEncoding('utf8');
+    daemon.stdout.on('data', (data: string) => {
+      this.buffer += data;
+      const lines = this.buffer.split('\n');
+      this.buffer = lines.pop() ?? '';
+      lines.forEach(line => this.handleLine(line));
+    });
+
+    daemon.stderr.on('data', (data) => {
+      console.log(`[scraper-daemon] ${data.toString().trimEnd()}`);
+    });
+
+    daemon.on('close', (code) => {
+      console.warn(`Scraper daemon exited with code ${code}`);
+      this.process = null;
+      this.buffer = '';
+      this.pending.forEach((run, id) => this.finish(id, new Error(`Scraper daemon exited with code ${code}`)));
+    });
+
+    // Writes to a daemon that failed to start or has died are reported by the 'error' and 'close' handlers
+    daemon.stdin.on('error', (error) => {
+      console.warn('Scraper daemon stdin error:', error.message);
+    });
+
+    daemon.on('error', (error) => {
+      console.error('Failed to start scraper daemon:', error);
+      // A failed spawn never closes; fail its runs now instead of at their timeouts
+      if (this.process === daemon) {
+        this.process = null;
+        this.buffer = '';
+      }
+      this.pending.forEach((run, id) => this.finish(id, error));
+    });
+
+    this.process = daemon;
+    return daemon;
+  }
+
+  private handleLine(line: string) {
+    const trimmed = line.trim();
+    if (!trimmed.startsWith('{')) return;
+
+    let message: any;
+    try {
+      message = JSON.parse(trimmed);
+    } catch {
+      console.warn('Skipping malformed scraper daemon line:', trimmed.slice(0, 200));
+      return;
+    }
+
+    const run = this.pending.get(message.id);
+    if (!run) return;
+
+    if ('record' in message) {
+      run.records.push(message.record);
+      run.onRecord?.(message.record);
+    } else if ('result' in message) {
+      console.log(`Scraper daemon finished ${run.source}:`, JSON.stringify(message.result));
+      this.finish(message.id);
+    } else if ('error' in message) {
+      this.finish(message.id, new Error(message.error?.message || 'Scraper daemon error'));
+    }
+  }
+
+  private finish(id: number, error?: Error) {
+    const run = this.pending.get(id);
+    if (!run) return;
+
+    this.pending.delete(id);
+    clearTimeout(run.timeout);
+
+    // Streamed records are kept even when the run ends in an error
+    if (error && run.records.length === 0) {
+      run.reject(error);
+    } else {
+      if (error) {
+        console.warn(`Scraper daemon run for ${run.source} stopped early; keeping ${run.records.length} records:`, error.message);
+      }
+      run.resolve(run.records);
+    }
+  }
+
+  run(source: string, args: string[] = [], onRecord?: RecordHandler, timeoutMs = 300000): Promise<any[]> {
+    const daemon = this.ensureStarted();
+    const id = this.nextId++;
+
+    return new Promise((resolve, reject) => {
+      const timeout = setTimeout(() => {
+        // Stop the Python run too, or it keeps scraping and holds the source for later runs
+        this.cancel(id);
+        this.finish(id, new Error(`Scraper daemon run for ${source} timed out`));
+      }, timeoutMs);
+
+      this.pending.set(id, { source, records: [], onRecord, resolve, reject, timeout });
+      daemon.stdin.write(JSON.stringify({ id, method: 'run', params: { source, args } }) + '\n');
+    });
+  }
+
+  private cancel(runId: number) {
+    if (this.process) {
+      this.process.stdin.write(JSON.stringify({ id: this.nextId++, method: 'cancel', params: { id: runId } }) + '\n');
+    }
+  }
+
+  stop() {
+    if (this.process) {
+      this.process.stdin.write(JSON.stringify({ id: this.nextId++, method: 'shutdown' }) + '\n');
+      this.process.stdin.end();
+    }
+  }
+}
+
+export const scraperDaemon = new ScraperDaemonClient();